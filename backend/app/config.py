@@ -11,17 +11,96 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_key: str
     supabase_service_role_key: str
+    db_max_connections: int = 100
+    db_max_keepalive_connections: int = 20
+    db_timeout_seconds: float = 10.0
+
+    # List endpoint pagination
+    page_default_limit: int = 50
+    page_max_limit: int = 100
 
     # JWT
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_max_entries: int = 10000
+
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+
+    # User profile cache
+    user_cache_ttl_seconds: int = 300
+    user_cache_max_entries: int = 10000
+    summary_cache_ttl_seconds: int = 60
+
+    # Serialized itinerary cache; the TTL bounds staleness in other workers after a regeneration
+    itinerary_cache_ttl_seconds: int = 600
+    itinerary_cache_max_entries: int = 1000
 
     # AI Model
     ai_provider: str = "groq"  # groq, huggingface, ollama
+    ai_providers: str | None = None  # e.g. "groq,ollama" routes across several
+    router_hedge_after_seconds: float = 15.0
+    router_window_size: int = 50
+    router_failure_threshold: int = 3
+    router_cooldown_seconds: float = 30.0
+    router_max_error_rate: float = 0.25  # providers failing more often rank after reliable ones
+    generation_mode: str = "single"  # single, parallel (outline + concurrent days)
+    parallel_day_concurrency: int = 4
+    llm_output_format: str = "text"  # text, json (structured output / provider JSON mode)
     groq_api_key: str | None = None
     huggingface_api_key: str | None = None
     ollama_base_url: str = "http://localhost:11434"
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 60.0
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_tokens_per_day: int = 350  # completion budget per itinerary day at a moderate pace
+    llm_max_output_tokens: int = 8192
+
+    # LLM provider quotas per minute (0 disables a limit); Groq defaults match its free tier
+    groq_requests_per_minute: int = 30
+    groq_tokens_per_minute: int = 12000
+    groq_max_concurrency: int = 8
+    huggingface_requests_per_minute: int = 0
+    huggingface_tokens_per_minute: int = 0
+    huggingface_max_concurrency: int = 4
+    ollama_requests_per_minute: int = 0
+    ollama_tokens_per_minute: int = 0
+    ollama_max_concurrency: int = 2
+    llm_queue_timeout_seconds: float = 30.0  # longest a call waits for quota, including retries
+    llm_rate_limit_retries: int = 3  # retries after a 429, 5xx or connection error
+    llm_retry_backoff_seconds: float = 1.0
+
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_max_entries: int = 512
+
+    # Similar-itinerary reuse
+    similarity_reuse_enabled: bool = True
+    similarity_threshold: float = 0.97  # cosine similarity of hashed preference vectors
+    similarity_max_entries: int = 10000
+    similarity_warm_entries: int = 1000  # recent itineraries indexed in the background after startup
+    similarity_warm_batch_size: int = 200
+
+    # Background generation jobs
+    job_workers: int = 2
+    job_queue_size: int = 100
+    job_ttl_seconds: int = 3600
+    job_drain_timeout_seconds: float = 30.0  # on shutdown, before queued jobs are abandoned
+
+    # Idempotency-Key replay for POST /trips and generate-itinerary
+    idempotency_ttl_seconds: int = 86400  # how long a recorded response is replayed
+    idempotency_lock_seconds: int = 300  # a crashed worker's in-progress key frees up after this
+    idempotency_wait_seconds: float = 60.0  # a concurrent replay waits this long before a 409
+
+    # Audit history writer
+    history_batch_size: int = 50
+    history_flush_interval_seconds: float = 1.0
+    history_queue_size: int = 10000
 
     # Server
     debug: bool = True
@@ -32,8 +111,16 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str | None = None
 
-    # Logging
+    # Response compression (brotli needs the optional brotli package)
+    compression_enabled: bool = True
+    compression_min_size: int = 1024  # bytes; smaller responses are sent as is
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5  # 0-11; above ~6 costs far more CPU for little gain
+
+    # Logging and metrics
     log_level: str = "INFO"
+    metrics_enabled: bool = True  # request timing middleware and GET /metrics
+    startup_profile: bool = False  # log import and per-service startup times on boot
 
     class Config:
         env_file = ".env"
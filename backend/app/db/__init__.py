@@ -1,5 +1,5 @@
 """Database module."""
 
-from app.db.database import init_db, get_db, Database
+from app.db.database import init_db, get_db, close_db, Database
 
-__all__ = ["init_db", "get_db", "Database"]
+__all__ = ["init_db", "get_db", "close_db", "Database"]
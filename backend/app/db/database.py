@@ -1,35 +1,100 @@
 """Database connection and initialization."""
 
 import logging
-from supabase import create_client, Client
+import time
+from typing import Optional
+import httpx
+from postgrest import AsyncPostgrestClient
 from app.config import get_settings
+from app.utils.metrics import histogram
 
 logger = logging.getLogger(__name__)
 
+supabase_request_seconds = histogram(
+    "supabase_request_duration_seconds",
+    "Supabase (PostgREST) request latency until response headers arrive",
+    ("table", "operation", "status"),
+)
+
+OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def _describe(request: httpx.Request) -> tuple[str, str]:
+    """(table, operation) of a PostgREST request, e.g. ("trips", "select")."""
+    path = request.url.path
+    table = path.split("/rest/v1/", 1)[1] if "/rest/v1/" in path else path.strip("/")
+    operation = OPERATIONS.get(request.method, request.method.lower())
+    if table.startswith("rpc/"):
+        operation = "rpc"
+    elif operation == "insert" and "resolution=" in request.headers.get("prefer", ""):
+        operation = "upsert"
+    return table, operation
+
+
+async def _start_timer(request: httpx.Request):
+    request.extensions["started_at"] = time.perf_counter()
+
+
+async def _observe(response: httpx.Response):
+    request = response.request
+    table, operation = _describe(request)
+    supabase_request_seconds.observe(
+        time.perf_counter() - request.extensions["started_at"],
+        table=table,
+        operation=operation,
+        status=response.status_code,
+    )
+
 
 class Database:
-    """Supabase database client wrapper."""
+    """Async Supabase database client wrapper.
+
+    Talks to Supabase's PostgREST API directly rather than through the full
+    ``supabase`` client, whose storage, realtime and auth modules are never
+    used here but add about half a second to every cold start. Both clients
+    share one pooled ``httpx.AsyncClient`` and are built on first use.
+    """
 
     def __init__(self):
-        """Initialize Supabase client."""
+        """Initialize the pooled HTTP client."""
         settings = get_settings()
-        self.client: Client = create_client(
-            settings.supabase_url,
-            settings.supabase_key
+        self.rest_url = f"{settings.supabase_url.rstrip('/')}/rest/v1"
+        self.anon_key = settings.supabase_key
+        self.service_role_key = settings.supabase_service_role_key
+        self.client: Optional[AsyncPostgrestClient] = None
+        self.service_client: Optional[AsyncPostgrestClient] = None
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.db_max_connections,
+                max_keepalive_connections=settings.db_max_keepalive_connections,
+            ),
+            timeout=settings.db_timeout_seconds,
+            event_hooks={"request": [_start_timer], "response": [_observe]},
         )
-        self.service_client: Client = create_client(
-            settings.supabase_url,
-            settings.supabase_service_role_key
+
+    def _postgrest_client(self, key: str) -> AsyncPostgrestClient:
+        return AsyncPostgrestClient(
+            self.rest_url,
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            http_client=self.http_client,
         )
 
-    def get_client(self) -> Client:
+    def get_client(self) -> AsyncPostgrestClient:
         """Get Supabase client."""
+        if self.client is None:
+            self.client = self._postgrest_client(self.anon_key)
         return self.client
 
-    def get_service_client(self) -> Client:
+    def get_service_client(self) -> AsyncPostgrestClient:
         """Get service role client for admin operations."""
+        if self.service_client is None:
+            self.service_client = self._postgrest_client(self.service_role_key)
         return self.service_client
 
+    async def close(self):
+        """Close the pooled HTTP connections."""
+        await self.http_client.aclose()
+
 
 # Global database instance
 db: Database | None = None
@@ -50,3 +115,12 @@ def get_db() -> Database:
     if db is None:
         db = init_db()
     return db
+
+
+async def close_db():
+    """Close the database instance if it was initialized."""
+    global db
+    if db is not None:
+        await db.close()
+        db = None
+        logger.info("Database connections closed")
@@ -1,12 +1,25 @@
 """FastAPI application main entry point."""
 
+import time
+
+_import_started = time.perf_counter()
+
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
 from app.utils.errors import setup_logging
-from app.db.database import init_db
-from app.routes import auth_router, trips_router
+from app.routes import auth_router, trips_router, jobs_router, users_router
+from app.services.container import lifespan
+from app.services.generation import generation_flight
+from app.services.history import get_history_writer
+from app.services.similarity import get_similarity_index
+from app.services.usage import token_usage_totals
+from app.utils.compression import CompressionMiddleware
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.utils.profiling import startup_timer
+
+startup_timer.record("imports", time.perf_counter() - _import_started)
 
 # Setup logging
 setup_logging()
@@ -16,7 +29,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Travel Itinerary Planner API",
     description="AI-powered personalized travel itinerary generator",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Get settings
@@ -34,21 +48,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Idempotent-Replayed"],
 )
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(trips_router)
-
-
-@app.on_event("startup")
-async def startup():
-    """Initialize database on startup."""
-    try:
-        init_db()
-        logger.info("Application started successfully")
-    except Exception as e:
-        logger.error(f"Startup error: {str(e)}")
+app.include_router(jobs_router)
+app.include_router(users_router)
 
 
 @app.get("/")
@@ -64,7 +82,20 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "deduplicated_generations": generation_flight.deduplicated,
+        "history_dropped": get_history_writer().dropped,
+        "reused_itineraries": get_similarity_index().reused,
+        "llm_tokens": token_usage_totals.snapshot(),
+    }
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint."""
+        return Response(registry.render(), media_type=CONTENT_TYPE)
 
 
 if __name__ == "__main__":
@@ -3,15 +3,28 @@
 from app.prompts.templates import (
     SYSTEM_PROMPT,
     SYSTEM_PROMPT_SHORT,
+    ITINERARY_JSON_SCHEMA,
+    get_itinerary_system_prompt,
     build_itinerary_prompt,
+    build_skeleton_prompt,
+    build_day_detail_prompt,
     get_rephrase_day_prompt,
     get_cost_optimization_prompt,
 )
+from app.prompts.tokens import DAY_MIN_OUTPUT_TOKENS, count_tokens, max_output_tokens, outline_max_tokens
 
 __all__ = [
     "SYSTEM_PROMPT",
     "SYSTEM_PROMPT_SHORT",
+    "ITINERARY_JSON_SCHEMA",
+    "get_itinerary_system_prompt",
     "build_itinerary_prompt",
+    "build_skeleton_prompt",
+    "build_day_detail_prompt",
     "get_rephrase_day_prompt",
     "get_cost_optimization_prompt",
+    "count_tokens",
+    "max_output_tokens",
+    "DAY_MIN_OUTPUT_TOKENS",
+    "outline_max_tokens",
 ]
@@ -1,5 +1,7 @@
 """Prompt templates for itinerary generation."""
 
+import json
+
 SYSTEM_PROMPT = """You are an expert travel planner with 20+ years of experience designing personalized itineraries.
 Your recommendations are:
 - Personalized based on user preferences (NOT generic)
@@ -12,10 +14,34 @@ Your recommendations are:
 You provide day-by-day itineraries with specific recommendations."""
 
 
-def build_itinerary_prompt(
-    destination: str,
-    start_date: str,
-    end_date: str,
+# Structured output contract for output_format="json"; keys match DayItinerary
+ITINERARY_JSON_SCHEMA = {
+    "type": "object",
+    "required": ["days"],
+    "properties": {
+        "days": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["day", "date", "morning", "afternoon", "evening", "estimated_cost_inr"],
+                "properties": {
+                    "day": {"type": "integer"},
+                    "date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "morning": {"type": "string", "description": "Venue - activity (Time, Cost in ₹)"},
+                    "afternoon": {"type": "string", "description": "Venue - activity (Time, Cost in ₹)"},
+                    "evening": {"type": "string", "description": "Venue - activity (Time, Cost in ₹)"},
+                    "food_recommendations": {"type": "string"},
+                    "accommodation_info": {"type": "string"},
+                    "transport_tips": {"type": "string"},
+                    "estimated_cost_inr": {"type": "number"},
+                },
+            },
+        },
+    },
+}
+
+
+def _build_user_profile(
     travel_style: str,
     interests: list[str],
     group_size: int,
@@ -24,7 +50,7 @@ def build_itinerary_prompt(
     dietary_restrictions: list[str] = None,
     mobility_concerns: str = None,
 ) -> str:
-    """Build the user prompt for itinerary generation."""
+    """Build the USER PROFILE section shared by the generation prompts."""
 
     dietary_info = f"Dietary restrictions: {', '.join(dietary_restrictions)}" if dietary_restrictions else ""
     mobility_info = f"Mobility considerations: {mobility_concerns}" if mobility_concerns else ""
@@ -36,42 +62,35 @@ def build_itinerary_prompt(
         "fast": "three to four main activities per day, constantly exploring",
     }.get(pace, "moderate pace")
 
-    prompt = f"""Create a detailed {destination} itinerary from {start_date} to {end_date}.
-
-USER PROFILE:
+    return f"""USER PROFILE:
 - Travel Style: {travel_style.capitalize()}
 - Primary Interests: {interests_str}
 - Group Size: {group_size} people(s)
 - Daily Budget: ₹{budget_per_day} (INR)
 - Pace: {pace} - {pace_description}
 {dietary_info}
-{mobility_info}
-
-REQUIREMENTS:
-1. Create a day-by-day itinerary matching these dates exactly
-2. Each day should follow this structure:
-   - Morning (specific venue name, address if possible, timing, cost)
-   - Afternoon (specific venue name, address if possible, timing, cost)
-   - Evening (specific venue name, address if possible, timing, cost)
-   - Food recommendations (at least 2-3 specific restaurants for the travel style)
-   - Accommodation info (general neighborhood recommendation for this type of trip)
-   - Transport tips (specific transit info/costs)
-   - Estimated daily cost in INR
-
-3. Optimize for:
+{mobility_info}"""
+
+
+# Trip-independent instructions for a full itinerary. They are rendered once
+# and sent as the system message, so every request shares the same prefix
+# (which providers with prompt caching can reuse) and only the trip details
+# travel in the user message.
+_ITINERARY_REQUIREMENTS = """REQUIREMENTS:
+1. Create a day-by-day itinerary matching the trip dates exactly
+2. Optimize for:
    - Geographic proximity (minimize travel time)
    - Budget constraints (all costs in INR - ₹)
-   - {travel_style} traveler preferences
+   - The traveler's style, interests and pace from the USER PROFILE
    - Safety and accessibility
-   - Authentic local experiences (avoid tourist traps for {travel_style} travelers)
-
-4. Provide SPECIFIC recommendations:
-   - Use actual venue names, not generic "visit a museum"
+   - Authentic local experiences (avoid tourist traps)
+3. Provide SPECIFIC recommendations:
+   - Use actual venue names and addresses, not generic "visit a museum"
    - Include realistic time estimates between locations
-   - Consider {group_size}-person group dynamics
-   - Address {travel_style} traveler concerns
+   - Consider the group size and its dynamics
+   - At least 2-3 specific restaurants per day suited to the travel style"""
 
-5. Format each day as:
+_TEXT_FORMAT = """4. Format each day as:
 ---
 DAY [number]: [date]
 Morning: [Venue Name] - [Specific activity] (Time: [estimated minutes], Cost: ₹[amount])
@@ -80,14 +99,131 @@ Evening: [Venue Name] - [Specific activity] (Time: [estimated minutes], Cost: 
 Food Recommendations: 
   - [Restaurant 1 Name] - [Cuisine type, budget estimate in ₹]
   - [Restaurant 2 Name] - [Cuisine type, budget estimate in ₹]
-Accommodation Info: [Neighborhood recommendation and type for {travel_style} traveler]
+Accommodation Info: [Neighborhood recommendation and type for this traveler]
 Transport Tips: [Specific transit advice and costs in ₹]
 Estimated Daily Cost: ₹[amount] (breakdown: activities + meals + transport)
----
+---"""
+
+_JSON_FORMAT = f"""4. Respond with a single JSON object and nothing else (no prose, no code fences).
+It must match this JSON schema, with one entry in "days" per date:
+{json.dumps(ITINERARY_JSON_SCHEMA, ensure_ascii=False)}"""
+
+ITINERARY_SYSTEM_PROMPTS = {
+    output_format: f"""{SYSTEM_PROMPT}
+
+{_ITINERARY_REQUIREMENTS}
+
+{format_section}
+
+Be specific, practical, and personalized. All monetary values must be in Indian Rupees (₹)."""
+    for output_format, format_section in (("text", _TEXT_FORMAT), ("json", _JSON_FORMAT))
+}
+
+
+def get_itinerary_system_prompt(output_format: str = "text") -> str:
+    """Return the pre-rendered system prompt for itinerary generation.
+
+    ``output_format`` is ``"text"`` for DAY blocks or ``"json"`` for a JSON
+    object matching ITINERARY_JSON_SCHEMA.
+    """
+    return ITINERARY_SYSTEM_PROMPTS.get(output_format, ITINERARY_SYSTEM_PROMPTS["text"])
+
+
+def build_itinerary_prompt(
+    destination: str,
+    start_date: str,
+    end_date: str,
+    travel_style: str,
+    interests: list[str],
+    group_size: int,
+    pace: str,
+    budget_per_day: float,
+    dietary_restrictions: list[str] = None,
+    mobility_concerns: str = None,
+) -> str:
+    """Build the trip-specific user prompt for itinerary generation.
+
+    Pair it with ``get_itinerary_system_prompt``, which carries the
+    requirements and output format.
+    """
+
+    user_profile = _build_user_profile(
+        travel_style, interests, group_size, pace, budget_per_day, dietary_restrictions, mobility_concerns
+    )
+
+    return f"""Create a detailed {destination} itinerary from {start_date} to {end_date}.
+
+{user_profile}
+
+Generate the complete itinerary now."""
 
-Generate the complete itinerary now. Be specific, practical, and personalized. All monetary values must be in Indian Rupees (₹)."""
 
-    return prompt
+def build_skeleton_prompt(
+    destination: str,
+    start_date: str,
+    end_date: str,
+    travel_style: str,
+    interests: list[str],
+    group_size: int,
+    pace: str,
+    budget_per_day: float,
+    dietary_restrictions: list[str] = None,
+    mobility_concerns: str = None,
+) -> str:
+    """Build the prompt for a compact one-line-per-day trip outline."""
+
+    user_profile = _build_user_profile(
+        travel_style, interests, group_size, pace, budget_per_day, dietary_restrictions, mobility_concerns
+    )
+
+    return f"""Outline a {destination} trip from {start_date} to {end_date}.
+
+{user_profile}
+
+Give exactly one line per day, in order, in this format:
+DAY [number]: [Area or neighborhood] - [Theme of the day]
+
+Group nearby places on the same day and do not repeat areas.
+Output only the outline lines."""
+
+
+def build_day_detail_prompt(
+    day: int,
+    outline: str,
+    destination: str,
+    travel_style: str,
+    interests: list[str],
+    group_size: int,
+    pace: str,
+    budget_per_day: float,
+    dietary_restrictions: list[str] = None,
+    mobility_concerns: str = None,
+) -> str:
+    """Build the prompt for the full plan of one day of an outlined trip."""
+
+    user_profile = _build_user_profile(
+        travel_style, interests, group_size, pace, budget_per_day, dietary_restrictions, mobility_concerns
+    )
+
+    return f"""This is the day-by-day outline of a {destination} trip:
+{outline}
+
+{user_profile}
+
+Write the detailed plan for Day {day} only, following its outline line.
+Use actual venue names, realistic timings and costs in Indian Rupees (₹).
+
+Format it exactly as:
+DAY {day}:
+Morning: [Venue Name] - [Specific activity] (Time: [estimated minutes], Cost: ₹[amount])
+Afternoon: [Venue Name] - [Specific activity] (Time: [estimated minutes], Cost: ₹[amount])
+Evening: [Venue Name] - [Specific activity] (Time: [estimated minutes], Cost: ₹[amount])
+Food Recommendations: 
+  - [Restaurant 1 Name] - [Cuisine type, budget estimate in ₹]
+  - [Restaurant 2 Name] - [Cuisine type, budget estimate in ₹]
+Accommodation Info: [Neighborhood recommendation and type for {travel_style} traveler]
+Transport Tips: [Specific transit advice and costs in ₹]
+Estimated Daily Cost: ₹[amount] (breakdown: activities + meals + transport)"""
 
 
 def get_rephrase_day_prompt(day: int, issues: str) -> str:
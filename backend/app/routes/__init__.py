@@ -2,5 +2,7 @@
 
 from app.routes.auth import router as auth_router
 from app.routes.trips import router as trips_router
+from app.routes.jobs import router as jobs_router
+from app.routes.users import router as users_router
 
-__all__ = ["auth_router", "trips_router"]
+__all__ = ["auth_router", "trips_router", "jobs_router", "users_router"]
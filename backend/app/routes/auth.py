@@ -9,7 +9,7 @@ from app.schemas import (
     TokenResponse,
     UserResponse,
 )
-from app.services.user import get_user_service
+from app.services.user import UserService, get_user_service
 from app.utils.auth import get_current_user_id
 from app.utils.errors import ValidationError, AuthenticationError
 
@@ -19,10 +19,9 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(request: UserRegisterRequest):
+async def register(request: UserRegisterRequest, user_service: UserService = Depends(get_user_service)):
     """Register a new user."""
     try:
-        user_service = get_user_service()
         user = await user_service.register_user(request)
         return user
     except ValidationError as e:
@@ -33,10 +32,9 @@ async def register(request: UserRegisterRequest):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: UserLoginRequest):
+async def login(request: UserLoginRequest, user_service: UserService = Depends(get_user_service)):
     """Authenticate user and return JWT token."""
     try:
-        user_service = get_user_service()
         token = await user_service.login_user(request)
         return token
     except AuthenticationError as e:
@@ -47,13 +45,15 @@ async def login(request: UserLoginRequest):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(user_id: str = Depends(get_current_user_id)):
+async def get_current_user(
+    user_id: str = Depends(get_current_user_id),
+    user_service: UserService = Depends(get_user_service),
+):
     """Get current user info."""
     if not user_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
-        user_service = get_user_service()
         user = await user_service.get_user(user_id)
         return user
     except Exception as e:
@@ -0,0 +1,28 @@
+"""Background job routes."""
+
+import logging
+from fastapi import APIRouter, HTTPException, Depends
+from app.schemas import JobResponse
+from app.services.jobs import JobQueue, get_job_queue
+from app.utils.auth import get_current_user_id
+from app.utils.errors import AppException
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """Get the status, and once finished the result, of a background job."""
+    try:
+        job = await job_queue.get(job_id)
+    except AppException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    if not job or job["user_id"] != current_user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
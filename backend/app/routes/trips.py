@@ -1,68 +1,99 @@
 """Trip and itinerary routes."""
 
+import asyncio
+import json
 import logging
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, status, Depends
+import math
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from app.config import get_settings
 from app.utils.auth import get_current_user_id
-from app.services.history import get_history_service
+from app.services.history import HistoryService, get_history_service
 from app.schemas import (
     CreateTripRequest,
     TripResponse,
     ItineraryResponse,
     DayItinerary,
+    JobResponse,
 )
-from app.services.trip import get_trip_service, get_itinerary_service
-from app.services.ai import get_ai_orchestrator
-from app.prompts import (
-    SYSTEM_PROMPT,
-    build_itinerary_prompt,
-)
-from app.utils.errors import NotFoundError, ValidationError, AIGenerationError
+from app.services.trip import TripService, ItineraryService, get_trip_service, get_itinerary_service
+from app.services.generation import get_generation_service
+from app.services.jobs import JobQueue, get_job_queue
+from app.services.idempotency import IdempotencyService, get_idempotency_service, request_fingerprint
+from app.utils.errors import AppException, NotFoundError, ValidationError, AIGenerationError, RateLimitError
+from app.utils.pagination import clamp_limit, conditional_json, etag_matches
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/trips", tags=["Trips"])
 
 
+def page_limit(limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)")) -> int:
+    """Dependency resolving the page size for list endpoints."""
+    settings = get_settings()
+    return clamp_limit(limit, settings.page_default_limit, settings.page_max_limit)
+
+
 @router.post("", response_model=TripResponse)
 async def create_trip(
     request: CreateTripRequest, 
-    current_user_id: str = Depends(get_current_user_id)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user_id: str = Depends(get_current_user_id),
+    trip_service: TripService = Depends(get_trip_service),
+    history_service: HistoryService = Depends(get_history_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
 ):
-    """Create a new trip."""
+    """Create a new trip.
+
+    Retries carrying the same Idempotency-Key get the recorded response
+    instead of creating another trip.
+    """
+    # Fallback to body user_id if we are in demo mode but body has a real ID
+    actual_user_id = current_user_id
+    if (actual_user_id == "demo-user" or not actual_user_id) and request.user_id:
+        actual_user_id = request.user_id
+
+    async def create():
+        try:
+            trip = await trip_service.create_trip(actual_user_id, request)
+
+            # Log action
+            await history_service.log_action(
+                user_id=actual_user_id,
+                action="CREATE_TRIP",
+                entity_type="trip",
+                entity_id=trip.id,
+                details={"destination": trip.destination}
+            )
+
+            return trip
+        except ValidationError as e:
+            logger.warning(f"Validation error creating trip: {e.message}")
+            raise HTTPException(status_code=422, detail=e.message)
+        except Exception as e:
+            logger.exception(f"Unexpected error creating trip: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to create trip: {str(e)}")
+
     try:
-        trip_service = get_trip_service()
-        # Fallback to body user_id if we are in demo mode but body has a real ID
-        actual_user_id = current_user_id
-        if (actual_user_id == "demo-user" or not actual_user_id) and request.user_id:
-            actual_user_id = request.user_id
-            
-        trip = await trip_service.create_trip(actual_user_id, request)
-        
-        # Log action
-        history_service = get_history_service()
-        await history_service.log_action(
-            user_id=actual_user_id,
-            action="CREATE_TRIP",
-            entity_type="trip",
-            entity_id=trip.id,
-            details={"destination": trip.destination}
+        return await idempotency_service.run(
+            idempotency_key,
+            scope=f"{actual_user_id}:create-trip",
+            fingerprint=request_fingerprint(request.model_dump(mode="json")),
+            handler=create,
         )
-        
-        return trip
-    except ValidationError as e:
-        logger.warning(f"Validation error creating trip: {e.message}")
-        raise HTTPException(status_code=422, detail=e.message)
-    except Exception as e:
-        logger.exception(f"Unexpected error creating trip: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to create trip: {str(e)}")
+    except AppException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
 
 @router.get("/{trip_id}", response_model=TripResponse)
-async def get_trip(trip_id: str, current_user_id: str = Depends(get_current_user_id)):
+async def get_trip(
+    trip_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    trip_service: TripService = Depends(get_trip_service),
+):
     """Get trip details."""
     try:
-        trip_service = get_trip_service()
         trip = await trip_service.get_trip(trip_id, current_user_id)
         return trip
     except NotFoundError:
@@ -73,28 +104,50 @@ async def get_trip(trip_id: str, current_user_id: str = Depends(get_current_user
 
 
 @router.get("", response_model=list[TripResponse])
-async def list_trips(current_user_id: str = Depends(get_current_user_id)):
-    """List all user trips."""
+async def list_trips(
+    request: Request,
+    limit: int = Depends(page_limit),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Set to 'itinerary' to embed each trip's latest itinerary"),
+    current_user_id: str = Depends(get_current_user_id),
+    trip_service: TripService = Depends(get_trip_service),
+):
+    """List user trips, newest first, one page at a time.
+
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
+    if include not in (None, "itinerary"):
+        raise HTTPException(status_code=422, detail=f"Unsupported include: {include}")
+
     try:
-        trip_service = get_trip_service()
-        trips = await trip_service.get_user_trips(current_user_id)
-        return trips
+        trips, next_cursor = await trip_service.get_user_trips(
+            current_user_id, limit, cursor, fields, include_itinerary=include == "itinerary"
+        )
+        if not fields:
+            trips = [TripResponse(**trip) for trip in trips]
+        return conditional_json(request, trips, next_cursor)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.message)
     except Exception as e:
         logger.error(f"List trips error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to list trips")
 
 
 @router.delete("/{trip_id}")
-async def delete_trip(trip_id: str, current_user_id: str = Depends(get_current_user_id)):
+async def delete_trip(
+    trip_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    trip_service: TripService = Depends(get_trip_service),
+    history_service: HistoryService = Depends(get_history_service),
+):
     """Delete a trip."""
     try:
-        trip_service = get_trip_service()
         success = await trip_service.delete_trip(trip_id, current_user_id)
         if not success:
             raise HTTPException(status_code=404, detail="Trip not found")
             
         # Log action
-        history_service = get_history_service()
         await history_service.log_action(
             user_id=current_user_id,
             action="DELETE_TRIP",
@@ -109,114 +162,172 @@ async def delete_trip(trip_id: str, current_user_id: str = Depends(get_current_u
 
 
 @router.post("/{trip_id}/generate-itinerary", response_model=ItineraryResponse)
-async def generate_itinerary(trip_id: str, current_user_id: str = Depends(get_current_user_id)):
-    """Generate itinerary for a trip."""
-    try:
-        trip_service = get_trip_service()
-        itinerary_service = get_itinerary_service()
-        ai_orchestrator = get_ai_orchestrator()
-
-        # Get trip
-        trip = await trip_service.get_trip(trip_id, current_user_id)
-        if not trip:
+async def generate_itinerary(
+    trip_id: str,
+    fresh: bool = Query(False, description="Generate anew instead of reusing a similar or cached itinerary"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+):
+    """Generate itinerary for a trip.
+
+    Retries carrying the same Idempotency-Key get the recorded itinerary
+    instead of calling the LLM again.
+    """
+    async def generate():
+        try:
+            # Resolved here rather than injected so a misconfigured provider maps to a 500 below
+            generation_service = get_generation_service()
+            return await generation_service.generate_itinerary(trip_id, current_user_id, fresh=fresh)
+
+        except RateLimitError as e:
+            logger.warning(f"AI provider quota exhausted for trip {trip_id}: {e.message}")
+            raise HTTPException(
+                status_code=503,
+                detail=e.message,
+                headers={"Retry-After": str(math.ceil(e.retry_after or 1))},
+            )
+        except AIGenerationError as e:
+            logger.error(f"AI generation error for trip {trip_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to generate itinerary: {str(e)}")
+        except ValidationError as e:
+            logger.warning(f"Validation error generating itinerary for trip {trip_id}: {e.message}")
+            raise HTTPException(status_code=422, detail=e.message)
+        except NotFoundError:
             raise HTTPException(status_code=404, detail="Trip not found")
+        except Exception as e:
+            logger.exception(f"Unexpected error generating itinerary for trip {trip_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
-        # Build prompt
-        user_prompt = build_itinerary_prompt(
-            destination=trip.destination,
-            start_date=trip.start_date,
-            end_date=trip.end_date,
-            travel_style=trip.preferences.travel_style,
-            interests=trip.preferences.interests,
-            group_size=trip.preferences.group_size,
-            pace=trip.preferences.pace,
-            budget_per_day=trip.preferences.budget_per_day_inr,
-            dietary_restrictions=trip.preferences.dietary_restrictions,
-            mobility_concerns=trip.preferences.mobility_concerns,
+    try:
+        return await idempotency_service.run(
+            idempotency_key,
+            scope=f"{current_user_id}:generate-itinerary:{trip_id}",
+            fingerprint=request_fingerprint(trip_id, fresh),
+            handler=generate,
         )
+    except AppException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
-        # Generate itinerary
-        logger.info(f"Generating itinerary for trip {trip_id}")
-        response_text = await ai_orchestrator.generate_itinerary(SYSTEM_PROMPT, user_prompt)
-
-        # Parse response
-        parsed = ai_orchestrator.parse_itinerary_response(response_text)
-
-        # Calculate duration and total cost
-        from datetime import datetime as dt
-        start = dt.strptime(trip.start_date, "%Y-%m-%d")
-        end = dt.strptime(trip.end_date, "%Y-%m-%d")
-        duration_days = (end - start).days + 1
-
-        # Create DayItinerary objects
-        days = []
-        total_cost = 0.0
-
-        if "days" in parsed:
-            for day_data in parsed["days"]:
-                day_itinerary = DayItinerary(
-                    day=day_data.get("day", len(days) + 1),
-                    date=trip.start_date,  # Would be computed in real scenario
-                    morning=day_data.get("morning", ""),
-                    afternoon=day_data.get("afternoon", ""),
-                    evening=day_data.get("evening", ""),
-                    food_recommendations=day_data.get("food_recommendations", ""),
-                    accommodation_info=day_data.get("accommodation_info", ""),
-                    transport_tips=day_data.get("transport_tips", ""),
-                    estimated_cost_inr=day_data.get("estimated_cost_inr", 0.0),
-                )
-                days.append(day_itinerary)
-                total_cost += day_itinerary.estimated_cost_inr
-        else:
-            raise ValidationError("Invalid itinerary response format")
-
-        # Save to database
-        itinerary = await itinerary_service.save_itinerary(
-            trip_id=trip_id,
-            destination=trip.destination,
-            duration_days=duration_days,
-            total_cost=total_cost,
-            days=days,
-            notes=f"Generated on {datetime.now().isoformat()}",
-        )
 
-        # Log action
-        history_service = get_history_service()
-        await history_service.log_action(
-            user_id=current_user_id,
-            action="GENERATE_ITINERARY",
-            entity_type="itinerary",
-            entity_id=itinerary.id,
-            details={"trip_id": trip_id, "destination": trip.destination}
-        )
+@router.post("/{trip_id}/generate-itinerary/jobs", response_model=JobResponse, status_code=202)
+async def enqueue_itinerary_generation(
+    trip_id: str,
+    fresh: bool = Query(False, description="Generate anew instead of reusing a similar or cached itinerary"),
+    current_user_id: str = Depends(get_current_user_id),
+    trip_service: TripService = Depends(get_trip_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """Queue itinerary generation for a trip; poll GET /jobs/{job_id} for the result."""
+    try:
+        await trip_service.get_trip(trip_id, current_user_id)
+        return await job_queue.enqueue(trip_id, current_user_id, fresh)
+
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    except AppException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
 
-        return itinerary
+def _sse(event: str, data: str) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {data}\n\n"
 
+
+@router.post("/{trip_id}/generate-itinerary/stream")
+async def stream_itinerary(
+    trip_id: str,
+    fresh: bool = Query(False, description="Generate anew instead of reusing a similar or cached itinerary"),
+    current_user_id: str = Depends(get_current_user_id),
+    trip_service: TripService = Depends(get_trip_service),
+):
+    """Generate itinerary for a trip, streaming each completed day as a Server-Sent Event.
+
+    Emits a ``day`` event per parsed DayItinerary, then an ``itinerary`` event
+    with the persisted ItineraryResponse, or an ``error`` event on failure.
+    """
+    try:
+        # Resolved here rather than injected so a misconfigured provider maps to a 500 below
+        generation_service = get_generation_service()
+        trip = await trip_service.get_trip(trip_id, current_user_id)
+        prepared = generation_service.prepare(trip)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Trip not found")
     except AIGenerationError as e:
         logger.error(f"AI generation error for trip {trip_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate itinerary: {str(e)}")
     except ValidationError as e:
         logger.warning(f"Validation error generating itinerary for trip {trip_id}: {e.message}")
         raise HTTPException(status_code=422, detail=e.message)
-    except NotFoundError:
-        raise HTTPException(status_code=404, detail="Trip not found")
     except Exception as e:
-        logger.exception(f"Unexpected error generating itinerary for trip {trip_id}: {str(e)}")
+        logger.exception(f"Unexpected error preparing itinerary stream for trip {trip_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+    async def event_stream():
+        days: asyncio.Queue[DayItinerary] = asyncio.Queue()
+        sent = 0
+        generation = asyncio.ensure_future(
+            generation_service.stream_itinerary(trip, current_user_id, prepared, days.put_nowait, fresh)
+        )
+        try:
+            while not generation.done() or not days.empty():
+                next_day = asyncio.ensure_future(days.get())
+                await asyncio.wait({generation, next_day}, return_when=asyncio.FIRST_COMPLETED)
+                if next_day.done():
+                    sent += 1
+                    yield _sse("day", next_day.result().model_dump_json())
+                else:
+                    next_day.cancel()
+
+            itinerary = generation.result()
+            # Days of a generation this stream joined rather than ran
+            for day in itinerary.itinerary_days[sent:]:
+                yield _sse("day", day.model_dump_json())
+            yield _sse("itinerary", itinerary.model_dump_json())
+
+        except AppException as e:
+            logger.error(f"Streaming generation error for trip {trip_id}: {e.message}")
+            yield _sse("error", json.dumps({"detail": e.message}))
+        except Exception as e:
+            logger.exception(f"Unexpected streaming error for trip {trip_id}: {str(e)}")
+            yield _sse("error", json.dumps({"detail": f"Internal Server Error: {str(e)}"}))
+        finally:
+            # The generation itself is shielded and still saves if the client went away
+            generation.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.get("/{trip_id}/itinerary", response_model=ItineraryResponse)
-async def get_itinerary(trip_id: str, current_user_id: str = Depends(get_current_user_id)):
-    """Get itinerary for a trip."""
+async def get_itinerary(
+    request: Request,
+    trip_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    itinerary_service: ItineraryService = Depends(get_itinerary_service),
+):
+    """Get the latest itinerary for a trip.
+
+    Carries a strong ETag; send it back in If-None-Match to get a 304 while
+    the trip has not been regenerated.
+    """
     try:
-        itinerary_service = get_itinerary_service()
-        itinerary = await itinerary_service.get_trip_itinerary(trip_id)
+        cached = await itinerary_service.get_trip_itinerary_body(trip_id)
 
-        if not itinerary:
+        if not cached:
             raise HTTPException(status_code=404, detail="Itinerary not found")
 
-        return itinerary
+        etag, body = cached
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
 
+    except HTTPException:
+        raise
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Itinerary not found")
     except Exception as e:
@@ -228,24 +339,44 @@ async def get_itinerary(trip_id: str, current_user_id: str = Depends(get_current
 
 
 @router.get("/user/saved-places")
-async def get_saved_places(current_user_id: str = Depends(get_current_user_id)):
-    """Get all saved places for the user."""
+async def get_saved_places(
+    request: Request,
+    limit: int = Depends(page_limit),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    itinerary_service: ItineraryService = Depends(get_itinerary_service),
+):
+    """Get the user's saved places, newest first, one page at a time."""
     try:
-        itinerary_service = get_itinerary_service()
-        places = await itinerary_service.get_user_saved_places(current_user_id)
-        return places
+        places, next_cursor = await itinerary_service.get_user_saved_places(
+            current_user_id, limit, cursor, fields
+        )
+        return conditional_json(request, places, next_cursor)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.message)
     except Exception as e:
         logger.error(f"Error fetching saved places: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch saved places")
 
 
 @router.get("/user/history")
-async def get_history(current_user_id: str = Depends(get_current_user_id)):
-    """Get user action history."""
+async def get_history(
+    request: Request,
+    limit: int = Depends(page_limit),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user_id: str = Depends(get_current_user_id),
+    history_service: HistoryService = Depends(get_history_service),
+):
+    """Get user action history, newest first, one page at a time."""
     try:
-        history_service = get_history_service()
-        history = await history_service.get_user_history(current_user_id)
-        return history
+        history, next_cursor = await history_service.get_user_history(
+            current_user_id, limit, cursor, fields
+        )
+        return conditional_json(request, history, next_cursor)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.message)
     except Exception as e:
         logger.error(f"Error fetching history: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch history")
@@ -0,0 +1,24 @@
+"""User routes."""
+
+import logging
+from fastapi import APIRouter, HTTPException, Depends
+from app.schemas import UserSummaryResponse
+from app.services.summary import SummaryService, get_summary_service
+from app.utils.auth import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+@router.get("/me/summary", response_model=UserSummaryResponse)
+async def get_my_summary(
+    current_user_id: str = Depends(get_current_user_id),
+    summary_service: SummaryService = Depends(get_summary_service),
+):
+    """Get trip count, estimated spend, upcoming trips and top destinations."""
+    try:
+        return await summary_service.get_summary(current_user_id)
+    except Exception as e:
+        logger.error(f"Get summary error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get summary")
@@ -11,6 +11,10 @@ from app.schemas.schemas import (
     GeneratedItinerary,
     ItineraryResponse,
     TripResponse,
+    JobResponse,
+    UpcomingTrip,
+    DestinationCount,
+    UserSummaryResponse,
     SavedPlace,
     ErrorResponse,
 )
@@ -26,6 +30,10 @@ __all__ = [
     "GeneratedItinerary",
     "ItineraryResponse",
     "TripResponse",
+    "JobResponse",
+    "UpcomingTrip",
+    "DestinationCount",
+    "UserSummaryResponse",
     "SavedPlace",
     "ErrorResponse",
 ]
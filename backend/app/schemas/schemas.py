@@ -115,6 +115,42 @@ class TripResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
 
+class JobResponse(BaseModel):
+    """Background generation job status."""
+    id: str
+    trip_id: str
+    status: str = Field(..., description="queued, running, succeeded, failed")
+    result: Optional[ItineraryResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+# ============ Dashboard Summary Schemas ============
+
+class UpcomingTrip(BaseModel):
+    """Upcoming trip shown on the dashboard."""
+    id: str
+    destination: str
+    start_date: str
+    end_date: str
+
+
+class DestinationCount(BaseModel):
+    """Number of trips planned to a destination."""
+    destination: str
+    trips: int
+
+
+class UserSummaryResponse(BaseModel):
+    """Precomputed per-user dashboard summary."""
+    trip_count: int = 0
+    total_estimated_cost: float = 0.0
+    upcoming_trips: List[UpcomingTrip] = []
+    top_destinations: List[DestinationCount] = []
+    updated_at: Optional[datetime] = None
+
+
 class SavedPlace(BaseModel):
     """Saved place/location."""
     id: str
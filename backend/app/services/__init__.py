@@ -1,16 +1,41 @@
 """Services module."""
 
 from app.services.ai import AIOrchestrator, get_ai_orchestrator
+from app.services.routing import RoutingProvider
+from app.services.cache import CacheBackend, MemoryCache, RedisCache, get_response_cache
 from app.services.user import UserService, get_user_service
 from app.services.trip import TripService, ItineraryService, get_trip_service, get_itinerary_service
+from app.services.generation import GenerationService, get_generation_service
+from app.services.jobs import JobQueue, get_job_queue
+from app.services.idempotency import IdempotencyService, get_idempotency_service
+from app.services.summary import SummaryService, get_summary_service
+from app.services.similarity import SimilarityIndex, get_similarity_index
+from app.services.container import ServiceContainer, lifespan
 
 __all__ = [
     "AIOrchestrator",
     "get_ai_orchestrator",
+    "RoutingProvider",
+    "CacheBackend",
+    "MemoryCache",
+    "RedisCache",
+    "get_response_cache",
     "UserService",
     "get_user_service",
     "TripService",
     "ItineraryService",
     "get_trip_service",
     "get_itinerary_service",
+    "GenerationService",
+    "get_generation_service",
+    "JobQueue",
+    "get_job_queue",
+    "IdempotencyService",
+    "get_idempotency_service",
+    "SummaryService",
+    "get_summary_service",
+    "SimilarityIndex",
+    "get_similarity_index",
+    "ServiceContainer",
+    "lifespan",
 ]
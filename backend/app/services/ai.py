@@ -1,116 +1,406 @@
 """AI Model Integration Services."""
 
+import asyncio
 import logging
 import json
-from typing import Optional
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Optional
 from abc import ABC, abstractmethod
 from app.config import get_settings
-from app.utils.errors import AIGenerationError
+from app.prompts.tokens import count_tokens
+from app.services.cache import get_response_cache, make_cache_key
+from app.services.parsing import parse_itinerary_text, strip_code_fence
+from app.services.usage import record_usage
+from app.utils.metrics import counter
+from app.utils.errors import AIGenerationError, ProviderUnavailableError, RateLimitError, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Completion token limit when the caller does not size one
+DEFAULT_MAX_TOKENS = 2048
+
+# Calls per day in parallel generation before giving up on an unparseable day
+DAY_ATTEMPTS = 2
+
+llm_tokens = counter("llm_tokens_total", "LLM tokens consumed", ("provider", "kind"))
+llm_truncated = counter("llm_truncated_total", "LLM completions cut off at max_tokens", ("provider",))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def raise_for_rate_limit(error: Exception):
+    """Re-raise a provider's HTTP 429 as RateLimitError, keeping its Retry-After."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        raise RateLimitError(
+            f"LLM provider rate limit exceeded: {str(error)}",
+            retry_after=parse_retry_after(response.headers.get("retry-after")),
+        ) from error
+
+
+def raise_for_unavailable(error: Exception):
+    """Re-raise a connection failure or provider 5xx as ProviderUnavailableError."""
+    import httpx
+
+    connection_errors: tuple[type, ...] = (httpx.TransportError,)
+    try:
+        import groq
+
+        connection_errors += (groq.APIConnectionError,)
+    except ImportError:
+        pass
+
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(error, connection_errors) or (status_code is not None and status_code >= 500):
+        raise ProviderUnavailableError(f"LLM provider unavailable: {str(error)}") from error
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Short provider name used in settings and metrics
+    name = "llm"
+
     @abstractmethod
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
-        """Generate text using the LLM."""
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Generate text using the LLM.
+
+        ``json_mode`` asks the provider to constrain output to a JSON object
+        where it supports that; the prompt must still request JSON.
+        ``max_tokens`` caps the completion (DEFAULT_MAX_TOKENS if unset).
+        """
         pass
 
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream generated text in chunks.
+
+        Providers without a streaming mode yield the full response once.
+        """
+        yield await self.generate(system_prompt, user_prompt, json_mode, max_tokens)
+
+    def record_usage(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        completion: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ):
+        """Record a call's token usage, counting locally what the provider did not report."""
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+        if completion_tokens is None:
+            completion_tokens = count_tokens(completion)
+        record_usage(prompt_tokens, completion_tokens)
+        llm_tokens.inc(prompt_tokens, provider=self.name, kind="prompt")
+        llm_tokens.inc(completion_tokens, provider=self.name, kind="completion")
+
+    def check_finish_reason(self, reason: Optional[str], max_tokens: Optional[int]):
+        """Log a completion the provider stopped because it hit max_tokens."""
+        if reason == "length":
+            llm_truncated.inc(provider=self.name)
+            logger.warning(
+                f"{self.name} completion truncated at max_tokens={max_tokens or DEFAULT_MAX_TOKENS}; "
+                "raise LLM_TOKENS_PER_DAY if this recurs"
+            )
+
+    async def close(self):
+        """Release pooled connections held by the provider."""
+        http_client = getattr(self, "http_client", None)
+        if http_client is not None:
+            await http_client.aclose()
+
+
+def build_http_client(settings, base_url: str = ""):
+    """Build a long-lived pooled async HTTP client for an LLM provider."""
+    import httpx
+
+    return httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.llm_timeout_seconds,
+            connect=settings.llm_connect_timeout_seconds,
+        ),
+    )
+
 
 class GroqProvider(LLMProvider):
     """Groq API provider."""
 
-    def __init__(self, api_key: str):
+    name = "groq"
+
+    def __init__(self, api_key: str, http_client=None):
         """Initialize Groq provider."""
         try:
             from groq import AsyncGroq
-            self.client = AsyncGroq(api_key=api_key)
+            self.http_client = http_client
+            # 429s, 5xx and connection errors are retried by RateLimitedProvider, which
+            # shares the 429 backoff across requests
+            self.client = AsyncGroq(api_key=api_key, http_client=http_client, max_retries=0)
+            self.model = "llama-3.3-70b-versatile"
             logger.info("Groq AsyncClient initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Groq: {str(e)}")
             raise AIGenerationError(f"Groq initialization failed: {str(e)}")
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def _completion_kwargs(
+        self, system_prompt: str, user_prompt: str, json_mode: bool, max_tokens: Optional[int]
+    ) -> dict:
+        kwargs = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens or DEFAULT_MAX_TOKENS,
+            "top_p": 1,
+        }
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> str:
         """Generate text using Groq API."""
         try:
-            logger.info(f"Calling Groq API with model llama-3.3-70b-versatile")
+            logger.info(f"Calling Groq API with model {self.model}")
             response = await self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.7,
-                max_tokens=2048,
-                top_p=1,
+                **self._completion_kwargs(system_prompt, user_prompt, json_mode, max_tokens)
             )
             content = response.choices[0].message.content
             logger.info("Successfully received response from Groq")
+            self.check_finish_reason(response.choices[0].finish_reason, max_tokens)
+            usage = response.usage
+            self.record_usage(
+                system_prompt,
+                user_prompt,
+                content or "",
+                usage.prompt_tokens if usage else None,
+                usage.completion_tokens if usage else None,
+            )
             return content
         except Exception as e:
             logger.exception(f"Groq generation error: {str(e)}")
+            raise_for_rate_limit(e)
+            raise_for_unavailable(e)
+            raise AIGenerationError(f"Failed to generate itinerary: {str(e)}")
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream text from Groq API as tokens arrive."""
+        try:
+            logger.info(f"Streaming from Groq API with model {self.model}")
+            stream = await self.client.chat.completions.create(
+                **self._completion_kwargs(system_prompt, user_prompt, json_mode, max_tokens),
+                stream=True,
+            )
+            chunks = []
+            usage = None
+            finish_reason = None
+            async for chunk in stream:
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and x_groq.usage is not None:
+                    usage = x_groq.usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+            self.check_finish_reason(finish_reason, max_tokens)
+            self.record_usage(
+                system_prompt,
+                user_prompt,
+                "".join(chunks),
+                usage.prompt_tokens if usage else None,
+                usage.completion_tokens if usage else None,
+            )
+        except Exception as e:
+            logger.exception(f"Groq streaming error: {str(e)}")
+            raise_for_rate_limit(e)
+            raise_for_unavailable(e)
             raise AIGenerationError(f"Failed to generate itinerary: {str(e)}")
 
 
 class HuggingFaceProvider(LLMProvider):
     """HuggingFace Inference API provider."""
 
-    def __init__(self, api_key: str):
+    name = "huggingface"
+
+    def __init__(self, api_key: str, http_client):
         """Initialize HuggingFace provider."""
         self.api_key = api_key
-        self.model_id = "mistralai/Mistral-7B-Instruct-v0.1"
+        self.model = "mistralai/Mistral-7B-Instruct-v0.1"
+        self.http_client = http_client
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
-        """Generate text using HuggingFace API."""
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Generate text using HuggingFace API (JSON output is prompt-only)."""
         try:
-            from huggingface_hub import InferenceClient
-
-            client = InferenceClient(api_key=self.api_key)
             prompt = f"{system_prompt}\n\n{user_prompt}"
 
-            response = client.text_generation(
-                prompt,
-                model=self.model_id,
-                max_new_tokens=2048,
-                temperature=0.7,
+            response = await self.http_client.post(
+                f"/models/{self.model}",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json={
+                    "inputs": prompt,
+                    "parameters": {
+                        "max_new_tokens": max_tokens or DEFAULT_MAX_TOKENS,
+                        "temperature": 0.7,
+                        "return_full_text": False,
+                    },
+                },
             )
-            return response
+            response.raise_for_status()
+            data = response.json()
+            content = data[0]["generated_text"]
+            self.record_usage(system_prompt, user_prompt, content)
+            return content
         except Exception as e:
             logger.error(f"HuggingFace generation error: {str(e)}")
+            raise_for_rate_limit(e)
+            raise_for_unavailable(e)
             raise AIGenerationError(f"Failed to generate itinerary: {str(e)}")
 
 
 class OllamaProvider(LLMProvider):
     """Ollama local model provider."""
 
-    def __init__(self, base_url: str):
+    name = "ollama"
+
+    def __init__(self, base_url: str, http_client):
         """Initialize Ollama provider."""
         self.base_url = base_url
         self.model = "mistral"  # Or your chosen model
-
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+        self.http_client = http_client
+
+    def _request_body(
+        self, system_prompt: str, user_prompt: str, stream: bool, json_mode: bool, max_tokens: Optional[int]
+    ) -> dict:
+        body = {
+            "model": self.model,
+            "prompt": f"{system_prompt}\n\n{user_prompt}",
+            "stream": stream,
+            "temperature": 0.7,
+            "options": {"num_predict": max_tokens or DEFAULT_MAX_TOKENS},
+        }
+        if json_mode:
+            body["format"] = "json"
+        return body
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> str:
         """Generate text using Ollama."""
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": f"{system_prompt}\n\n{user_prompt}",
-                        "stream": False,
-                        "temperature": 0.7,
-                    },
-                    timeout=60.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("response", "")
+            response = await self.http_client.post(
+                "/api/generate",
+                json=self._request_body(system_prompt, user_prompt, False, json_mode, max_tokens),
+            )
+            response.raise_for_status()
+            data = response.json()
+            content = data.get("response", "")
+            self.check_finish_reason(data.get("done_reason"), max_tokens)
+            self.record_usage(
+                system_prompt, user_prompt, content, data.get("prompt_eval_count"), data.get("eval_count")
+            )
+            return content
         except Exception as e:
             logger.error(f"Ollama generation error: {str(e)}")
+            raise_for_rate_limit(e)
+            raise_for_unavailable(e)
+            raise AIGenerationError(f"Failed to generate itinerary: {str(e)}")
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream text from Ollama as tokens arrive."""
+        try:
+            async with self.http_client.stream(
+                "POST",
+                "/api/generate",
+                json=self._request_body(system_prompt, user_prompt, True, json_mode, max_tokens),
+            ) as response:
+                response.raise_for_status()
+                chunks = []
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("response"):
+                        chunks.append(data["response"])
+                        yield data["response"]
+                    if data.get("done"):
+                        # The final message carries the token counts and stop reason
+                        self.check_finish_reason(data.get("done_reason"), max_tokens)
+                        self.record_usage(
+                            system_prompt,
+                            user_prompt,
+                            "".join(chunks),
+                            data.get("prompt_eval_count"),
+                            data.get("eval_count"),
+                        )
+                        break
+        except Exception as e:
+            logger.error(f"Ollama streaming error: {str(e)}")
+            raise_for_rate_limit(e)
+            raise_for_unavailable(e)
             raise AIGenerationError(f"Failed to generate itinerary: {str(e)}")
 
 
@@ -121,110 +411,211 @@ class AIOrchestrator:
         """Initialize AI orchestrator with configured provider."""
         settings = get_settings()
         self.provider = self._init_provider(settings)
+        self.cache = get_response_cache() if settings.llm_cache_enabled else None
 
     def _init_provider(self, settings) -> LLMProvider:
-        """Initialize the configured LLM provider."""
-        provider = settings.ai_provider.lower()
+        """Initialize the configured LLM provider, or a router over several."""
+        if settings.ai_providers:
+            from app.services.routing import RoutingProvider
+
+            providers = {}
+            for name in settings.ai_providers.split(","):
+                name = name.strip().lower()
+                try:
+                    providers[name] = self._build_provider(name, settings)
+                except AIGenerationError as e:
+                    logger.warning(f"Skipping LLM provider {name}: {e.message}")
+
+            return RoutingProvider(
+                providers,
+                hedge_after_seconds=settings.router_hedge_after_seconds,
+                window_size=settings.router_window_size,
+                failure_threshold=settings.router_failure_threshold,
+                cooldown_seconds=settings.router_cooldown_seconds,
+                max_error_rate=settings.router_max_error_rate,
+            )
 
+        return self._build_provider(settings.ai_provider.lower(), settings)
+
+    def _build_provider(self, provider: str, settings) -> LLMProvider:
+        """Build a single LLM provider behind its rate limiter."""
+        from app.services.ratelimit import ProviderLimiter, RateLimitedProvider
+
+        limiter = ProviderLimiter(
+            provider,
+            requests_per_minute=getattr(settings, f"{provider}_requests_per_minute", 0),
+            tokens_per_minute=getattr(settings, f"{provider}_tokens_per_minute", 0),
+            max_concurrency=getattr(settings, f"{provider}_max_concurrency", 0),
+        )
+        return RateLimitedProvider(
+            self._build_raw_provider(provider, settings),
+            limiter,
+            queue_timeout_seconds=settings.llm_queue_timeout_seconds,
+            max_retries=settings.llm_rate_limit_retries,
+            backoff_seconds=settings.llm_retry_backoff_seconds,
+        )
+
+    def _build_raw_provider(self, provider: str, settings) -> LLMProvider:
+        """Build a single LLM provider with a pooled HTTP client."""
         if provider == "groq":
             if not settings.groq_api_key:
                 raise AIGenerationError("Groq API key not configured")
-            return GroqProvider(settings.groq_api_key)
+            return GroqProvider(settings.groq_api_key, build_http_client(settings))
 
         elif provider == "huggingface":
             if not settings.huggingface_api_key:
                 raise AIGenerationError("HuggingFace API key not configured")
-            return HuggingFaceProvider(settings.huggingface_api_key)
+            return HuggingFaceProvider(
+                settings.huggingface_api_key,
+                build_http_client(settings, "https://api-inference.huggingface.co"),
+            )
 
         elif provider == "ollama":
-            return OllamaProvider(settings.ollama_base_url)
+            return OllamaProvider(
+                settings.ollama_base_url,
+                build_http_client(settings, settings.ollama_base_url),
+            )
 
         else:
             raise AIGenerationError(f"Unknown AI provider: {provider}")
 
+    async def close(self):
+        """Close the provider's pooled connections."""
+        await self.provider.close()
+
+    def build_cache_key(self, **prompt_inputs) -> str:
+        """Build a response cache key from prompt inputs and the provider/model."""
+        return make_cache_key(
+            "itinerary",
+            {
+                # Wrappers (rate limiter, router) carry the underlying provider's name and model
+                "provider": self.provider.name,
+                "model": self.provider.model,
+                "inputs": prompt_inputs,
+            },
+        )
+
     async def generate_itinerary(
         self,
         system_prompt: str,
         user_prompt: str,
+        cache_key: Optional[str] = None,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+        refresh: bool = False,
     ) -> str:
-        """Generate itinerary using the configured provider."""
+        """Generate itinerary using the configured provider.
+
+        ``refresh`` skips the response cache lookup; the new response is still cached.
+        """
+        if self.cache and cache_key and not refresh:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving itinerary from response cache ({cache_key})")
+                return cached
+
         logger.info(f"Generating itinerary with {type(self.provider).__name__}")
-        return await self.provider.generate(system_prompt, user_prompt)
+        response = await self.provider.generate(system_prompt, user_prompt, json_mode, max_tokens)
+
+        if self.cache and cache_key and response:
+            await self.cache.set(cache_key, response)
+        return response
+
+    async def generate_parallel(
+        self,
+        system_prompt: str,
+        skeleton_prompt: str,
+        build_day_prompt: Callable[[int, str], str],
+        duration_days: int,
+        concurrency: int,
+        cache_key: Optional[str] = None,
+        outline_max_tokens: Optional[int] = None,
+        day_max_tokens: Optional[int] = None,
+        refresh: bool = False,
+    ) -> str:
+        """Generate an outline, then every day's detail concurrently.
+
+        Returns the merged days as a JSON itinerary response, so latency is
+        roughly one day's generation whatever the trip length. A day whose
+        response cannot be parsed is generated again, up to DAY_ATTEMPTS
+        times; if one still fails, ValidationError is raised rather than
+        returning, or caching, an itinerary with days missing. ``refresh``
+        is as for generate_itinerary.
+        """
+        if self.cache and cache_key and not refresh:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving itinerary from response cache ({cache_key})")
+                return cached
+
+        logger.info(f"Generating {duration_days}-day outline with {type(self.provider).__name__}")
+        outline = await self.provider.generate(system_prompt, skeleton_prompt, max_tokens=outline_max_tokens)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate_day(day: int) -> dict:
+            for attempt in range(1, DAY_ATTEMPTS + 1):
+                async with semaphore:
+                    response = await self.provider.generate(
+                        system_prompt, build_day_prompt(day, outline), max_tokens=day_max_tokens
+                    )
+                parsed = self.parse_itinerary_response(response).get("days") or []
+                if parsed:
+                    return {**parsed[0], "day": day}
+                logger.warning(f"Day {day} response could not be parsed (attempt {attempt}/{DAY_ATTEMPTS})")
+            raise ValidationError(f"Day {day} of the itinerary could not be generated")
+
+        days = await asyncio.gather(*(generate_day(day) for day in range(1, duration_days + 1)))
+        response = json.dumps({"days": days})
+
+        if self.cache and cache_key:
+            await self.cache.set(cache_key, response)
+        return response
+
+    async def stream_itinerary(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        cache_key: Optional[str] = None,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+        refresh: bool = False,
+    ) -> AsyncIterator[str]:
+        """Stream itinerary text chunks using the configured provider.
+
+        ``refresh`` is as for generate_itinerary.
+        """
+        if self.cache and cache_key and not refresh:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving itinerary stream from response cache ({cache_key})")
+                yield cached
+                return
+
+        logger.info(f"Streaming itinerary with {type(self.provider).__name__}")
+        chunks = []
+        async for chunk in self.provider.stream(system_prompt, user_prompt, json_mode, max_tokens):
+            chunks.append(chunk)
+            yield chunk
+
+        response = "".join(chunks)
+        if self.cache and cache_key and response:
+            await self.cache.set(cache_key, response)
 
     def parse_itinerary_response(self, response: str) -> dict:
         """Parse LLM response into structured itinerary format."""
-        try:
-            # Try to parse as JSON first
-            return json.loads(response)
-        except json.JSONDecodeError:
-            # Otherwise, extract structured data from text
-            return self._parse_text_itinerary(response)
-
-    def _parse_text_itinerary(self, text: str) -> dict:
-        """Parse text-based itinerary into structured format."""
-        days = []
-        day_blocks = text.split("DAY")
-
-        for block in day_blocks[1:]:  # Skip first split (before first DAY)
-            lines = block.strip().split("\n")
-            if not lines:
-                continue
-
-            day_data = {
-                "day": len(days) + 1,
-                "morning": "",
-                "afternoon": "",
-                "evening": "",
-                "food_recommendations": "",
-                "accommodation_info": "",
-                "transport_tips": "",
-                "estimated_cost_inr": 0.0,
-            }
-
-            current_field = None
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
+        candidate = strip_code_fence(response)
+        if candidate.startswith("{"):
+            try:
+                # Structured (JSON mode) responses
+                parsed = json.loads(candidate)
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
 
-                if "Morning:" in line:
-                    current_field = "morning"
-                    day_data["morning"] = line.replace("Morning:", "").strip()
-                elif "Afternoon:" in line:
-                    current_field = "afternoon"
-                    day_data["afternoon"] = line.replace("Afternoon:", "").strip()
-                elif "Evening:" in line:
-                    current_field = "evening"
-                    day_data["evening"] = line.replace("Evening:", "").strip()
-                elif "Food" in line or "Recommendations" in line:
-                    current_field = "food_recommendations"
-                elif "Accommodation" in line:
-                    current_field = "accommodation_info"
-                    day_data["accommodation_info"] = line.replace("Accommodation Info:", "").strip()
-                elif "Transport" in line or "Tips" in line:
-                    current_field = "transport_tips"
-                    day_data["transport_tips"] = line.replace("Transport Tips:", "").strip()
-                elif "Estimated" in line or "Cost" in line:
-                    try:
-                        # Extract cost
-                        import re
-                        # Look for ₹ or Rs or ₹
-                        cost = re.search(r'[₹₹\$]\s?(\d+(?:\.\d{2})?)', line)
-                        if cost:
-                            day_data["estimated_cost_inr"] = float(cost.group(1))
-                    except:
-                        pass
-                elif current_field and line:
-                    day_data[current_field] += " " + line
-
-            # Clean up fields
-            for key in ["morning", "afternoon", "evening", "food_recommendations", "accommodation_info", "transport_tips"]:
-                day_data[key] = day_data[key].strip()
-
-            if any([day_data["morning"], day_data["afternoon"], day_data["evening"]]):
-                days.append(day_data)
-
-        return {"days": days}
+        # Otherwise, extract structured data from text
+        return parse_itinerary_text(response)
 
 
 # Global AI orchestrator instance
@@ -237,3 +628,11 @@ def get_ai_orchestrator() -> AIOrchestrator:
     if _ai_orchestrator is None:
         _ai_orchestrator = AIOrchestrator()
     return _ai_orchestrator
+
+
+async def close_ai_orchestrator():
+    """Close the AI orchestrator if it was initialized."""
+    global _ai_orchestrator
+    if _ai_orchestrator is not None:
+        await _ai_orchestrator.close()
+        _ai_orchestrator = None
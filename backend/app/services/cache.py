@@ -0,0 +1,184 @@
+"""Response caching for LLM generations."""
+
+import hashlib
+import json
+import logging
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+from app.config import get_settings
+from app.utils.metrics import callback
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(namespace: str, payload: dict) -> str:
+    """Build a content-addressed key from a canonical JSON encoding of payload."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+# Every live cache, for the scrape-time hit/miss metrics
+_caches: "weakref.WeakSet[CacheBackend]" = weakref.WeakSet()
+
+
+class CacheBackend(ABC):
+    """Abstract base class for string-valued caches with a TTL."""
+
+    def __init__(self, ttl_seconds: int, name: str = "cache"):
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value or None."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: Optional[int] = None):
+        """Store a value."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove a value."""
+        pass
+
+    async def close(self):
+        """Release connections held by the cache."""
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-process cache with per-entry TTL and LRU eviction.
+
+    Values are kept as-is, so unlike RedisCache it can also hold bytes or
+    tuples (e.g. an ETag with a serialized body).
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, name: str = "cache"):
+        super().__init__(ttl_seconds, name)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+
+class RedisCache(CacheBackend):
+    """Redis-backed cache shared across workers.
+
+    Entries expire via Redis TTLs; LRU eviction is delegated to the server's
+    ``maxmemory-policy`` (e.g. ``allkeys-lru``).
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int, name: str = "cache"):
+        super().__init__(ttl_seconds, name)
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis cache get failed: {str(e)}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[int] = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        try:
+            await self.client.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {str(e)}")
+
+    async def delete(self, key: str):
+        try:
+            await self.client.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed: {str(e)}")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+callback(
+    "cache_hits",
+    "Cache lookups served from the cache",
+    lambda: [({"cache": cache.name}, cache.hits) for cache in list(_caches)],
+)
+callback(
+    "cache_misses",
+    "Cache lookups that found nothing (or an expired entry)",
+    lambda: [({"cache": cache.name}, cache.misses) for cache in list(_caches)],
+)
+callback(
+    "cache_entries",
+    "Entries held by in-process caches",
+    lambda: [({"cache": cache.name}, len(cache._entries)) for cache in list(_caches) if isinstance(cache, MemoryCache)],
+)
+
+
+# Global response cache instance
+_response_cache: Optional[CacheBackend] = None
+
+
+def get_response_cache() -> CacheBackend:
+    """Get or initialize the LLM response cache."""
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        if settings.redis_url:
+            _response_cache = RedisCache(settings.redis_url, settings.llm_cache_ttl_seconds, name="llm_response")
+            logger.info("Using Redis LLM response cache")
+        else:
+            _response_cache = MemoryCache(
+                settings.llm_cache_ttl_seconds,
+                settings.llm_cache_max_entries,
+                name="llm_response",
+            )
+            logger.info("Using in-process LLM response cache")
+    return _response_cache
+
+
+async def close_response_cache():
+    """Close the LLM response cache if it was initialized."""
+    global _response_cache
+    if _response_cache is not None:
+        await _response_cache.close()
+        _response_cache = None
@@ -0,0 +1,157 @@
+"""Application-lifetime services, built at startup and closed at shutdown."""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI
+
+from app.config import Settings, get_settings
+from app.db.database import Database, init_db, close_db
+from app.services import generation, history, summary, trip, user
+from app.services.ai import close_ai_orchestrator
+from app.services.cache import get_response_cache, close_response_cache
+from app.services.generation import GenerationService, get_generation_service
+from app.services.idempotency import get_idempotency_service, close_idempotency_service
+from app.services.history import HistoryService, get_history_service, close_history_writer
+from app.services.jobs import JobQueue, get_job_queue, close_job_queue
+from app.services.similarity import SimilarityIndex, get_similarity_index
+from app.services.summary import SummaryService, get_summary_service
+from app.services.trip import TripService, ItineraryService, get_trip_service, get_itinerary_service
+from app.services.user import UserService, get_user_service
+from app.utils.auth import get_password_hasher, close_password_hasher
+from app.utils.errors import AIGenerationError
+from app.utils.profiling import startup_timer
+
+logger = logging.getLogger(__name__)
+
+# Service singletons that hold the database client; dropped once it is closed
+_SERVICE_SINGLETONS = (
+    (trip, "_trip_service"),
+    (trip, "_itinerary_service"),
+    (user, "_user_service"),
+    (summary, "_summary_service"),
+    (history, "_history_service"),
+    (generation, "_generation_service"),
+)
+
+
+class ServiceContainer:
+    """Builds every shared service once and tears them down in dependency order.
+
+    The services are the same singletons the ``get_*_service`` dependencies
+    return, so route handlers resolve them without allocating, and the
+    provider SDKs and Redis clients are imported and connected before the
+    first request rather than during it.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.db: Optional[Database] = None
+        self.user_service: Optional[UserService] = None
+        self.trip_service: Optional[TripService] = None
+        self.itinerary_service: Optional[ItineraryService] = None
+        self.history_service: Optional[HistoryService] = None
+        self.summary_service: Optional[SummaryService] = None
+        self.generation_service: Optional[GenerationService] = None
+        self.similarity_index: Optional[SimilarityIndex] = None
+        self.job_queue: Optional[JobQueue] = None
+        self.warm_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Connect clients, build services and start background workers.
+
+        Each step is timed into ``startup_timer`` for the startup profile.
+        """
+        with startup_timer.phase("database"):
+            self.db = init_db()
+        with startup_timer.phase("password hasher"):
+            get_password_hasher()
+        with startup_timer.phase("response cache"):
+            get_response_cache()
+        with startup_timer.phase("idempotency store"):
+            get_idempotency_service()
+        with startup_timer.phase("services"):
+            self.user_service = get_user_service()
+            self.trip_service = get_trip_service()
+            self.itinerary_service = get_itinerary_service()
+            self.history_service = get_history_service()
+            self.summary_service = get_summary_service()
+            self.similarity_index = get_similarity_index()
+
+        with startup_timer.phase("LLM providers"):
+            try:
+                self.generation_service = get_generation_service()
+            except AIGenerationError as e:
+                # Trips and auth still work; generation endpoints report the error
+                logger.warning(f"Itinerary generation unavailable: {e.message}")
+
+        with startup_timer.phase("workers"):
+            self.history_service.writer.start()
+            self.job_queue = get_job_queue()
+            self.job_queue.start()
+
+        if self.settings.similarity_reuse_enabled:
+            # In the background, so requests are served while it loads
+            self.warm_task = asyncio.create_task(self._warm_similarity_index())
+
+    async def _warm_similarity_index(self):
+        try:
+            await self.similarity_index.warm(
+                self.db,
+                self.settings.similarity_warm_entries,
+                self.settings.similarity_warm_batch_size,
+            )
+        except Exception as e:
+            logger.warning(f"Could not warm similarity index: {str(e)}")
+
+    async def close(self):
+        """Drain workers, flush buffered writes, then close pooled clients.
+
+        Jobs are drained first because they log history, and the history
+        writer is flushed before the database client it writes through is
+        closed.
+        """
+        if self.warm_task is not None:
+            self.warm_task.cancel()
+            await asyncio.gather(self.warm_task, return_exceptions=True)
+
+        steps = (
+            ("job queue", lambda: close_job_queue(self.settings.job_drain_timeout_seconds)),
+            ("history writer", close_history_writer),
+            ("AI providers", close_ai_orchestrator),
+            ("response cache", close_response_cache),
+            ("idempotency store", close_idempotency_service),
+            ("database", close_db),
+        )
+        for name, close in steps:
+            try:
+                await close()
+            except Exception as e:
+                logger.error(f"Error closing {name}: {str(e)}")
+
+        close_password_hasher()
+        for module, attribute in _SERVICE_SINGLETONS:
+            setattr(module, attribute, None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the service container for the life of the application."""
+    container = ServiceContainer(get_settings())
+    try:
+        await container.start()
+        logger.info("Application started successfully")
+        if container.settings.startup_profile:
+            logger.info(startup_timer.report())
+    except Exception as e:
+        logger.error(f"Startup error: {str(e)}")
+
+    app.state.services = container
+    try:
+        yield
+    finally:
+        await container.close()
+        logger.info("Application shut down")
+
@@ -0,0 +1,362 @@
+"""Itinerary generation pipeline service."""
+
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from app.config import get_settings
+from app.prompts import (
+    SYSTEM_PROMPT,
+    get_itinerary_system_prompt,
+    build_itinerary_prompt,
+    build_skeleton_prompt,
+    build_day_detail_prompt,
+    count_tokens,
+    max_output_tokens,
+    DAY_MIN_OUTPUT_TOKENS,
+    outline_max_tokens,
+)
+from app.schemas import TripResponse, ItineraryResponse, DayItinerary
+from app.services.ai import DEFAULT_MAX_TOKENS, get_ai_orchestrator
+from app.services.history import get_history_service
+from app.services.parsing import DayStreamParser
+from app.services.ratelimit import llm_caller
+from app.services.similarity import get_similarity_index
+from app.services.trip import get_trip_service, get_itinerary_service
+from app.services.usage import TokenUsage, track_usage
+from app.utils.errors import ValidationError
+from app.utils.metrics import callback, histogram, timed, timer
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Concurrent generations for the same user, trip and fresh flag share one LLM call and save
+generation_flight = SingleFlight("generate_itinerary")
+
+# Where a generation's time goes: prepare, similarity, llm, parse, save
+generation_stage_seconds = histogram(
+    "generation_stage_duration_seconds",
+    "Itinerary generation time by pipeline stage",
+    ("stage",),
+)
+callback(
+    "generation_deduplicated_total",
+    "Generations coalesced onto one already in flight",
+    lambda: [({}, generation_flight.deduplicated)],
+    "counter",
+)
+
+
+class GenerationService:
+    """Service that turns a trip into a persisted AI itinerary."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.trip_service = get_trip_service()
+        self.itinerary_service = get_itinerary_service()
+        self.ai_orchestrator = get_ai_orchestrator()
+        self.similarity_index = get_similarity_index()
+
+    @property
+    def json_mode(self) -> bool:
+        """Whether prompts request, and providers enforce, JSON output."""
+        return self.settings.llm_output_format == "json"
+
+    @property
+    def system_prompt(self) -> str:
+        """Pre-rendered instructions shared by every itinerary request."""
+        return get_itinerary_system_prompt(self.settings.llm_output_format)
+
+    def max_tokens(self, trip: TripResponse, duration_days: int) -> int:
+        """Completion token budget sized to the trip's length and pace."""
+        return max_output_tokens(
+            duration_days,
+            trip.preferences.pace,
+            self.settings.llm_output_format,
+            self.settings.llm_tokens_per_day,
+            self.settings.llm_max_output_tokens,
+            floor=DEFAULT_MAX_TOKENS,
+        )
+
+    @timed(generation_stage_seconds, stage="prepare")
+    def prepare(self, trip: TripResponse) -> tuple[str, str, int]:
+        """Build the user prompt, response cache key and duration for a trip."""
+        user_prompt = build_itinerary_prompt(
+            destination=trip.destination,
+            start_date=trip.start_date,
+            end_date=trip.end_date,
+            travel_style=trip.preferences.travel_style,
+            interests=trip.preferences.interests,
+            group_size=trip.preferences.group_size,
+            pace=trip.preferences.pace,
+            budget_per_day=trip.preferences.budget_per_day_inr,
+            dietary_restrictions=trip.preferences.dietary_restrictions,
+            mobility_concerns=trip.preferences.mobility_concerns,
+        )
+
+        # Calculate duration
+        start = datetime.strptime(trip.start_date, "%Y-%m-%d")
+        end = datetime.strptime(trip.end_date, "%Y-%m-%d")
+        duration_days = (end - start).days + 1
+
+        # Identical preferences for the same trip length share a cached response
+        cache_key = self.ai_orchestrator.build_cache_key(
+            destination=trip.destination.strip().lower(),
+            duration_days=duration_days,
+            travel_style=trip.preferences.travel_style,
+            interests=sorted(trip.preferences.interests),
+            group_size=trip.preferences.group_size,
+            pace=trip.preferences.pace,
+            budget_per_day=trip.preferences.budget_per_day_inr,
+            dietary_restrictions=sorted(trip.preferences.dietary_restrictions or []),
+            mobility_concerns=trip.preferences.mobility_concerns,
+            generation_mode=self.settings.generation_mode,
+            output_format=self.settings.llm_output_format,
+        )
+
+        logger.debug(
+            f"Prompt for trip {trip.id}: {count_tokens(self.system_prompt)} system + "
+            f"{count_tokens(user_prompt)} user tokens"
+        )
+        return user_prompt, cache_key, duration_days
+
+    @timed(generation_stage_seconds, stage="similarity")
+    def find_similar(self, trip: TripResponse, duration_days: int) -> Optional[str]:
+        """Return another trip's itinerary (as a JSON response) close enough to reuse."""
+        if not self.settings.similarity_reuse_enabled:
+            return None
+        return self.similarity_index.find(trip.id, trip.destination, duration_days, trip.preferences)
+
+    def build_day(self, day_data: dict, position: int, trip: TripResponse) -> DayItinerary:
+        """Create a DayItinerary from parsed day data."""
+        return DayItinerary(
+            day=day_data.get("day", position),
+            date=trip.start_date,  # Would be computed in real scenario
+            morning=day_data.get("morning", ""),
+            afternoon=day_data.get("afternoon", ""),
+            evening=day_data.get("evening", ""),
+            food_recommendations=day_data.get("food_recommendations", ""),
+            accommodation_info=day_data.get("accommodation_info", ""),
+            transport_tips=day_data.get("transport_tips", ""),
+            estimated_cost_inr=day_data.get("estimated_cost_inr", 0.0),
+        )
+
+    @timed(generation_stage_seconds, stage="parse")
+    def build_days(self, response_text: str, trip: TripResponse) -> list[DayItinerary]:
+        """Parse a full LLM response into DayItinerary objects."""
+        parsed = self.ai_orchestrator.parse_itinerary_response(response_text)
+
+        if "days" not in parsed:
+            raise ValidationError("Invalid itinerary response format")
+
+        return [
+            self.build_day(day_data, position, trip)
+            for position, day_data in enumerate(parsed["days"], start=1)
+        ]
+
+    @timed(generation_stage_seconds, stage="save")
+    async def save(
+        self,
+        trip: TripResponse,
+        duration_days: int,
+        days: list[DayItinerary],
+        user_id: str,
+        usage: Optional[TokenUsage] = None,
+    ) -> ItineraryResponse:
+        """Persist a generated itinerary and log the action with its token usage."""
+        total_cost = sum(day.estimated_cost_inr for day in days)
+
+        # Save to database
+        itinerary = await self.itinerary_service.save_itinerary(
+            trip_id=trip.id,
+            destination=trip.destination,
+            duration_days=duration_days,
+            total_cost=total_cost,
+            days=days,
+            notes=f"Generated on {datetime.now().isoformat()}",
+            user_id=trip.user_id,
+        )
+        if self.settings.similarity_reuse_enabled:
+            self.similarity_index.add(trip.id, trip.destination, duration_days, trip.preferences, days)
+
+        details = {"trip_id": trip.id, "destination": trip.destination}
+        if usage is not None:
+            logger.info(
+                f"Itinerary for trip {trip.id} used {usage.prompt_tokens} prompt and "
+                f"{usage.completion_tokens} completion tokens over {usage.calls} LLM calls"
+            )
+            details.update(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+        # Log action
+        history_service = get_history_service()
+        await history_service.log_action(
+            user_id=user_id,
+            action="GENERATE_ITINERARY",
+            entity_type="itinerary",
+            entity_id=itinerary.id,
+            details=details,
+        )
+
+        return itinerary
+
+    async def generate_itinerary(
+        self,
+        trip_id: str,
+        user_id: str,
+        trip: Optional[TripResponse] = None,
+        fresh: bool = False,
+    ) -> ItineraryResponse:
+        """Generate, parse and persist an itinerary for a trip.
+
+        Concurrent calls for the same user, trip and ``fresh`` are coalesced.
+        ``fresh`` calls the LLM even when a similar itinerary or cached
+        response exists.
+        """
+        return await generation_flight.do(
+            f"{user_id}:{trip_id}:{fresh}",
+            lambda: self._generate_itinerary(trip_id, user_id, trip, fresh),
+        )
+
+    async def _generate_itinerary(
+        self,
+        trip_id: str,
+        user_id: str,
+        trip: Optional[TripResponse],
+        fresh: bool,
+    ) -> ItineraryResponse:
+        if trip is None:
+            trip = await self.trip_service.get_trip(trip_id, user_id)
+
+        user_prompt, cache_key, duration_days = self.prepare(trip)
+
+        with track_usage() as usage, llm_caller(user_id):
+            response_text = None if fresh else self.find_similar(trip, duration_days)
+            if response_text is None:
+                logger.info(f"Generating itinerary for trip {trip_id}")
+                with timer(generation_stage_seconds, stage="llm"):
+                    if self.settings.generation_mode == "parallel":
+                        response_text = await self._generate_parallel(trip, duration_days, cache_key, fresh)
+                    else:
+                        response_text = await self.ai_orchestrator.generate_itinerary(
+                            self.system_prompt,
+                            user_prompt,
+                            cache_key=cache_key,
+                            json_mode=self.json_mode,
+                            max_tokens=self.max_tokens(trip, duration_days),
+                            refresh=fresh,
+                        )
+
+        days = self.build_days(response_text, trip)
+        return await self.save(trip, duration_days, days, user_id, usage)
+
+    async def stream_itinerary(
+        self,
+        trip: TripResponse,
+        user_id: str,
+        prepared: tuple[str, str, int],
+        on_day: Callable[[DayItinerary], None],
+        fresh: bool = False,
+    ) -> ItineraryResponse:
+        """Generate and persist an itinerary, calling on_day as each day streams in.
+
+        Shares generate_itinerary's flight for the user and trip, so a
+        blocking generation or job for the trip joins a stream in flight. A
+        stream that joins a blocking generation gets no on_day calls; its
+        days come with the returned itinerary. ``fresh`` is as for
+        generate_itinerary.
+        """
+        return await generation_flight.do(
+            f"{user_id}:{trip.id}:{fresh}",
+            lambda: self._stream_itinerary(trip, user_id, prepared, on_day, fresh),
+        )
+
+    async def _stream_itinerary(
+        self,
+        trip: TripResponse,
+        user_id: str,
+        prepared: tuple[str, str, int],
+        on_day: Callable[[DayItinerary], None],
+        fresh: bool,
+    ) -> ItineraryResponse:
+        user_prompt, cache_key, duration_days = prepared
+        parser = DayStreamParser()
+        chunks = []
+
+        with track_usage() as usage, llm_caller(user_id):
+            response_text = None if fresh else self.find_similar(trip, duration_days)
+            if response_text is None:
+                logger.info(f"Streaming itinerary for trip {trip.id}")
+                with timer(generation_stage_seconds, stage="llm"):
+                    async for chunk in self.ai_orchestrator.stream_itinerary(
+                        self.system_prompt,
+                        user_prompt,
+                        cache_key=cache_key,
+                        json_mode=self.json_mode,
+                        max_tokens=self.max_tokens(trip, duration_days),
+                        refresh=fresh,
+                    ):
+                        chunks.append(chunk)
+                        for day_data in parser.feed(chunk):
+                            on_day(self.build_day(day_data, len(parser.days), trip))
+                response_text = "".join(chunks)
+
+        # The full response is authoritative (it may also be JSON)
+        days = self.build_days(response_text, trip)
+        for day in days[len(parser.days):]:
+            on_day(day)
+
+        return await self.save(trip, duration_days, days, user_id, usage)
+
+    async def _generate_parallel(self, trip: TripResponse, duration_days: int, cache_key: str, fresh: bool) -> str:
+        """Generate a trip outline, then each day's detail concurrently."""
+        preferences = trip.preferences
+        profile = dict(
+            travel_style=preferences.travel_style,
+            interests=preferences.interests,
+            group_size=preferences.group_size,
+            pace=preferences.pace,
+            budget_per_day=preferences.budget_per_day_inr,
+            dietary_restrictions=preferences.dietary_restrictions,
+            mobility_concerns=preferences.mobility_concerns,
+        )
+        skeleton_prompt = build_skeleton_prompt(
+            destination=trip.destination,
+            start_date=trip.start_date,
+            end_date=trip.end_date,
+            **profile,
+        )
+
+        return await self.ai_orchestrator.generate_parallel(
+            SYSTEM_PROMPT,
+            skeleton_prompt,
+            lambda day, outline: build_day_detail_prompt(day, outline, trip.destination, **profile),
+            duration_days,
+            concurrency=self.settings.parallel_day_concurrency,
+            cache_key=cache_key,
+            refresh=fresh,
+            outline_max_tokens=outline_max_tokens(duration_days),
+            day_max_tokens=max_output_tokens(
+                1,
+                preferences.pace,
+                "text",
+                self.settings.llm_tokens_per_day,
+                self.settings.llm_max_output_tokens,
+                floor=DAY_MIN_OUTPUT_TOKENS,
+            ),
+        )
+
+
+# Global generation service instance
+_generation_service: Optional[GenerationService] = None
+
+
+def get_generation_service() -> GenerationService:
+    """Get or initialize the generation service.
+
+    Raises AIGenerationError if no LLM provider is configured; nothing is
+    cached then, so a later call can retry.
+    """
+    global _generation_service
+    if _generation_service is None:
+        _generation_service = GenerationService()
+    return _generation_service
@@ -1,16 +1,146 @@
 """History and audit log service."""
 
+import asyncio
 import logging
 from typing import Optional, Dict, Any
+from app.config import get_settings
 from app.db.database import get_db
+from app.utils.metrics import callback
+from app.utils.pagination import keyset_page, select_columns, split_page
 
 logger = logging.getLogger(__name__)
 
+HISTORY_FIELDS = ("id", "user_id", "action", "entity_type", "entity_id", "details", "created_at")
+
+
+class HistoryWriter:
+    """Bounded in-process queue of history rows, bulk-inserted in the background.
+
+    A batch is written once it reaches ``batch_size`` rows or its first row
+    has waited ``flush_interval`` seconds. When the queue is full new rows
+    are dropped and counted rather than slowing down the request.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_size: int):
+        self.db = get_db()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_size)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._batch: list[dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+
+    def start(self):
+        """Start the background flusher if it is not running."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, row: dict) -> bool:
+        """Queue a row without waiting; returns False if it was dropped."""
+        self.start()
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"History queue full; dropped {row['action']} ({self.dropped} dropped so far)")
+            return False
+
+    async def flush(self):
+        """Write every queued row now, after any batch already being inserted."""
+        if self._writing is not None:
+            # Shielded so a cancelled reader cannot cancel the flusher's insert
+            await asyncio.gather(asyncio.shield(self._writing), return_exceptions=True)
+        while not self.queue.empty():
+            self._batch.append(self.queue.get_nowait())
+        await self._write()
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._writing is not None:
+            # Let a batch that was mid-insert when the flusher was cancelled finish
+            await asyncio.gather(self._writing, return_exceptions=True)
+            self._writing = None
+        await self.flush()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch.append(await self.queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Shielded so stopping the flusher cannot drop a batch already taken off the queue
+            self._writing = asyncio.ensure_future(self._write())
+            await asyncio.shield(self._writing)
+
+    async def _write(self):
+        batch, self._batch = self._batch, []
+        client = self.db.get_service_client()
+        for start in range(0, len(batch), self.batch_size):
+            rows = batch[start:start + self.batch_size]
+            try:
+                await client.table("history").insert(rows).execute()
+                self.written += len(rows)
+            except Exception as e:
+                self.failed += len(rows)
+                logger.error(f"Failed to log history batch of {len(rows)}: {str(e)}")
+
+
+# Global history writer instance
+_history_writer: Optional[HistoryWriter] = None
+
+callback(
+    "history_rows_total",
+    "Audit history rows by outcome",
+    lambda: [
+        ({"outcome": outcome}, getattr(_history_writer, outcome))
+        for outcome in ("written", "dropped", "failed")
+    ] if _history_writer is not None else [],
+    "counter",
+)
+
+
+def get_history_writer() -> HistoryWriter:
+    """Get or initialize the background history writer."""
+    global _history_writer
+    if _history_writer is None:
+        settings = get_settings()
+        _history_writer = HistoryWriter(
+            batch_size=settings.history_batch_size,
+            flush_interval=settings.history_flush_interval_seconds,
+            max_size=settings.history_queue_size,
+        )
+    return _history_writer
+
+
+async def close_history_writer():
+    """Flush pending history rows and stop the writer."""
+    global _history_writer
+    if _history_writer is not None:
+        await _history_writer.stop()
+        _history_writer = None
+
+
 class HistoryService:
     """Service for managing user action history."""
 
     def __init__(self):
         self.db = get_db()
+        self.writer = get_history_writer()
 
     async def log_action(
         self,
@@ -20,34 +150,49 @@ class HistoryService:
         entity_id: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None
     ):
-        """Log a user action to the history table."""
-        try:
-            client = self.db.get_service_client()
-            
-            history_data = {
-                "user_id": user_id,
-                "action": action,
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "details": details or {}
-            }
-            
-            client.table("history").insert(history_data).execute()
-        except Exception as e:
-            logger.error(f"Failed to log history: {str(e)}")
+        """Queue a user action for the history table; written in the background."""
+        self.writer.submit({
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": details or {}
+        })
 
-    async def get_user_history(self, user_id: str):
+    async def get_user_history(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """Get one page of a user's history, newest first, and the next cursor."""
+        query = keyset_page(
+            self.db.get_service_client()
+            .table("history")
+            .select(select_columns(fields, HISTORY_FIELDS))
+            .eq("user_id", user_id),
+            limit,
+            cursor,
+        )
         try:
-            client = self.db.get_service_client()
-            response = client.table("history")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .order("created_at", desc=True)\
-                .execute()
-            return response.data
+            # Make the caller's own recent actions visible, including a batch mid-insert
+            if cursor is None:
+                await self.writer.flush()
+
+            response = await query.execute()
+            return split_page(response.data, limit)
         except Exception as e:
             logger.error(f"Failed to fetch history: {str(e)}")
-            return []
+            return [], None
+
+# Global history service instance
+_history_service: Optional[HistoryService] = None
+
 
 def get_history_service() -> HistoryService:
-    return HistoryService()
+    """Get or initialize the history service."""
+    global _history_service
+    if _history_service is None:
+        _history_service = HistoryService()
+    return _history_service
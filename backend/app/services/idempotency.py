@@ -0,0 +1,284 @@
+"""Idempotency-Key handling for mutating endpoints."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import Response
+from app.config import get_settings
+from app.utils.errors import ConflictError, ValidationError
+from app.utils.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# How often a replay waiting on another worker re-reads the store
+POLL_INTERVAL_SECONDS = 0.2
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Hash of what identifies a request, to spot a key reused for a different one."""
+    return hashlib.sha256(dumps(parts)).hexdigest()
+
+
+class IdempotencyStoreError(Exception):
+    """The idempotency store could not be reached."""
+
+
+class IdempotencyStore(ABC):
+    """Abstract base class for recorded responses keyed by idempotency key.
+
+    A record is ``{"state": "pending" | "done", "fingerprint", "status_code",
+    "body"}``; pending records mark a request still in progress. Stores
+    raise IdempotencyStoreError when their backend is unreachable.
+    """
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    @abstractmethod
+    async def claim(self, key: str, record: dict) -> Optional[dict]:
+        """Store a pending record for key unless one exists.
+
+        Returns the existing record instead if there is one. Pending records
+        expire after ``lock_seconds`` so a crashed worker cannot hold a key.
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        """Return the record for key."""
+        pass
+
+    @abstractmethod
+    async def save(self, key: str, record: dict):
+        """Store a finished record for ``ttl_seconds``."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Forget key so the request can be retried."""
+        pass
+
+    async def close(self):
+        """Release connections held by the store."""
+        pass
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """In-process idempotency store; records expire after the TTL."""
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int):
+        super().__init__(ttl_seconds, lock_seconds)
+        self._records: dict[str, tuple[float, dict]] = {}
+
+    async def claim(self, key: str, record: dict) -> Optional[dict]:
+        existing = await self.get(key)
+        if existing is not None:
+            return existing
+        self._put(key, record, self.lock_seconds)
+        return None
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._records.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    async def save(self, key: str, record: dict):
+        self._put(key, record, self.ttl_seconds)
+
+    async def delete(self, key: str):
+        self._records.pop(key, None)
+
+    def _put(self, key: str, record: dict, ttl_seconds: int):
+        now = time.monotonic()
+        self._records[key] = (now + ttl_seconds, dict(record))
+        for expired in [k for k, (expires_at, _) in self._records.items() if expires_at < now]:
+            del self._records[expired]
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Redis-backed idempotency store shared across workers."""
+
+    def __init__(self, redis_url: str, ttl_seconds: int, lock_seconds: int):
+        super().__init__(ttl_seconds, lock_seconds)
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(redis_url, decode_responses=True)
+        self.errors = redis.RedisError
+
+    @contextmanager
+    def _available(self):
+        try:
+            yield
+        except self.errors as e:
+            raise IdempotencyStoreError(str(e)) from e
+
+    async def claim(self, key: str, record: dict) -> Optional[dict]:
+        with self._available():
+            while not await self.client.set(f"idempotency:{key}", json.dumps(record), nx=True, ex=self.lock_seconds):
+                existing = await self.get(key)
+                if existing is not None:
+                    return existing
+        return None
+
+    async def get(self, key: str) -> Optional[dict]:
+        with self._available():
+            value = await self.client.get(f"idempotency:{key}")
+        return json.loads(value) if value else None
+
+    async def save(self, key: str, record: dict):
+        with self._available():
+            await self.client.set(f"idempotency:{key}", json.dumps(record), ex=self.ttl_seconds)
+
+    async def delete(self, key: str):
+        with self._available():
+            await self.client.delete(f"idempotency:{key}")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class IdempotencyService:
+    """Runs a request handler at most once per idempotency key.
+
+    The first request with a key runs the handler and, if it succeeds,
+    records its JSON body; later requests with the same key get the
+    recorded response back, marked with ``Idempotent-Replayed: true``. A
+    replay that arrives while the first request is still running waits for
+    it, up to ``wait_seconds``, then gets a 409. Errors are not recorded,
+    so retrying them does the work again: the services report database
+    failures as 404 or 422 too, so a 4xx is not necessarily final.
+
+    The handler runs in its own task, as in SingleFlight, so a client that
+    disconnects does not cancel work its retry is about to replay. If the
+    store is unreachable the request still runs, without replay protection.
+    """
+
+    def __init__(self, store: IdempotencyStore, wait_seconds: float):
+        self.store = store
+        self.wait_seconds = wait_seconds
+        self.replayed = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def run(
+        self,
+        idempotency_key: Optional[str],
+        scope: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the handler's result, or the response recorded for the key.
+
+        ``scope`` namespaces the key, e.g. by user and endpoint. Without a key
+        the handler is simply awaited.
+        """
+        if idempotency_key is None:
+            return await handler()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            raise ValidationError(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+        key = f"{scope}:{idempotency_key}"
+        try:
+            return await self._run(key, fingerprint, handler)
+        except IdempotencyStoreError as e:
+            logger.warning(f"Idempotency store unavailable, running request without replay protection: {str(e)}")
+            return await handler()
+
+    async def _run(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> Any:
+        deadline = time.monotonic() + self.wait_seconds
+        pending = {"state": "pending", "fingerprint": fingerprint}
+
+        while True:
+            record = await self.store.claim(key, pending)
+            if record is None:
+                task = asyncio.create_task(self._execute(key, fingerprint, handler))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._finish(key, done))
+                return await asyncio.shield(task)
+
+            if record["fingerprint"] != fingerprint:
+                raise ValidationError("Idempotency-Key was already used for a different request")
+
+            while record is not None and record["state"] == "pending":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ConflictError("A request with this Idempotency-Key is still in progress")
+                task = self._inflight.get(key)
+                if task is not None:
+                    await asyncio.wait({task}, timeout=remaining)
+                else:
+                    # Held by another worker
+                    await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+                record = await self.store.get(key)
+
+            if record is not None:
+                self.replayed += 1
+                logger.info(f"Replaying recorded response for idempotency key {key}")
+                return Response(
+                    record["body"],
+                    status_code=record["status_code"],
+                    media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"},
+                )
+            # The first request failed and released the key; run it again
+
+    async def _execute(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> Response:
+        # Store errors from here on are only logged: the handler has run
+        try:
+            result = await handler()
+        except BaseException:
+            try:
+                await self.store.delete(key)
+            except IdempotencyStoreError as e:
+                logger.warning(f"Could not release idempotency key {key}: {str(e)}")
+            raise
+
+        body = dumps(result)
+        record = {"state": "done", "fingerprint": fingerprint, "status_code": 200, "body": body.decode()}
+        try:
+            await self.store.save(key, record)
+        except IdempotencyStoreError as e:
+            logger.warning(f"Could not record response for idempotency key {key}: {str(e)}")
+        return Response(body, media_type="application/json")
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+
+# Global idempotency service instance
+_idempotency_service: Optional[IdempotencyService] = None
+
+
+def get_idempotency_service() -> IdempotencyService:
+    """Get or initialize the idempotency service."""
+    global _idempotency_service
+    if _idempotency_service is None:
+        settings = get_settings()
+        if settings.redis_url:
+            store = RedisIdempotencyStore(
+                settings.redis_url, settings.idempotency_ttl_seconds, settings.idempotency_lock_seconds
+            )
+        else:
+            store = MemoryIdempotencyStore(settings.idempotency_ttl_seconds, settings.idempotency_lock_seconds)
+        _idempotency_service = IdempotencyService(store, settings.idempotency_wait_seconds)
+    return _idempotency_service
+
+
+async def close_idempotency_service():
+    """Close the idempotency store."""
+    global _idempotency_service
+    if _idempotency_service is not None:
+        await _idempotency_service.store.close()
+        _idempotency_service = None
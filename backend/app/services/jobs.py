@@ -0,0 +1,276 @@
+"""Background job queue for itinerary generation."""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from app.config import get_settings
+from app.services.generation import get_generation_service
+from app.utils.errors import AppException
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str, str, bool], Awaitable[dict]]
+
+
+class JobStore(ABC):
+    """Abstract base class for job state storage."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Return a job by id."""
+        pass
+
+    @abstractmethod
+    async def save(self, job: dict):
+        """Create or update a job."""
+        pass
+
+    @abstractmethod
+    async def claim_trip(self, trip_id: str, job_id: str) -> Optional[str]:
+        """Mark job_id as the active job for a trip.
+
+        Returns the id of an already active job instead if there is one.
+        """
+        pass
+
+    @abstractmethod
+    async def release_trip(self, trip_id: str, job_id: str):
+        """Clear the active job for a trip if it is still job_id."""
+        pass
+
+    async def close(self):
+        """Release connections held by the store."""
+        pass
+
+
+class MemoryJobStore(JobStore):
+    """In-process job store; finished jobs expire after the TTL."""
+
+    def __init__(self, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self._jobs: dict[str, tuple[float, dict]] = {}
+        self._active: dict[str, str] = {}
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        entry = self._jobs.get(job_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    async def save(self, job: dict):
+        now = time.monotonic()
+        self._jobs[job["id"]] = (now + self.ttl_seconds, dict(job))
+        for job_id in [k for k, (expires_at, _) in self._jobs.items() if expires_at < now]:
+            del self._jobs[job_id]
+
+    async def claim_trip(self, trip_id: str, job_id: str) -> Optional[str]:
+        existing = self._active.get(trip_id)
+        if existing is not None:
+            return existing
+        self._active[trip_id] = job_id
+        return None
+
+    async def release_trip(self, trip_id: str, job_id: str):
+        if self._active.get(trip_id) == job_id:
+            del self._active[trip_id]
+
+
+class RedisJobStore(JobStore):
+    """Redis-backed job store shared across workers.
+
+    Redis errors are raised as a 503 AppException, so an unreachable Redis
+    gives clients a clear retryable error rather than a 500.
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(redis_url, decode_responses=True)
+        self.errors = redis.RedisError
+
+    @contextmanager
+    def _available(self):
+        try:
+            yield
+        except self.errors as e:
+            logger.error(f"Redis job store error: {str(e)}")
+            raise AppException("Job store is unavailable, try again shortly", "JOB_STORE_UNAVAILABLE", 503) from e
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        with self._available():
+            value = await self.client.get(f"jobs:{job_id}")
+        return json.loads(value) if value else None
+
+    async def save(self, job: dict):
+        with self._available():
+            await self.client.set(f"jobs:{job['id']}", json.dumps(job), ex=self.ttl_seconds)
+
+    async def claim_trip(self, trip_id: str, job_id: str) -> Optional[str]:
+        key = f"jobs:trip:{trip_id}"
+        with self._available():
+            while not await self.client.set(key, job_id, nx=True, ex=self.ttl_seconds):
+                existing = await self.client.get(key)
+                if existing is not None:
+                    return existing
+        return None
+
+    async def release_trip(self, trip_id: str, job_id: str):
+        key = f"jobs:trip:{trip_id}"
+        with self._available():
+            if await self.client.get(key) == job_id:
+                await self.client.delete(key)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed pool of worker tasks.
+
+    Requests for a trip that already has a queued or running job coalesce
+    onto that job.
+    """
+
+    def __init__(self, handler: JobHandler, store: JobStore, workers: int, max_size: int):
+        self.handler = handler
+        self.store = store
+        self.workers = workers
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_size)
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        """Start the worker pool if it is not running."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Started {self.workers} generation workers")
+
+    async def stop(self, drain_timeout: float = 30.0):
+        """Wait for queued jobs to finish, then stop the workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stopping workers with {self.queue.qsize()} jobs still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, trip_id: str, user_id: str, fresh: bool = False) -> dict:
+        """Queue a generation job for a trip, or return the one already active."""
+        self.start()
+
+        job_id = str(uuid.uuid4())
+        existing_id = await self.store.claim_trip(trip_id, job_id)
+        if existing_id is not None:
+            existing = await self.store.get(existing_id)
+            if existing is not None:
+                logger.info(f"Coalesced generation request for trip {trip_id} onto job {existing_id}")
+                return existing
+            await self.store.release_trip(trip_id, existing_id)
+            return await self.enqueue(trip_id, user_id, fresh)
+
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            "id": job_id,
+            "trip_id": trip_id,
+            "user_id": user_id,
+            "fresh": fresh,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.store.save(job)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            job["status"] = "failed"
+            job["error"] = "Generation queue is full"
+            await self.store.save(job)
+            await self.store.release_trip(trip_id, job_id)
+            raise AppException("Generation queue is full, try again shortly", "QUEUE_FULL", 503)
+
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Get a job by id."""
+        return await self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Job state could not be stored; keep the worker alive for the next job
+                logger.error(f"Generation job {job['id']} could not be recorded: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: dict):
+        job["status"] = "running"
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+        await self.store.save(job)
+
+        try:
+            job["result"] = await self.handler(job["trip_id"], job["user_id"], job.get("fresh", False))
+            job["status"] = "succeeded"
+        except Exception as e:
+            logger.error(f"Generation job {job['id']} failed: {str(e)}")
+            job["status"] = "failed"
+            job["error"] = e.message if isinstance(e, AppException) else str(e)
+        finally:
+            job["updated_at"] = datetime.now(timezone.utc).isoformat()
+            await self.store.save(job)
+            await self.store.release_trip(job["trip_id"], job["id"])
+
+
+async def _generate_itinerary_job(trip_id: str, user_id: str, fresh: bool) -> dict:
+    """Run the generation pipeline and return the itinerary as JSON data."""
+    itinerary = await get_generation_service().generate_itinerary(trip_id, user_id, fresh=fresh)
+    return itinerary.model_dump(mode="json")
+
+
+# Global job queue instance
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get or initialize the generation job queue."""
+    global _job_queue
+    if _job_queue is None:
+        settings = get_settings()
+        if settings.redis_url:
+            store = RedisJobStore(settings.redis_url, settings.job_ttl_seconds)
+        else:
+            store = MemoryJobStore(settings.job_ttl_seconds)
+        _job_queue = JobQueue(
+            handler=_generate_itinerary_job,
+            store=store,
+            workers=settings.job_workers,
+            max_size=settings.job_queue_size,
+        )
+    return _job_queue
+
+
+async def close_job_queue(drain_timeout: float = 30.0):
+    """Finish queued jobs, stop the workers and close the job store."""
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop(drain_timeout)
+        await _job_queue.store.close()
+        _job_queue = None
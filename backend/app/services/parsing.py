@@ -0,0 +1,142 @@
+"""Parsers for LLM itinerary responses."""
+
+import re
+from typing import Optional
+
+# Day markers ("DAY 3: 2024-03-17", "**Day 3**") and labelled fields
+# ("Morning: ...", "- **Transport Tips:** ..."), anchored at line starts
+# with any leading Markdown decoration skipped.
+TOKEN = re.compile(
+    r"^[ \t#*>|_-]*(?:"
+    r"(?P<day>DAY[ \t]*\d+\b)"
+    r"|(?P<label>Morning|Afternoon|Evening|Food(?: Recommendations?)?|Accommodation(?: Info)?"
+    r"|Transport(?: Tips)?|Estimated(?: Daily)? Cost)"
+    r"[ \t]*\**[ \t]*:[ \t]*\**)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+DAY_MARKER = re.compile(r"^[ \t#*>|_-]*DAY[ \t]*\d+\b", re.IGNORECASE | re.MULTILINE)
+
+COST = re.compile(r"(?:₹|\$|Rs\.?|INR)[ \t]?(\d[\d,]*(?:\.\d+)?)")
+
+SEPARATOR = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+
+CODE_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+# Keyed by the label's first four letters, lowercased
+FIELDS = {
+    "morn": "morning",
+    "afte": "afternoon",
+    "even": "evening",
+    "food": "food_recommendations",
+    "acco": "accommodation_info",
+    "tran": "transport_tips",
+    "esti": "estimated_cost_inr",
+}
+
+TEXT_FIELDS = (
+    "morning",
+    "afternoon",
+    "evening",
+    "food_recommendations",
+    "accommodation_info",
+    "transport_tips",
+)
+
+
+def _field_text(value: str) -> str:
+    """Join a field's value and continuation lines, dropping separators."""
+    value = value.strip()
+    if "\n" not in value:
+        return "" if value[:1] in "-*_" and SEPARATOR.match(value) else value
+    lines = (line.strip() for line in value.splitlines())
+    return " ".join(line for line in lines if line and not SEPARATOR.match(line))
+
+
+def _close_day(day_data: Optional[dict], days: list[dict]):
+    """Append a finished day if it has any activity, numbering it by position."""
+    if day_data is None:
+        return
+    if not (day_data["morning"] or day_data["afternoon"] or day_data["evening"]):
+        return
+    day_data["day"] = len(days) + 1
+    days.append(day_data)
+
+
+def parse_days(text: str, days: list[dict]) -> list[dict]:
+    """Tokenize DAY-block text in one pass, appending parsed days to ``days``.
+
+    The regex engine finds every marker and label; the text between two
+    tokens is the value of the first, so lines are never re-scanned.
+    """
+    tokens = list(TOKEN.finditer(text))
+    ends = [token.start() for token in tokens[1:]] + [len(text)]
+    day_data: Optional[dict] = None
+
+    for token, end in zip(tokens, ends):
+        if token.lastgroup == "day":
+            _close_day(day_data, days)
+            day_data = dict.fromkeys(TEXT_FIELDS, "")
+            day_data["estimated_cost_inr"] = 0.0
+            continue
+        if day_data is None:
+            continue
+
+        field = FIELDS[token.group("label")[:4].lower()]
+        value = text[token.end():end]
+        if field == "estimated_cost_inr":
+            cost = COST.search(value.split("\n", 1)[0])
+            if cost:
+                day_data[field] = float(cost.group(1).replace(",", ""))
+        else:
+            day_data[field] = _field_text(value)
+
+    _close_day(day_data, days)
+    return days
+
+
+def parse_itinerary_text(text: str) -> dict:
+    """Parse a DAY-block text itinerary into {"days": [...]}."""
+    return {"days": parse_days(text, [])}
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a surrounding Markdown code fence, if any."""
+    return CODE_FENCE.sub("", text.strip())
+
+
+class DayStreamParser:
+    """Incrementally parse streamed itinerary text into completed days.
+
+    A day is complete once the next day marker line arrives, so the final
+    day is left to the full-response parse when the stream ends. Only newly
+    completed lines are scanned, and finished text is dropped from the
+    buffer.
+    """
+
+    def __init__(self):
+        self.days: list[dict] = []
+        self._buffer = ""
+        self._scanned = 0
+        self._block_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Add a chunk of text and return any days it completed."""
+        self._buffer += chunk
+        complete = self._buffer.rfind("\n") + 1
+        if complete <= self._scanned:
+            return []
+
+        parsed = len(self.days)
+        for marker in DAY_MARKER.finditer(self._buffer, self._scanned, complete):
+            if self._block_start is not None:
+                parse_days(self._buffer[self._block_start:marker.start()], self.days)
+            self._block_start = marker.start()
+
+        # Keep only the current day block (or nothing, before the first day)
+        keep_from = complete if self._block_start is None else self._block_start
+        self._buffer = self._buffer[keep_from:]
+        self._scanned = complete - keep_from
+        if self._block_start is not None:
+            self._block_start = 0
+        return self.days[parsed:]
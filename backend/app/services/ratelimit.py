@@ -0,0 +1,358 @@
+"""Per-provider admission control and 429 backoff for LLM calls."""
+
+import asyncio
+import logging
+import random
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional
+
+from app.prompts.tokens import count_tokens
+from app.services.ai import DEFAULT_MAX_TOKENS, LLMProvider
+from app.utils.errors import AIGenerationError, ProviderUnavailableError, RateLimitError
+from app.utils.metrics import callback, counter, histogram, timer
+
+logger = logging.getLogger(__name__)
+
+llm_request_seconds = histogram(
+    "llm_request_duration_seconds",
+    "LLM provider call latency (streams: until the last chunk)",
+    ("provider", "outcome"),
+)
+llm_queue_seconds = histogram(
+    "llm_queue_wait_seconds",
+    "Time LLM calls waited for provider quota or a concurrency slot",
+    ("provider",),
+)
+llm_errors = counter("llm_errors_total", "Failed LLM provider calls", ("provider", "error"))
+
+# Every live limiter, for the scrape-time queue gauges
+_limiters: "weakref.WeakSet[ProviderLimiter]" = weakref.WeakSet()
+
+# User on whose behalf LLM calls in this context are made
+_caller: ContextVar[str] = ContextVar("llm_caller", default="anonymous")
+
+
+@contextmanager
+def observe_call(provider: str) -> Iterator[None]:
+    """Time one provider call by outcome and count its failures by error type."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        outcome = "rate_limited" if isinstance(e, RateLimitError) else "error"
+        llm_errors.inc(provider=provider, error=type(e).__name__)
+        raise
+    finally:
+        llm_request_seconds.observe(time.perf_counter() - started, provider=provider, outcome=outcome)
+
+
+@contextmanager
+def llm_caller(user_id: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to ``user_id`` for fair queueing."""
+    token = _caller.set(user_id)
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def backoff_delay(attempt: int, base_seconds: float, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, never sooner than Retry-After.
+
+    With a Retry-After the jitter is added on top, so callers told to wait
+    the same time do not all retry at once.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base_seconds)
+    return random.uniform(0, base_seconds * 2 ** attempt)
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most one minute of quota."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (capped at the bucket size)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        """Return unused quota, or take more if ``amount`` is negative."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens")
+
+    def __init__(self, future: asyncio.Future, tokens: int):
+        self.future = future
+        self.tokens = tokens
+
+
+class ProviderLimiter:
+    """Requests-per-minute, tokens-per-minute and concurrency admission for one provider.
+
+    A call is admitted once it fits both buckets and a concurrency slot is
+    free. Waiting calls are served round-robin by user, so a burst from one
+    user queues behind every other user's next call instead of draining the
+    quota. After a 429 the whole provider is paused, not just the caller.
+    """
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_concurrency = max_concurrency if max_concurrency > 0 else None
+        self.active = 0
+        self.paused_until = 0.0
+        self.rejected = 0
+        self.throttled = 0
+        self._waiting: dict[str, deque[_Waiter]] = {}
+        self._turns: deque[str] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        _limiters.add(self)
+
+    def _delay(self, tokens: int) -> float:
+        delay = self.paused_until - time.monotonic()
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(tokens))
+        return delay
+
+    def _dispatch(self):
+        """Admit waiting calls in user round-robin order while quota allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._turns:
+            if self.max_concurrency is not None and self.active >= self.max_concurrency:
+                return  # release() dispatches again
+
+            user_id = self._turns[0]
+            queue = self._waiting[user_id]
+            waiter = queue[0]
+            delay = self._delay(waiter.tokens)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            queue.popleft()
+            self._turns.popleft()
+            if queue:
+                self._turns.append(user_id)
+            else:
+                del self._waiting[user_id]
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(waiter.tokens)
+            self.active += 1
+            waiter.future.set_result(None)
+
+    def _abandon(self, user_id: str, waiter: _Waiter):
+        """Withdraw a waiter that timed out or was cancelled."""
+        if waiter.future.done():
+            # Admitted just as the caller gave up
+            self.release(waiter.tokens, 0)
+            return
+
+        waiter.future.cancel()
+        queue = self._waiting[user_id]
+        queue.remove(waiter)
+        if not queue:
+            del self._waiting[user_id]
+            self._turns.remove(user_id)
+        self._dispatch()
+
+    async def acquire(self, user_id: str, tokens: int, timeout: float):
+        """Wait up to ``timeout`` seconds for admission of a call of ``tokens`` tokens."""
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tokens)
+        if user_id not in self._waiting:
+            self._waiting[user_id] = deque()
+            self._turns.append(user_id)
+        self._waiting[user_id].append(waiter)
+        self._dispatch()
+
+        try:
+            await asyncio.wait((waiter.future,), timeout=max(timeout, 0))
+        except asyncio.CancelledError:
+            self._abandon(user_id, waiter)
+            raise
+
+        if not waiter.future.done():
+            self._abandon(user_id, waiter)
+            self.rejected += 1
+            raise RateLimitError(
+                f"{self.name} is at its request quota; try again shortly",
+                retry_after=max(1.0, self._delay(tokens)),
+            )
+
+    def release(self, reserved_tokens: int, used_tokens: int):
+        """Free the call's concurrency slot and settle its token estimate."""
+        self.active -= 1
+        if self.tokens is not None:
+            self.tokens.give(reserved_tokens - used_tokens)
+        self._dispatch()
+
+    def pause(self, seconds: float):
+        """Admit nothing for ``seconds`` (after the provider answered 429)."""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": sum(len(queue) for queue in self._waiting.values()),
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
+
+
+class RateLimitedProvider(LLMProvider):
+    """Queue calls to a provider through its limiter and retry its transient failures.
+
+    Each call reserves its prompt tokens plus ``max_tokens`` against the
+    tokens-per-minute bucket and settles to the locally counted usage when
+    it finishes. A 429 pauses the whole provider; a connection error or 5xx
+    only delays the failed call's retry. Waiting for admission and backing
+    off share one deadline of ``queue_timeout_seconds``, after which the
+    last error is raised (so a router can fail over to another provider).
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        limiter: ProviderLimiter,
+        queue_timeout_seconds: float,
+        max_retries: int,
+        backoff_seconds: float,
+    ):
+        self.provider = provider
+        self.limiter = limiter
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.name = provider.name
+        self.model = provider.model
+
+    async def _admit(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int], deadline: float) -> int:
+        reserved = count_tokens(system_prompt) + count_tokens(user_prompt) + (max_tokens or DEFAULT_MAX_TOKENS)
+        with timer(llm_queue_seconds, provider=self.limiter.name):
+            await self.limiter.acquire(_caller.get(), reserved, deadline - time.monotonic())
+        return reserved
+
+    def _back_off(self, error: AIGenerationError, attempt: int, deadline: float) -> float:
+        """Seconds to wait before a retry, or re-raise when out of retries or time.
+
+        A rate limit pauses the provider instead, so the wait is 0.
+        """
+        delay = backoff_delay(attempt, self.backoff_seconds, getattr(error, "retry_after", None))
+        if attempt >= self.max_retries or time.monotonic() + delay > deadline:
+            raise error
+        if isinstance(error, RateLimitError):
+            logger.warning(f"LLM provider {self.limiter.name} rate limited; retrying in {delay:.1f}s")
+            self.limiter.pause(delay)
+            return 0.0
+        logger.warning(f"LLM provider {self.limiter.name} unavailable ({error}); retrying in {delay:.1f}s")
+        return delay
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        deadline = time.monotonic() + self.queue_timeout_seconds
+        attempt = 0
+        while True:
+            reserved = await self._admit(system_prompt, user_prompt, max_tokens, deadline)
+            used = reserved
+            try:
+                with observe_call(self.limiter.name):
+                    response = await self.provider.generate(system_prompt, user_prompt, json_mode, max_tokens)
+                used = reserved - (max_tokens or DEFAULT_MAX_TOKENS) + count_tokens(response)
+                return response
+            except (RateLimitError, ProviderUnavailableError) as e:
+                delay = self._back_off(e, attempt, deadline)
+            finally:
+                self.limiter.release(reserved, used)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        deadline = time.monotonic() + self.queue_timeout_seconds
+        attempt = 0
+        while True:
+            reserved = await self._admit(system_prompt, user_prompt, max_tokens, deadline)
+            used = reserved
+            chunks = []
+            try:
+                with observe_call(self.limiter.name):
+                    async for chunk in self.provider.stream(system_prompt, user_prompt, json_mode, max_tokens):
+                        chunks.append(chunk)
+                        yield chunk
+                used = reserved - (max_tokens or DEFAULT_MAX_TOKENS) + count_tokens("".join(chunks))
+                return
+            except (RateLimitError, ProviderUnavailableError) as e:
+                if chunks:
+                    raise
+                delay = self._back_off(e, attempt, deadline)
+            finally:
+                self.limiter.release(reserved, used)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        await self.provider.close()
+
+    def snapshot(self) -> dict:
+        """Admission queue and throttling counters."""
+        return self.limiter.snapshot()
+
+
+def _collect(field: str):
+    return lambda: [({"provider": limiter.name}, getattr(limiter, field)) for limiter in list(_limiters)]
+
+
+callback("llm_active_calls", "LLM calls admitted and in flight", _collect("active"))
+callback(
+    "llm_waiting_calls",
+    "LLM calls queued for admission",
+    lambda: [({"provider": limiter.name}, limiter.snapshot()["waiting"]) for limiter in list(_limiters)],
+)
+callback("llm_rejected_total", "LLM calls that gave up waiting for quota", _collect("rejected"), "counter")
+callback("llm_throttled_total", "Provider 429 responses that paused admission", _collect("throttled"), "counter")
@@ -0,0 +1,234 @@
+"""Multi-provider LLM routing with hedged requests and failover."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+from app.services.ai import LLMProvider
+from app.utils.errors import AIGenerationError
+
+logger = logging.getLogger(__name__)
+
+# Samples needed before a provider's own p95 is trusted as hedge delay, or its error rate for ranking
+MIN_SAMPLES = 5
+
+
+class ProviderStats:
+    """Rolling latency/error window and circuit breaker for one provider."""
+
+    def __init__(self, window_size: int, failure_threshold: int, cooldown_seconds: float):
+        self.latencies: deque[float] = deque(maxlen=window_size)
+        self.outcomes: deque[bool] = deque(maxlen=window_size)
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th latency percentile in seconds, if any samples exist."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def is_unreliable(self, max_error_rate: float) -> bool:
+        """Whether enough recent calls failed to rank the provider after reliable ones."""
+        return len(self.outcomes) >= MIN_SAMPLES and self.error_rate > max_error_rate
+
+    def is_available(self) -> bool:
+        """Closed, or open long enough to let a half-open trial through."""
+        if self.opened_at is None:
+            return True
+        return time.monotonic() - self.opened_at >= self.cooldown_seconds
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self, elapsed: float):
+        """Record a lower-bound latency for a call cancelled by a faster hedge."""
+        self.latencies.append(elapsed)
+
+    def snapshot(self) -> dict:
+        return {
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "error_rate": self.error_rate,
+            "circuit": "closed" if self.opened_at is None else "open",
+        }
+
+
+class RoutingProvider(LLMProvider):
+    """Route generations across several providers.
+
+    Each request goes to the fastest healthy provider (providers without
+    samples yet are tried first). Providers whose recent error rate is above
+    ``max_error_rate`` rank after the others, however fast. If the first
+    provider has not answered within its p95 latency, one hedged request is
+    sent to the next provider and the first answer wins. Failures fail over
+    to the next provider, and a provider that fails repeatedly is skipped
+    until its circuit cooldown expires.
+    """
+
+    name = "router"
+
+    def __init__(
+        self,
+        providers: dict[str, LLMProvider],
+        hedge_after_seconds: float,
+        window_size: int = 50,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        max_error_rate: float = 0.25,
+    ):
+        if not providers:
+            raise AIGenerationError("No LLM providers configured for routing")
+        self.providers = providers
+        self.hedge_after_seconds = hedge_after_seconds
+        self.max_error_rate = max_error_rate
+        self.stats = {
+            name: ProviderStats(window_size, failure_threshold, cooldown_seconds)
+            for name in providers
+        }
+        # Identifies the provider set, e.g. in response cache keys
+        self.model = ",".join(f"{name}:{provider.model}" for name, provider in providers.items())
+
+    def ranked(self) -> list[str]:
+        """Healthy providers ordered reliable first, then fastest first."""
+        names = list(self.providers)
+        healthy = [name for name in names if self.stats[name].is_available()]
+        if not healthy:
+            logger.warning("All LLM provider circuits are open; trying them anyway")
+            return names
+
+        def rank(name: str):
+            stats = self.stats[name]
+            p50 = stats.percentile(0.5)
+            return (stats.is_unreliable(self.max_error_rate), p50 is not None, p50 or 0.0, names.index(name))
+
+        return sorted(healthy, key=rank)
+
+    def hedge_delay(self, name: str) -> float:
+        """Time to wait on a provider before sending a hedged request."""
+        stats = self.stats[name]
+        if len(stats.latencies) < MIN_SAMPLES:
+            return self.hedge_after_seconds
+        return stats.percentile(0.95)
+
+    async def _call(
+        self, name: str, system_prompt: str, user_prompt: str, json_mode: bool, max_tokens: Optional[int]
+    ) -> str:
+        stats = self.stats[name]
+        started = time.monotonic()
+        try:
+            response = await self.providers[name].generate(system_prompt, user_prompt, json_mode, max_tokens)
+        except asyncio.CancelledError:
+            stats.record_abandoned(time.monotonic() - started)
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success(time.monotonic() - started)
+        return response
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Generate text with hedging and failover across providers."""
+        candidates = self.ranked()
+        pending: dict[asyncio.Task, str] = {}
+        errors = []
+        hedged = False
+
+        def launch():
+            name = candidates.pop(0)
+            task = asyncio.create_task(self._call(name, system_prompt, user_prompt, json_mode, max_tokens))
+            pending[task] = name
+            return name
+
+        primary = launch()
+        try:
+            while pending:
+                timeout = None
+                if not hedged and candidates and len(pending) == 1:
+                    timeout = self.hedge_delay(primary)
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    name = launch()
+                    logger.info(f"{primary} exceeded {timeout:.1f}s; hedging with {name}")
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(f"{name}: {task.exception()}")
+                    logger.warning(f"LLM provider {name} failed: {task.exception()}")
+
+                if not pending and candidates:
+                    primary = launch()
+
+            raise AIGenerationError(f"All LLM providers failed: {'; '.join(errors)}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream from the fastest healthy provider, failing over before the first chunk."""
+        errors = []
+        for name in self.ranked():
+            stats = self.stats[name]
+            started = time.monotonic()
+            received = False
+            try:
+                async for chunk in self.providers[name].stream(system_prompt, user_prompt, json_mode, max_tokens):
+                    received = True
+                    yield chunk
+            except Exception as e:
+                stats.record_failure()
+                if received:
+                    raise
+                errors.append(f"{name}: {e}")
+                logger.warning(f"LLM provider {name} failed to stream: {e}")
+                continue
+            stats.record_success(time.monotonic() - started)
+            return
+
+        raise AIGenerationError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    async def close(self):
+        """Close every wrapped provider."""
+        await asyncio.gather(*(provider.close() for provider in self.providers.values()))
+
+    def snapshot(self) -> dict:
+        """Per-provider latency, error rate and circuit state."""
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
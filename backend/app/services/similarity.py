@@ -0,0 +1,273 @@
+"""Near-duplicate itinerary reuse via a local vector index."""
+
+import hashlib
+import json
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Optional
+
+from app.config import get_settings
+from app.schemas import TripPreferences, DayItinerary
+from app.utils.metrics import callback
+from app.utils.pagination import keyset_page, split_page
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 256
+
+# log2(budget) bucket width; neighbouring budgets share weight across buckets
+BUDGET_BUCKET = 0.5
+
+
+def _hashed(feature: str) -> tuple[int, float]:
+    """Map a feature to a (dimension, sign) pair."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+    return digest % DIMENSIONS, 1.0 if digest >> 63 else -1.0
+
+
+def _group_bucket(group_size: int) -> str:
+    if group_size <= 1:
+        return "solo"
+    if group_size == 2:
+        return "couple"
+    return "small" if group_size <= 5 else "large"
+
+
+def embed_preferences(preferences: TripPreferences) -> "np.ndarray":
+    """Unit-length hashed feature vector of the soft trip preferences.
+
+    Interests are a set, so their order does not matter, and the budget is
+    spread across two log-scale buckets so nearby budgets stay similar.
+    """
+    features: dict[str, float] = {
+        f"style:{preferences.travel_style.strip().lower()}": 1.0,
+        f"pace:{preferences.pace.strip().lower()}": 1.0,
+        f"group:{_group_bucket(preferences.group_size)}": 0.5,
+    }
+
+    interests = sorted({interest.strip().lower() for interest in preferences.interests})
+    for interest in interests:
+        features[f"interest:{interest}"] = 1.0 / math.sqrt(len(interests))
+
+    position = math.log2(max(preferences.budget_per_day_inr, 1.0)) / BUDGET_BUCKET
+    lower = math.floor(position)
+    features[f"budget:{lower}"] = 1.0 - (position - lower)
+    features[f"budget:{lower + 1}"] = position - lower
+
+    import numpy as np
+
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for feature, weight in features.items():
+        dimension, sign = _hashed(feature)
+        vector[dimension] += sign * weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def partition_key(destination: str, duration_days: int, preferences: TripPreferences) -> str:
+    """Hard constraints; only itineraries agreeing on all of them are compared."""
+    dietary = ",".join(sorted(d.strip().lower() for d in preferences.dietary_restrictions or []))
+    mobility = " ".join((preferences.mobility_concerns or "").lower().split())
+    return f"{' '.join(destination.lower().split())}|{duration_days}|{dietary}|{mobility}"
+
+
+class VectorIndex:
+    """Brute-force cosine k-NN over unit vectors in a fixed-size ring buffer.
+
+    Vectors live in one contiguous float32 matrix, so a query is a single
+    matrix-vector product masked to the query's partition. Adding an entry
+    whose key is already indexed replaces it; otherwise the oldest entry is
+    overwritten once the buffer is full.
+    """
+
+    def __init__(self, max_entries: int, dimensions: int = DIMENSIONS):
+        # numpy is imported on first use, so it costs nothing at startup when reuse is disabled
+        import numpy as np
+
+        self.max_entries = max_entries
+        self.vectors = np.zeros((max_entries, dimensions), dtype=np.float32)
+        self.partitions = np.zeros(max_entries, dtype=np.int64)
+        self.keys: list[Optional[str]] = [None] * max_entries
+        self.payloads: list[Optional[str]] = [None] * max_entries
+        self.size = 0
+        self._next = 0
+        self._slots: dict[str, int] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    @staticmethod
+    def _partition_id(partition: str) -> int:
+        return int.from_bytes(hashlib.blake2b(partition.encode("utf-8"), digest_size=7).digest(), "big")
+
+    def add(self, key: str, partition: str, vector: "np.ndarray", payload: str):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._next
+            self._next = (self._next + 1) % self.max_entries
+            self.size = min(self.size + 1, self.max_entries)
+            evicted = self.keys[slot]
+            if evicted is not None:
+                del self._slots[evicted]
+            self._slots[key] = slot
+
+        self.vectors[slot] = vector
+        self.partitions[slot] = self._partition_id(partition)
+        self.keys[slot] = key
+        self.payloads[slot] = payload
+
+    def remove(self, key: str):
+        """Drop key's entry; its slot is reused in ring order."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        # Partition ids are non-negative, so -1 never matches a query
+        self.partitions[slot] = -1
+        self.keys[slot] = None
+        self.payloads[slot] = None
+
+    def search(
+        self, partition: str, vector: "np.ndarray", k: int = 1, exclude: Optional[str] = None
+    ) -> list[tuple[float, str]]:
+        """Return up to k (similarity, payload) pairs, most similar first, skipping key exclude."""
+        if not self.size:
+            return []
+
+        import numpy as np
+
+        mask = self.partitions[:self.size] == self._partition_id(partition)
+        excluded = self._slots.get(exclude) if exclude is not None else None
+        if excluded is not None:
+            mask[excluded] = False
+        in_partition = np.flatnonzero(mask)
+        if not in_partition.size:
+            return []
+
+        scores = self.vectors[in_partition] @ vector
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.payloads[in_partition[i]]) for i in top]
+
+
+class SimilarityIndex:
+    """Index of generated itineraries, one per trip, searched by trip preferences.
+
+    A trip's own itinerary is never offered back to it, so regenerating a
+    trip does not return its previous days.
+    """
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._index: Optional[VectorIndex] = None
+        self.reused = 0
+
+    @property
+    def index(self) -> VectorIndex:
+        """The vector index, allocated on first use."""
+        if self._index is None:
+            self._index = VectorIndex(self.max_entries)
+        return self._index
+
+    def add(
+        self,
+        trip_id: str,
+        destination: str,
+        duration_days: int,
+        preferences: TripPreferences,
+        days: list[DayItinerary],
+    ):
+        """Index a trip's latest itinerary so later, similar trips can reuse it."""
+        partition = partition_key(destination, duration_days, preferences)
+        payload = json.dumps({"days": [day.model_dump(exclude={"date"}) for day in days]})
+        self.index.add(trip_id, partition, embed_preferences(preferences), payload)
+
+    def remove(self, trip_id: str):
+        """Stop offering a deleted trip's itinerary to other trips."""
+        if self._index is not None:
+            self._index.remove(trip_id)
+
+    def find(
+        self, trip_id: str, destination: str, duration_days: int, preferences: TripPreferences
+    ) -> Optional[str]:
+        """Return another trip's itinerary days as JSON if one is similar enough."""
+        partition = partition_key(destination, duration_days, preferences)
+        matches = self.index.search(partition, embed_preferences(preferences), k=1, exclude=trip_id)
+        if not matches or matches[0][0] < self.threshold:
+            return None
+
+        similarity, payload = matches[0]
+        self.reused += 1
+        logger.info(f"Reusing a prior itinerary for {destination} (similarity {similarity:.3f})")
+        return payload
+
+    async def warm(self, db, limit: int, batch_size: int):
+        """Index the latest itinerary of recently planned trips, up to ``limit`` rows.
+
+        Reads newest first in keyset pages of ``batch_size``, so no single
+        query is large or truncated by PostgREST's max-rows. Meant to run in
+        the background after startup; entries saved meanwhile are newer and
+        are kept.
+        """
+        client = db.get_service_client()
+        limit = min(limit, self.max_entries)
+        started = time.monotonic()
+        cursor, scanned = None, 0
+
+        while scanned < limit:
+            page_size = min(batch_size, limit - scanned)
+            query = client.table("itineraries").select(
+                "id,created_at,trip_id,duration_days,itinerary_days,trips(destination,preferences)"
+            )
+            response = await keyset_page(query, page_size, cursor).execute()
+            rows, cursor = split_page(response.data, page_size)
+            scanned += len(rows)
+
+            for row in rows:
+                trip = row.get("trips")
+                # Rows come newest first, so an indexed trip already has its latest itinerary
+                if not trip or row["trip_id"] in self.index:
+                    continue
+                try:
+                    self.add(
+                        row["trip_id"],
+                        trip["destination"],
+                        row["duration_days"],
+                        TripPreferences(**trip["preferences"]),
+                        [DayItinerary(**day) for day in row["itinerary_days"]],
+                    )
+                except Exception as e:
+                    logger.debug(f"Skipping itinerary while warming similarity index: {str(e)}")
+
+            if cursor is None:
+                break
+
+        logger.info(
+            f"Similarity index warmed with {self.index.size} itineraries from {scanned} rows "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+
+# Global similarity index instance
+_similarity_index: Optional[SimilarityIndex] = None
+
+callback(
+    "similarity_reused_total",
+    "Generations served by reusing a near-duplicate itinerary",
+    lambda: [({}, _similarity_index.reused)] if _similarity_index is not None else [],
+    "counter",
+)
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Get or initialize the similar-itinerary index."""
+    global _similarity_index
+    if _similarity_index is None:
+        settings = get_settings()
+        _similarity_index = SimilarityIndex(settings.similarity_threshold, settings.similarity_max_entries)
+    return _similarity_index
@@ -0,0 +1,87 @@
+"""Per-user dashboard summary service."""
+
+import logging
+from datetime import date
+from typing import Optional
+from app.config import get_settings
+from app.db.database import get_db
+from app.schemas import UserSummaryResponse
+from app.services.cache import CacheBackend, MemoryCache
+
+logger = logging.getLogger(__name__)
+
+TOP_DESTINATIONS = 5
+
+
+class SummaryService:
+    """Reads the trigger-maintained ``user_stats`` row for a user.
+
+    Summaries are cached in-process; trip and itinerary writes invalidate
+    the owner's entry.
+    """
+
+    def __init__(self):
+        self.db = get_db()
+        self.cache = get_summary_cache()
+
+    async def get_summary(self, user_id: str) -> UserSummaryResponse:
+        """Get a user's dashboard summary with a single primary-key lookup."""
+        cached = await self.cache.get(f"summary:{user_id}")
+        if cached is not None:
+            summary = UserSummaryResponse.model_validate_json(cached)
+        else:
+            summary = await self._load(user_id)
+            await self.cache.set(f"summary:{user_id}", summary.model_dump_json())
+
+        # upcoming_trips is refreshed on writes; drop trips that have started since
+        today = date.today().isoformat()
+        summary.upcoming_trips = [trip for trip in summary.upcoming_trips if trip.start_date >= today]
+        return summary
+
+    async def invalidate(self, user_id: str):
+        """Drop a user's cached summary after a trip or itinerary write."""
+        await self.cache.delete(f"summary:{user_id}")
+
+    async def _load(self, user_id: str) -> UserSummaryResponse:
+        client = self.db.get_service_client()
+        response = await client.table("user_stats").select("*").eq("user_id", user_id).execute()
+        if not response.data:
+            return UserSummaryResponse()
+
+        stats = response.data[0]
+        counts = stats.get("destination_counts") or {}
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:TOP_DESTINATIONS]
+        return UserSummaryResponse(
+            trip_count=stats["trip_count"],
+            total_estimated_cost=stats["total_estimated_cost"],
+            upcoming_trips=stats.get("upcoming_trips") or [],
+            top_destinations=[{"destination": name, "trips": trips} for name, trips in top],
+            updated_at=stats.get("updated_at"),
+        )
+
+
+# Global summary cache instance
+_summary_cache: Optional[CacheBackend] = None
+
+
+def get_summary_cache() -> CacheBackend:
+    """Get or initialize the in-process summary cache."""
+    global _summary_cache
+    if _summary_cache is None:
+        settings = get_settings()
+        _summary_cache = MemoryCache(
+            settings.summary_cache_ttl_seconds, settings.user_cache_max_entries, name="summary"
+        )
+    return _summary_cache
+
+
+# Global summary service instance
+_summary_service: Optional[SummaryService] = None
+
+
+def get_summary_service() -> SummaryService:
+    """Get or initialize the summary service."""
+    global _summary_service
+    if _summary_service is None:
+        _summary_service = SummaryService()
+    return _summary_service
@@ -1,10 +1,13 @@
 """Trip and itinerary service."""
 
+import asyncio
+import hashlib
 import logging
 import uuid
 from datetime import datetime
 from typing import Optional, List
 
+from app.config import get_settings
 from app.db.database import get_db
 from app.schemas import (
     CreateTripRequest,
@@ -12,10 +15,21 @@ from app.schemas import (
     ItineraryResponse,
     DayItinerary,
 )
+from app.services.cache import CacheBackend, MemoryCache
+from app.services.similarity import get_similarity_index
+from app.services.summary import get_summary_service
 from app.utils.errors import NotFoundError, ValidationError
+from app.utils.pagination import keyset_page, select_columns, split_page
 
 logger = logging.getLogger(__name__)
 
+TRIP_FIELDS = ("id", "user_id", "destination", "start_date", "end_date", "preferences", "created_at", "updated_at")
+
+SAVED_PLACE_FIELDS = (
+    "id", "trip_id", "user_id", "name", "description", "location_type",
+    "latitude", "longitude", "estimated_cost", "website", "created_at",
+)
+
 
 class TripService:
     """Service for trip management."""
@@ -40,10 +54,11 @@ class TripService:
                 "preferences": request.preferences.model_dump(),
             }
 
-            result = client.table("trips").insert(trip_data).execute()
+            result = await client.table("trips").insert(trip_data).execute()
 
             if result.data:
                 trip = result.data[0]
+                await get_summary_service().invalidate(user_id)
 
                 return TripResponse(
                     id=trip["id"],
@@ -69,7 +84,7 @@ class TripService:
         try:
             client = self.db.get_service_client()
 
-            response = (
+            response = await (
                 client.table("trips")
                 .select("*")
                 .eq("id", trip_id)
@@ -91,23 +106,48 @@ class TripService:
     # =====================================================
     # GET ALL TRIPS
     # =====================================================
-    async def get_user_trips(self, user_id: str) -> List[TripResponse]:
-        try:
-            client = self.db.get_service_client()
-
-            response = (
-                client.table("trips")
-                .select("*")
-                .eq("user_id", user_id)
-                .order("created_at", desc=True)
-                .execute()
+    async def get_user_trips(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        include_itinerary: bool = False,
+    ) -> tuple[List[dict], Optional[str]]:
+        """Get one page of a user's trips, newest first, and the next cursor.
+
+        With ``include_itinerary`` each trip's latest itinerary is embedded
+        under ``itinerary`` by the same PostgREST request.
+        """
+        columns = select_columns(fields, TRIP_FIELDS)
+        if include_itinerary:
+            columns += ",itineraries(*)"
+
+        query = (
+            self.db.get_service_client()
+            .table("trips")
+            .select(columns)
+            .eq("user_id", user_id)
+        )
+        if include_itinerary:
+            query = (
+                query.order("created_at", desc=True, foreign_table="itineraries")
+                .limit(1, foreign_table="itineraries")
             )
+        query = keyset_page(query, limit, cursor)
 
-            return [TripResponse(**trip) for trip in response.data]
+        try:
+            response = await query.execute()
+            trips, next_cursor = split_page(response.data, limit)
+            if include_itinerary:
+                for trip in trips:
+                    itineraries = trip.pop("itineraries", None) or []
+                    trip["itinerary"] = itineraries[0] if itineraries else None
+            return trips, next_cursor
 
         except Exception as e:
             logger.error(f"Get trips error: {str(e)}")
-            return []
+            return [], None
 
     # =====================================================
     # DELETE TRIP
@@ -116,8 +156,11 @@ class TripService:
         try:
             client = self.db.get_service_client()
 
-            client.table("itineraries").delete().eq("trip_id", trip_id).execute()
-            client.table("trips").delete().eq("id", trip_id).execute()
+            await client.table("itineraries").delete().eq("trip_id", trip_id).execute()
+            await client.table("trips").delete().eq("id", trip_id).execute()
+            await get_summary_service().invalidate(user_id)
+            await get_itinerary_service().invalidate(trip_id)
+            get_similarity_index().remove(trip_id)
 
             return True
 
@@ -130,9 +173,16 @@ class TripService:
 # ITINERARY SERVICE
 # =========================================================
 
+def itinerary_etag(itinerary: ItineraryResponse) -> str:
+    """Strong ETag of a saved itinerary; a regeneration saves a new row, so a new id."""
+    version = f"{itinerary.id}:{itinerary.updated_at.isoformat()}"
+    return f'"{hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]}"'
+
+
 class ItineraryService:
     def __init__(self):
         self.db = get_db()
+        self.cache = get_itinerary_cache()
 
     async def save_itinerary(
         self,
@@ -142,7 +192,14 @@ class ItineraryService:
         total_cost: float,
         days: List[DayItinerary],
         notes: Optional[str] = None,
+        user_id: Optional[str] = None,
     ) -> ItineraryResponse:
+        """Save an itinerary with its derived saved places and feedback.
+
+        Writes happen in a constant number of round-trips regardless of trip
+        length: one itinerary insert, then the bulk saved_places insert and
+        the feedback insert issued concurrently.
+        """
         try:
             client = self.db.get_service_client()
 
@@ -155,25 +212,28 @@ class ItineraryService:
                 "notes": notes,
             }
 
-            result = client.table("itineraries").insert(itinerary_data).execute()
+            result = await client.table("itineraries").insert(itinerary_data).execute()
 
             itinerary = result.data[0]
 
+            if user_id is None:
+                trip_owner = await client.table("trips").select("user_id").eq("id", trip_id).execute()
+                user_id = trip_owner.data[0]["user_id"]
+
             # Save each activity to saved_places for demonstration
-            user_id = client.table("trips").select("user_id").eq("id", trip_id).execute().data[0]["user_id"]
+            places_data = []
             for day in days:
                 for activity_type in ["morning", "afternoon", "evening"]:
                     activity_name = getattr(day, activity_type)
                     if activity_name:
                         name = activity_name.split(" - ")[0].strip()
-                        place_data = {
+                        places_data.append({
                             "trip_id": trip_id,
                             "user_id": user_id,
                             "name": name,
                             "description": activity_name,
                             "location_type": activity_type,
-                        }
-                        client.table("saved_places").insert(place_data).execute()
+                        })
 
             # Add an automatic feedback entry
             feedback_data = {
@@ -182,7 +242,13 @@ class ItineraryService:
                 "rating": 5,
                 "comment": "Itinerary generated successfully by AI.",
             }
-            client.table("feedback").insert(feedback_data).execute()
+
+            writes = [client.table("feedback").insert(feedback_data).execute()]
+            if places_data:
+                writes.append(client.table("saved_places").insert(places_data).execute())
+            await asyncio.gather(*writes)
+            await get_summary_service().invalidate(user_id)
+            await self.invalidate(trip_id)
 
             return ItineraryResponse(
                 id=itinerary["id"],
@@ -200,10 +266,17 @@ class ItineraryService:
             raise ValidationError(str(e))
 
     async def get_trip_itinerary(self, trip_id: str) -> Optional[ItineraryResponse]:
-        """Get itinerary for a trip."""
+        """Get the latest itinerary for a trip."""
         try:
             client = self.db.get_service_client()
-            response = client.table("itineraries").select("*").eq("trip_id", trip_id).execute()
+            response = await (
+                client.table("itineraries")
+                .select("*")
+                .eq("trip_id", trip_id)
+                .order("created_at", desc=True)
+                .limit(1)
+                .execute()
+            )
 
             if not response.data:
                 return None
@@ -223,24 +296,84 @@ class ItineraryService:
             logger.error(f"Get itinerary error: {str(e)}")
             return None
 
-    async def get_user_saved_places(self, user_id: str):
-        """Get all saved places for a user."""
+    async def get_trip_itinerary_body(self, trip_id: str) -> Optional[tuple[str, bytes]]:
+        """ETag and JSON body of a trip's latest itinerary.
+
+        Saved itineraries never change, so both are cached per trip until the
+        trip is deleted or regenerated; a hit costs no query or serialization.
+        """
+        key = f"itinerary:{trip_id}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        itinerary = await self.get_trip_itinerary(trip_id)
+        if itinerary is None:
+            return None
+
+        entry = (itinerary_etag(itinerary), itinerary.model_dump_json().encode("utf-8"))
+        await self.cache.set(key, entry)
+        return entry
+
+    async def invalidate(self, trip_id: str):
+        """Drop a trip's cached itinerary after it is regenerated or deleted."""
+        await self.cache.delete(f"itinerary:{trip_id}")
+
+    async def get_user_saved_places(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> tuple[List[dict], Optional[str]]:
+        """Get one page of a user's saved places, newest first, and the next cursor."""
+        query = keyset_page(
+            self.db.get_service_client()
+            .table("saved_places")
+            .select(select_columns(fields, SAVED_PLACE_FIELDS))
+            .eq("user_id", user_id),
+            limit,
+            cursor,
+        )
         try:
-            client = self.db.get_service_client()
-            response = client.table("saved_places")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .order("created_at", desc=True)\
-                .execute()
-            return response.data
+            response = await query.execute()
+            return split_page(response.data, limit)
         except Exception as e:
             logger.error(f"Get saved places error: {str(e)}")
-            return []
+            return [], None
+
+
+# Global serialized itinerary cache instance
+_itinerary_cache: Optional[CacheBackend] = None
+
+
+def get_itinerary_cache() -> CacheBackend:
+    """Get or initialize the in-process serialized itinerary cache."""
+    global _itinerary_cache
+    if _itinerary_cache is None:
+        settings = get_settings()
+        _itinerary_cache = MemoryCache(
+            settings.itinerary_cache_ttl_seconds, settings.itinerary_cache_max_entries, name="itinerary"
+        )
+    return _itinerary_cache
+
+
+# Global service instances
+_trip_service: Optional[TripService] = None
+_itinerary_service: Optional[ItineraryService] = None
 
 
 def get_trip_service() -> TripService:
-    return TripService()
+    """Get or initialize the trip service."""
+    global _trip_service
+    if _trip_service is None:
+        _trip_service = TripService()
+    return _trip_service
 
 
 def get_itinerary_service() -> ItineraryService:
-    return ItineraryService()
+    """Get or initialize the itinerary service."""
+    global _itinerary_service
+    if _itinerary_service is None:
+        _itinerary_service = ItineraryService()
+    return _itinerary_service
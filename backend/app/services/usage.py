@@ -0,0 +1,52 @@
+"""Per-request and process-wide LLM token usage accounting."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class TokenUsage:
+    """Prompt and completion tokens spent across one or more LLM calls."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+
+    def add(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.calls += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+# Usage since process start
+token_usage_totals = TokenUsage()
+
+# Usage of the request being handled; tasks it spawns share the same object
+_request_usage: ContextVar[Optional[TokenUsage]] = ContextVar("llm_request_usage", default=None)
+
+
+def record_usage(prompt_tokens: int, completion_tokens: int):
+    """Add one LLM call's usage to the current request and the totals."""
+    token_usage_totals.add(prompt_tokens, completion_tokens)
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.add(prompt_tokens, completion_tokens)
+
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    """Collect the usage of every LLM call made inside the block."""
+    usage = TokenUsage()
+    token = _request_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _request_usage.reset(token)
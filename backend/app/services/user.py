@@ -2,9 +2,12 @@
 
 import logging
 from datetime import timedelta
+from typing import Optional
+from app.config import get_settings
 from app.db.database import get_db
+from app.services.cache import CacheBackend, MemoryCache
 from app.schemas import UserRegisterRequest, UserLoginRequest, UserResponse, TokenResponse
-from app.utils.auth import hash_password, verify_password, create_access_token
+from app.utils.auth import get_password_hasher, create_access_token
 from app.utils.errors import AuthenticationError, ValidationError, NotFoundError
 
 logger = logging.getLogger(__name__)
@@ -16,6 +19,15 @@ class UserService:
     def __init__(self):
         """Initialize user service."""
         self.db = get_db()
+        self.cache = get_user_cache()
+
+    async def cache_user(self, user: UserResponse):
+        """Store a user profile in the in-process cache."""
+        await self.cache.set(f"user:{user.id}", user.model_dump_json())
+
+    async def invalidate_user(self, user_id: str):
+        """Drop a cached user profile; call after any write to the user."""
+        await self.cache.delete(f"user:{user_id}")
 
     async def register_user(self, request: UserRegisterRequest) -> UserResponse:
         """Register a new user."""
@@ -24,12 +36,12 @@ class UserService:
 
 
             # Check if user exists
-            response = client.table("users").select("*").eq("email", request.email).execute()
+            response = await client.table("users").select("*").eq("email", request.email).execute()
             if response.data:
                 raise ValidationError("User with this email already exists")
 
             # Hash password
-            hashed_password = hash_password(request.password)
+            hashed_password = await get_password_hasher().hash(request.password)
 
             # Create user
             user_data = {
@@ -38,7 +50,7 @@ class UserService:
                 "password_hash": hashed_password,
             }
 
-            result = client.table("users").insert(user_data).execute()
+            result = await client.table("users").insert(user_data).execute()
 
             if result.data:
                 user = result.data[0]
@@ -51,18 +63,20 @@ class UserService:
                         "currency": "USD",
                         "settings": {"notifications": True}
                     }
-                    client.table("preferences").insert(pref_data).execute()
+                    await client.table("preferences").insert(pref_data).execute()
                     logger.info(f"User preferences initialized: {user['id']}")
                 except Exception as pref_error:
                     logger.warning(f"Failed to initialize user preferences: {str(pref_error)}. "
                                  "Make sure the 'preferences' table exists in Supabase.")
 
-                return UserResponse(
+                registered = UserResponse(
                     id=user["id"],
                     email=user["email"],
                     name=user["name"],
                     created_at=user["created_at"],
                 )
+                await self.cache_user(registered)
+                return registered
 
             raise ValidationError("Failed to create user")
 
@@ -78,7 +92,7 @@ class UserService:
             client = self.db.get_service_client()
 
             # Get user by email
-            response = client.table("users").select("*").eq("email", request.email).execute()
+            response = await client.table("users").select("*").eq("email", request.email).execute()
 
             if not response.data:
                 raise AuthenticationError("Invalid email or password")
@@ -86,12 +100,23 @@ class UserService:
             user = response.data[0]
 
             # Verify password
-            if not verify_password(request.password, user["password_hash"]):
+            valid, new_hash = await get_password_hasher().verify_and_update(
+                request.password, user["password_hash"]
+            )
+            if not valid:
                 raise AuthenticationError("Invalid email or password")
 
+            # Upgrade hashes made with an outdated scheme or work factor
+            if new_hash:
+                try:
+                    await client.table("users").update({"password_hash": new_hash}).eq("id", user["id"]).execute()
+                    logger.info(f"Rehashed password for user: {user['id']}")
+                except Exception as rehash_error:
+                    logger.warning(f"Failed to rehash password on login: {str(rehash_error)}")
+
             # Ensure preferences exist for this user (gracefully handle if table is missing)
             try:
-                pref_check = client.table("preferences").select("id").eq("user_id", user["id"]).execute()
+                pref_check = await client.table("preferences").select("id").eq("user_id", user["id"]).execute()
                 if not pref_check.data:
                     pref_data = {
                         "user_id": user["id"],
@@ -99,7 +124,7 @@ class UserService:
                         "currency": "USD",
                         "settings": {"notifications": True}
                     }
-                    client.table("preferences").insert(pref_data).execute()
+                    await client.table("preferences").insert(pref_data).execute()
                     logger.debug(f"Initialized missing preferences for user: {user['id']}")
             except Exception as pref_error:
                 logger.warning(f"Failed to check/initialize preferences on login: {str(pref_error)}")
@@ -110,6 +135,14 @@ class UserService:
                 expires_delta=timedelta(hours=24),
             )
 
+            # Warm the profile cache for the requests this token will make
+            await self.cache_user(UserResponse(
+                id=user["id"],
+                email=user["email"],
+                name=user["name"],
+                created_at=user["created_at"],
+            ))
+
             logger.info(f"User logged in: {user['id']}")
 
             return TokenResponse(
@@ -125,37 +158,31 @@ class UserService:
             raise AuthenticationError("Login failed")
 
     async def get_user(self, user_id: str) -> UserResponse:
-        """Get user by ID."""
+        """Get user by ID, served from the profile cache when possible.
+
+        Preferences are initialized at registration and login, not here.
+        """
+        cached = await self.cache.get(f"user:{user_id}")
+        if cached is not None:
+            return UserResponse.model_validate_json(cached)
+
         try:
             client = self.db.get_service_client()
 
-            response = client.table("users").select("*").eq("id", user_id).execute()
+            response = await client.table("users").select("id,email,name,created_at").eq("id", user_id).execute()
 
             if not response.data:
                 raise NotFoundError("User")
 
             user = response.data[0]
-            
-            # Ensure preferences exist (gracefully handle if table is missing)
-            try:
-                pref_check = client.table("preferences").select("id").eq("user_id", user_id).execute()
-                if not pref_check.data:
-                    pref_data = {
-                        "user_id": user_id,
-                        "theme": "light",
-                        "currency": "USD",
-                        "settings": {"notifications": True}
-                    }
-                    client.table("preferences").insert(pref_data).execute()
-            except Exception as pref_error:
-                logger.warning(f"Failed to check/initialize preferences on get_user: {str(pref_error)}")
-
-            return UserResponse(
+            result = UserResponse(
                 id=user["id"],
                 email=user["email"],
                 name=user["name"],
                 created_at=user["created_at"],
             )
+            await self.cache_user(result)
+            return result
 
         except Exception as e:
             logger.error(f"Get user error: {str(e)}")
@@ -164,6 +191,26 @@ class UserService:
             raise NotFoundError("User")
 
 
+# Global user profile cache instance
+_user_cache: Optional[CacheBackend] = None
+
+
+def get_user_cache() -> CacheBackend:
+    """Get or initialize the in-process user profile cache."""
+    global _user_cache
+    if _user_cache is None:
+        settings = get_settings()
+        _user_cache = MemoryCache(settings.user_cache_ttl_seconds, settings.user_cache_max_entries, name="user")
+    return _user_cache
+
+
+# Global user service instance
+_user_service: Optional[UserService] = None
+
+
 def get_user_service() -> UserService:
-    """Get user service instance."""
-    return UserService()
+    """Get or initialize the user service."""
+    global _user_service
+    if _user_service is None:
+        _user_service = UserService()
+    return _user_service
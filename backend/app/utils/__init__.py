@@ -1,26 +1,54 @@
 """Utilities module."""
 
-from app.utils.auth import hash_password, verify_password, create_access_token, decode_token
+from app.utils.auth import (
+    hash_password,
+    verify_password,
+    PasswordHasher,
+    get_password_hasher,
+    create_access_token,
+    decode_token,
+    AuthContext,
+    get_auth_context,
+)
 from app.utils.errors import (
     setup_logging,
     AppException,
     ValidationError,
     AuthenticationError,
     NotFoundError,
+    ConflictError,
     AIGenerationError,
+    RateLimitError,
+    ProviderUnavailableError,
     log_request,
 )
+from app.utils.singleflight import SingleFlight
+from app.utils.metrics import registry, counter, gauge, histogram, timed, timer
 
 __all__ = [
     "hash_password",
     "verify_password",
+    "PasswordHasher",
+    "get_password_hasher",
     "create_access_token",
     "decode_token",
+    "AuthContext",
+    "get_auth_context",
     "setup_logging",
     "AppException",
     "ValidationError",
     "AuthenticationError",
     "NotFoundError",
+    "ConflictError",
     "AIGenerationError",
+    "RateLimitError",
+    "ProviderUnavailableError",
     "log_request",
+    "SingleFlight",
+    "registry",
+    "counter",
+    "gauge",
+    "histogram",
+    "timed",
+    "timer",
 ]
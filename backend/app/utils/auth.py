@@ -1,28 +1,99 @@
 """Utility functions for authentication and security."""
 
+import asyncio
 import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Security, HTTPException, status
+from fastapi import Depends, Request, Security, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+DEMO_USER_ID = "demo-user"
+
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_pwd_context: Optional[CryptContext] = None
+
+
+def get_password_context() -> CryptContext:
+    """Get or initialize the bcrypt context at the configured work factor.
+
+    Hashes made with a different number of rounds report ``needs_update``.
+    """
+    global _pwd_context
+    if _pwd_context is None:
+        _pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=get_settings().bcrypt_rounds,
+        )
+    return _pwd_context
 
 
 def hash_password(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+    """Hash a password (blocking; use PasswordHasher from async code)."""
+    return get_password_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash (blocking)."""
+    return get_password_context().verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a dedicated, bounded thread pool.
+
+    The semaphore admits at most ``workers`` hashes into the pool; further
+    callers wait on the loop, where a cancelled request simply drops out
+    instead of leaving CPU work queued in the executor.
+    """
+
+    def __init__(self, context: CryptContext, workers: int):
+        self.context = context
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.semaphore = asyncio.Semaphore(workers)
+
+    async def _run(self, fn, *args):
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Verify a password; also return a new hash if the stored one is outdated."""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global password hasher instance
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get or initialize the password hasher."""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(get_password_context(), get_settings().password_hash_workers)
+    return _password_hasher
+
+
+def close_password_hasher():
+    """Shut down the password hashing thread pool."""
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.close()
+        _password_hasher = None
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -46,8 +117,59 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class TokenCache:
+    """Bounded LRU of verified token payloads.
+
+    Entries are dropped once the token's ``exp`` passes, so a cached token is
+    never accepted for longer than a fresh decode would accept it.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+
+        self._entries.move_to_end(token)
+        return payload
+
+    def set(self, token: str, payload: dict):
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        self._entries[token] = (float(expires_at), payload)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Global verified-token cache instance
+_token_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> TokenCache:
+    """Get or initialize the verified-token cache."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(get_settings().token_cache_max_entries)
+    return _token_cache
+
+
 def decode_token(token: str) -> Optional[dict]:
-    """Decode and verify JWT token."""
+    """Decode and verify JWT token, reusing earlier verifications."""
+    cache = get_token_cache()
+    payload = cache.get(token)
+    if payload is not None:
+        return payload
+
     settings = get_settings()
     try:
         payload = jwt.decode(
@@ -55,26 +177,49 @@ def decode_token(token: str) -> Optional[dict]:
             settings.secret_key,
             algorithms=[settings.algorithm]
         )
-        return payload
     except JWTError as e:
         logger.error(f"Token decode error: {str(e)}")
         return None
 
+    cache.set(token, payload)
+    return payload
+
+
+class AuthContext:
+    """Identity of the caller, resolved once per request."""
+
+    def __init__(self, user_id: str, claims: dict):
+        self.user_id = user_id
+        self.claims = claims
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.user_id != DEMO_USER_ID
+
+
 security = HTTPBearer(auto_error=False)
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Security(security)) -> str:
-    """Dependency to get current user ID from token."""
-    if not credentials:
-        return "demo-user"
-    
-    token = credentials.credentials
-    payload = decode_token(token)
-    
-    if not payload:
-        return "demo-user"
-        
-    user_id = payload.get("sub")
+
+async def get_auth_context(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Security(security),
+) -> AuthContext:
+    """Dependency resolving the request's AuthContext, cached on request.state."""
+    context = getattr(request.state, "auth", None)
+    if context is not None:
+        return context
+
+    payload = decode_token(credentials.credentials) if credentials else None
+    user_id = payload.get("sub") if payload else None
     if not user_id:
-        return "demo-user"
-        
-    return user_id
+        context = AuthContext(DEMO_USER_ID, {})
+    else:
+        context = AuthContext(user_id, payload)
+
+    request.state.auth = context
+    return context
+
+
+async def get_current_user_id(context: AuthContext = Depends(get_auth_context)) -> str:
+    """Dependency to get current user ID from token."""
+    return context.user_id
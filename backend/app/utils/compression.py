@@ -0,0 +1,169 @@
+"""Response compression with brotli/gzip negotiation."""
+
+import zlib
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+# Bodies at least this large are compressed in a worker thread
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+def negotiate_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None for identity.
+
+    The highest q-value wins; on a tie brotli is preferred.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli_available else ("gzip",)
+    best, best_weight = None, 0.0
+    for encoding in candidates:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class GzipEncoder:
+    """Incremental gzip encoder."""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, body: bytes, more_body: bool) -> bytes:
+        flush_mode = zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH
+        return self._compressor.compress(body) + self._compressor.flush(flush_mode)
+
+
+class BrotliEncoder:
+    """Incremental brotli encoder."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def encode(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionResponder:
+    """Compresses one response's body messages with ``encoder``.
+
+    The start message is held back until the first body message shows
+    whether the response is large enough to compress.
+    """
+
+    def __init__(self, app, minimum_size: int, content_encoding: str, encoder):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_encoding = content_encoding
+        self.encoder = encoder
+        self.send = None
+        self.start_message: Optional[dict] = None
+        self.started = False
+        self.compressing = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if not self.started:
+            await self._start(self._should_compress(message))
+        if self.compressing and message["type"] == "http.response.body":
+            message = {**message, "body": await self._encode(message)}
+        await self.send(message)
+
+    def _should_compress(self, message) -> bool:
+        if message["type"] != "http.response.body":
+            return False
+        headers = Headers(raw=self.start_message["headers"])
+        if (
+            "content-encoding" in headers
+            or "content-range" in headers
+            or headers.get("content-type", "").startswith("text/event-stream")
+        ):
+            return False
+        return message.get("more_body", False) or len(message.get("body", b"")) >= self.minimum_size
+
+    async def _start(self, compress: bool):
+        self.started = True
+        self.compressing = compress
+        if compress:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.content_encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            # The encoded bytes differ from those a strong ETag was computed over;
+            # If-None-Match is compared weakly, so revalidation still matches
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+        await self.send(self.start_message)
+
+    async def _encode(self, message) -> bytes:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        # Compressing larger bodies inline would hold up the event loop
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self.encoder.encode, body, more_body)
+        return self.encoder.encode(body, more_body)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses of at least ``minimum_size`` bytes.
+
+    Uses the client's preferred encoding among brotli (when the optional
+    ``brotli`` package is installed) and gzip. Server-Sent Events, partial
+    and already-encoded responses are passed through. A strong ETag on a
+    compressed response is made weak.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            encoder = BrotliEncoder(self.brotli_quality)
+        elif encoding == "gzip":
+            encoder = GzipEncoder(self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(self.app, self.minimum_size, encoding, encoder)
+        await responder(scope, receive, send)
@@ -59,6 +59,13 @@ class NotFoundError(AppException):
         super().__init__(message, error_code, 404)
 
 
+class ConflictError(AppException):
+    """Request conflicts with one already in progress or recorded."""
+
+    def __init__(self, message: str, error_code: str = "CONFLICT"):
+        super().__init__(message, error_code, 409)
+
+
 class AIGenerationError(AppException):
     """AI generation error."""
 
@@ -66,6 +73,22 @@ class AIGenerationError(AppException):
         super().__init__(message, error_code, 500)
 
 
+class RateLimitError(AIGenerationError):
+    """LLM provider quota exhausted; retry after ``retry_after`` seconds if known."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, error_code: str = "AI_RATE_LIMITED"):
+        super().__init__(message, error_code)
+        self.status_code = 503
+        self.retry_after = retry_after
+
+
+class ProviderUnavailableError(AIGenerationError):
+    """LLM provider call failed transiently (connection error or 5xx) and may be retried."""
+
+    def __init__(self, message: str, error_code: str = "AI_UNAVAILABLE"):
+        super().__init__(message, error_code)
+
+
 def log_request(user_id: Optional[str], method: str, endpoint: str, data: Optional[dict] = None):
     """Log API request."""
     logger = logging.getLogger(__name__)
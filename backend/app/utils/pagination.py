@@ -0,0 +1,108 @@
+"""Keyset pagination, field projection and conditional responses for list endpoints."""
+
+import base64
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+from fastapi import Request, Response
+from app.utils.errors import ValidationError
+from app.utils.responses import ORJSONResponse
+
+# Columns every page carries so the next cursor can be built
+KEY_COLUMNS = ("created_at", "id")
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque cursor pointing just past ``row`` in (created_at, id) DESC order."""
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Return the (created_at, id) pair encoded in a cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), str(row_id)
+    except Exception:
+        raise ValidationError("Invalid cursor")
+
+
+def select_columns(fields: Optional[str], allowed: Iterable[str]) -> str:
+    """Build a PostgREST select list from a comma-separated ``fields`` parameter.
+
+    The key columns are always included; unknown fields are rejected.
+    """
+    if not fields:
+        return "*"
+
+    allowed = set(allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(unknown)}")
+
+    columns = list(KEY_COLUMNS) + [field for field in requested if field not in KEY_COLUMNS]
+    return ",".join(dict.fromkeys(columns))
+
+
+def clamp_limit(limit: Optional[int], default: int, maximum: int) -> int:
+    """Apply the default page size and the server-side cap."""
+    if limit is None:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def keyset_page(query, limit: int, cursor: Optional[str] = None):
+    """Order a query newest first and restrict it to one page after ``cursor``.
+
+    One extra row is requested so callers can tell whether a next page exists.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+        )
+    return (
+        query.order("created_at", desc=True)
+        .order("id", desc=True)
+        .limit(limit + 1)
+    )
+
+
+def split_page(rows: list[dict], limit: int) -> tuple[list[dict], Optional[str]]:
+    """Trim the look-ahead row and return (rows, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names ``etag``, compared weakly as RFC 9110 requires for GET."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or opaque in candidates
+
+
+def conditional_json(request: Request, content: Any, next_cursor: Optional[str] = None) -> Response:
+    """JSON response with an ETag, answering If-None-Match with 304.
+
+    The next page's cursor, if any, is returned in ``X-Next-Cursor``.
+    """
+    response = ORJSONResponse(content)
+    etag = f'W/"{hashlib.sha256(response.body).hexdigest()[:32]}"'
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,92 @@
+"""Startup profiling: where cold-start time goes.
+
+Run ``python -m app.utils.profiling`` from backend/ for an import-time
+breakdown by package followed by the time each service takes to start.
+Set ``STARTUP_PROFILE=true`` to log the phase timings on every boot.
+"""
+
+import asyncio
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+class StartupTimer:
+    """Wall-clock seconds spent in each named startup phase."""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> str:
+        total = sum(self.phases.values())
+        parts = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+        return f"Startup took {total * 1000:.0f} ms ({parts})"
+
+
+# Phases of this process's startup, filled in by app.main and the service container
+startup_timer = StartupTimer()
+
+
+def import_breakdown(module: str = "app.main") -> dict[str, float]:
+    """Seconds spent importing each top-level package when ``module`` is imported cold.
+
+    Runs a fresh interpreter with ``-X importtime`` so nothing is already
+    cached in ``sys.modules``; each module's own (not cumulative) time is
+    summed into its top-level package.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    packages: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            packages[match.group(4).split(".")[0]] += int(match.group(1)) / 1_000_000
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+async def _profile_services() -> StartupTimer:
+    from app.main import app
+    from app.services.container import lifespan
+    # The instance the app records into; under ``python -m`` this module is __main__
+    from app.utils.profiling import startup_timer
+
+    async with lifespan(app):
+        pass
+    return startup_timer
+
+
+def main(top: int = 20):
+    packages = import_breakdown()
+    total = sum(packages.values())
+    print(f"Import time of app.main: {total * 1000:.0f} ms")
+    for package, seconds in list(packages.items())[:top]:
+        print(f"  {package:<24} {seconds * 1000:8.1f} ms  {seconds / total:6.1%}")
+
+    print(asyncio.run(_profile_services()).report())
+
+
+if __name__ == "__main__":
+    main()
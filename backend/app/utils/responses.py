@@ -0,0 +1,35 @@
+"""orjson-backed JSON rendering for routes without a response model."""
+
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    # orjson handles dicts, lists, str, numbers, datetime and UUID natively
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes, matching FastAPI's encoding of models."""
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of ``json.dumps``.
+
+    For content FastAPI would otherwise pass through ``jsonable_encoder``.
+    Routes with a response model are better left on the default response
+    class: FastAPI then serializes them with Pydantic's ``dump_json``, which
+    is faster still, and setting any ``response_class`` turns that off.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
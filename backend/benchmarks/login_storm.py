@@ -0,0 +1,101 @@
+"""Latency of other endpoints while a burst of logins hashes passwords.
+
+Fires concurrent POST /auth/login requests at the app while probing
+GET /health, first with bcrypt run inline on the event loop (the previous
+behaviour), then on the bounded PasswordHasher pool:
+
+    python -m benchmarks.login_storm
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.stub import PostgrestStub, install_stub
+
+LOGINS = 24
+PROBE_INTERVAL = 0.01
+
+
+class InlineHasher:
+    """Hashes on the event loop thread, as register/login used to."""
+
+    def __init__(self, context):
+        self.context = context
+
+    async def hash(self, password: str) -> str:
+        return self.context.hash(password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        return self.context.verify_and_update(password, hashed_password)
+
+
+async def storm(client: httpx.AsyncClient) -> tuple[list[float], float]:
+    """Run the login burst; return /health latencies (ms) and burst duration."""
+    latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        # Measured from when the probe was due, so time spent waiting for a
+        # blocked event loop counts against the request
+        while not done.is_set():
+            due = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            response = await client.get("/health")
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - due) * 1000)
+
+    async def login():
+        response = await client.post(
+            "/auth/login", json={"email": "storm@example.com", "password": "password1"}
+        )
+        response.raise_for_status()
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    return latencies, elapsed
+
+
+async def main():
+    from app.config import get_settings
+    from app.main import app
+    from app.utils import auth
+
+    settings = get_settings()
+    context = auth.get_password_context()
+    user = {
+        "id": "user-1",
+        "email": "storm@example.com",
+        "name": "Storm",
+        "password_hash": context.hash("password1"),
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+    install_stub(PostgrestStub(rows={"users": [user], "preferences": [{"id": "pref-1"}]}))
+
+    transport = httpx.ASGITransport(app=app)
+    print(
+        f"{LOGINS} concurrent logins, bcrypt rounds={settings.bcrypt_rounds}, "
+        f"workers={settings.password_hash_workers}"
+    )
+    print(f"{'mode':<8} {'health p50':>11} {'health p99':>11} {'max':>9} {'probes':>7} {'burst s':>8}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in ("inline", "pooled"):
+            auth._password_hasher = InlineHasher(context) if mode == "inline" else None
+            latencies, elapsed = await storm(client)
+            p99 = statistics.quantiles(latencies, n=100, method="inclusive")[98]
+            print(
+                f"{mode:<8} {statistics.median(latencies):9.1f}ms {p99:9.1f}ms "
+                f"{max(latencies):7.1f}ms {len(latencies):>7} {elapsed:8.2f}"
+            )
+    auth.close_password_hasher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""Itinerary response parsing throughput and accuracy.
+
+Parses a synthetic corpus shaped like recorded provider responses (plain
+DAY blocks, Markdown-bold labels, comma-grouped costs, JSON output) for
+trips of 1-30 days, with the previous split-on-"DAY" parser as baseline:
+
+    python -m benchmarks.parser
+"""
+
+import json
+import re
+import statistics
+import time
+
+from benchmarks import stub  # noqa: F401  (loads stub settings)
+
+ROUNDS = 200
+DURATIONS = (1, 3, 7, 14, 30)
+
+
+def plain_day(n: int) -> str:
+    return (
+        f"DAY {n}: 2024-03-{n:02d}\n"
+        f"Morning: Visit the old fort and the DAYBREAK cafe near gate {n}.\n"
+        "Continue along the riverside promenade.\n"
+        "Afternoon: Lunch at a local thali place, then the city museum.\n"
+        "Evening: Sunset at the ghats followed by a light show.\n"
+        "Food Recommendations: Masala dosa, filter coffee, kulfi.\n"
+        "Accommodation Info: Heritage guesthouse in the old town.\n"
+        "Transport Tips: Use prepaid autos; metro for longer hops.\n"
+        f"Estimated Cost: ₹{2500 + n * 10}\n"
+    )
+
+
+def markdown_day(n: int) -> str:
+    return (
+        f"### **Day {n}** - 2024-03-{n:02d}\n"
+        "- **Morning:** Temple walk with a local guide.\n"
+        "- **Afternoon:** Spice market and cooking class.\n"
+        "- **Evening:** Rooftop dinner overlooking the lake.\n"
+        "- **Food Recommendations:** Dal baati, ghevar.\n"
+        "- **Accommodation Info:** Lakeside haveli.\n"
+        "- **Transport Tips:** Hire a cab for the day.\n"
+        f"- **Estimated Daily Cost:** Rs. 1{n % 10},450\n"
+        "---\n"
+    )
+
+
+def corpus(duration: int) -> dict[str, str]:
+    json_days = [
+        {
+            "day": n,
+            "morning": "Fort visit",
+            "afternoon": "Museum",
+            "evening": "Ghats",
+            "food_recommendations": "Dosa",
+            "accommodation_info": "Guesthouse",
+            "transport_tips": "Autos",
+            "estimated_cost_inr": 2500.0,
+        }
+        for n in range(1, duration + 1)
+    ]
+    return {
+        "plain": "Here is your itinerary:\n\n" + "\n".join(plain_day(n) for n in range(1, duration + 1)),
+        "markdown": "\n".join(markdown_day(n) for n in range(1, duration + 1)),
+        "json": "```json\n" + json.dumps({"days": json_days}) + "\n```",
+    }
+
+
+def legacy_parse(text: str) -> dict:
+    """The previous parser: split on "DAY", substring-match each line."""
+    days = []
+    for block in text.split("DAY")[1:]:
+        day_data = {
+            "day": len(days) + 1, "morning": "", "afternoon": "", "evening": "",
+            "food_recommendations": "", "accommodation_info": "", "transport_tips": "",
+            "estimated_cost_inr": 0.0,
+        }
+        current_field = None
+        for line in block.strip().split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if "Morning:" in line:
+                current_field = "morning"
+                day_data["morning"] = line.replace("Morning:", "").strip()
+            elif "Afternoon:" in line:
+                current_field = "afternoon"
+                day_data["afternoon"] = line.replace("Afternoon:", "").strip()
+            elif "Evening:" in line:
+                current_field = "evening"
+                day_data["evening"] = line.replace("Evening:", "").strip()
+            elif "Food" in line or "Recommendations" in line:
+                current_field = "food_recommendations"
+            elif "Accommodation" in line:
+                current_field = "accommodation_info"
+                day_data["accommodation_info"] = line.replace("Accommodation Info:", "").strip()
+            elif "Transport" in line or "Tips" in line:
+                current_field = "transport_tips"
+                day_data["transport_tips"] = line.replace("Transport Tips:", "").strip()
+            elif "Estimated" in line or "Cost" in line:
+                cost = re.search(r"[₹\$]\s?(\d+(?:\.\d{2})?)", line)
+                if cost:
+                    day_data["estimated_cost_inr"] = float(cost.group(1))
+            elif current_field:
+                day_data[current_field] += " " + line
+        if day_data["morning"] or day_data["afternoon"] or day_data["evening"]:
+            days.append(day_data)
+    return {"days": days}
+
+
+def measure(parse, text: str) -> float:
+    """Median microseconds per parse."""
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        parse(text)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    from app.services.ai import AIOrchestrator
+
+    parse = AIOrchestrator.parse_itinerary_response
+
+    print(f"{'days':>4} {'variant':<9} {'parser':>10} {'legacy':>10} {'us/day':>8}  days parsed (new/legacy)")
+    for duration in DURATIONS:
+        for variant, text in corpus(duration).items():
+            new_us = measure(lambda t: parse(None, t), text)
+            legacy_us = measure(legacy_parse, text) if variant != "json" else float("nan")
+            parsed = len(parse(None, text)["days"])
+            legacy_days = len(legacy_parse(text)["days"]) if variant != "json" else "-"
+            print(
+                f"{duration:>4} {variant:<9} {new_us:8.1f}us {legacy_us:8.1f}us "
+                f"{new_us / duration:8.1f}  {parsed}/{legacy_days}"
+            )
+
+
+if __name__ == "__main__":
+    main()
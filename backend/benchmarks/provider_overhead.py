@@ -0,0 +1,86 @@
+"""Per-call overhead of a fresh HTTP client versus a pooled provider client.
+
+Runs against a local stub of Ollama's /api/generate endpoint:
+
+    python -m benchmarks.provider_overhead
+"""
+
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks import stub  # noqa: F401  (loads stub settings)
+
+CALLS = 200
+BODY = json.dumps({"response": "DAY 1: ok", "done": True}).encode()
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal keep-alive HTTP/1.1 responder."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def fresh_client_call(base_url: str):
+    """The previous behaviour: a new client (and connection) per generation."""
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{base_url}/api/generate",
+            json={"model": "mistral", "prompt": "x", "stream": False},
+            timeout=60.0,
+        )
+        response.raise_for_status()
+        return response.json()["response"]
+
+
+async def measure(label: str, call) -> float:
+    timings = []
+    for _ in range(CALLS):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(timings)
+    p95 = statistics.quantiles(timings, n=20)[18]
+    print(f"{label:<22} median {median:6.3f} ms   p95 {p95:6.3f} ms")
+    return median
+
+
+async def main():
+    from app.config import get_settings
+    from app.services.ai import OllamaProvider, build_http_client
+
+    server = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    provider = OllamaProvider(base_url, build_http_client(get_settings(), base_url))
+    try:
+        fresh = await measure("fresh client per call", lambda: fresh_client_call(base_url))
+        pooled = await measure("pooled provider", lambda: provider.generate("system", "user"))
+        print(f"per-call overhead saved: {fresh - pooled:.3f} ms ({fresh / pooled:.1f}x)")
+    finally:
+        await provider.close()
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
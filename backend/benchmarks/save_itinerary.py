@@ -0,0 +1,56 @@
+"""Round-trip count of ItineraryService.save_itinerary by trip length.
+
+    python -m benchmarks.save_itinerary
+"""
+
+import asyncio
+import time
+
+from benchmarks.stub import PostgrestStub, install_stub
+
+
+async def main():
+    from app.schemas import DayItinerary
+    from app.services.trip import ItineraryService
+
+    stub = PostgrestStub(latency=0.02)
+    install_stub(stub)
+    service = ItineraryService()
+
+    print(f"{'days':>5} {'round-trips':>12} {'wall ms':>9}")
+    counts = set()
+    for duration in (1, 3, 7, 14, 30):
+        days = [
+            DayItinerary(
+                day=i,
+                date="2026-01-01",
+                morning=f"Fort {i} - Walk",
+                afternoon=f"Museum {i} - Tour",
+                evening=f"Beach {i} - Sunset",
+                food_recommendations="",
+                accommodation_info="",
+                transport_tips="",
+                estimated_cost_inr=1000.0,
+            )
+            for i in range(1, duration + 1)
+        ]
+        stub.reset()
+        started = time.perf_counter()
+        await service.save_itinerary(
+            trip_id="trip-1",
+            destination="Goa",
+            duration_days=duration,
+            total_cost=1000.0 * duration,
+            days=days,
+            user_id="user-1",
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        counts.add(len(stub.requests))
+        print(f"{duration:>5} {len(stub.requests):>12} {elapsed:>9.1f}")
+
+    assert len(counts) == 1, f"round-trips depend on trip length: {sorted(counts)}"
+    print("OK: round-trip count is independent of trip length")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
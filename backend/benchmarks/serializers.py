@@ -0,0 +1,172 @@
+"""JSON serialization and compression of the largest API responses.
+
+Compares the encoders a response can go through for a 14-day
+ItineraryResponse, a page of TripResponses with embedded itineraries
+(``GET /trips?include=itinerary``) and a page of history rows:
+
+- ``jsonable_encoder + json``: JSONResponse, the path of routes without a
+  response model and of ``conditional_json`` before orjson
+- ``model dump + json``: the response-model path of older FastAPI releases
+- ``pydantic dump_json``: the response-model path of current FastAPI, used
+  only while the route keeps the default response class
+- ``model dump + orjson``: the response-model path with an orjson
+  ``response_class``
+- ``orjson``: ``app.utils.responses.dumps``
+
+then the size and cost of gzip and brotli at the configured levels:
+
+    python -m benchmarks.serializers
+"""
+
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks import stub  # noqa: F401  (loads stub settings)
+
+ROUNDS = 50
+PAGE = 50
+HISTORY_PAGE = 500
+
+WORDS = (
+    "fort stepwell bazaar haveli rooftop thali lassi kachori palace museum garden lake "
+    "sunset temple guide rickshaw metro heritage walk ramparts gate courtyard mirror "
+    "textile block-print market chai sweets lunch dinner breakfast early crowds tickets "
+    "₹500 ₹1200 two hours short drive book ahead closed Mondays shaded viewpoint"
+).split()
+
+
+def text(rng: random.Random, words: int) -> str:
+    """Free text with a realistic (not repetitive) vocabulary mix."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def itinerary(trip_id: str, days: int = 14) -> dict:
+    rng = random.Random(trip_id)
+    created = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    return {
+        "id": f"it-{trip_id}",
+        "trip_id": trip_id,
+        "destination": "Jaipur, India",
+        "duration_days": days,
+        "total_estimated_cost": 4500.0 * days,
+        "itinerary_days": [
+            {
+                "day": n,
+                "date": (created + timedelta(days=n)).date().isoformat(),
+                "morning": text(rng, 60),
+                "afternoon": text(rng, 60),
+                "evening": text(rng, 40),
+                "food_recommendations": text(rng, 25),
+                "accommodation_info": text(rng, 20),
+                "transport_tips": text(rng, 20),
+                "estimated_cost_inr": 4500.0,
+            }
+            for n in range(1, days + 1)
+        ],
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def trip(n: int) -> dict:
+    created = datetime(2026, 3, 1, tzinfo=timezone.utc) - timedelta(hours=n)
+    trip_id = f"trip-{n}"
+    return {
+        "id": trip_id,
+        "user_id": "user-1",
+        "destination": "Jaipur, India",
+        "start_date": "2026-04-01",
+        "end_date": "2026-04-14",
+        "preferences": {
+            "travel_style": "cultural",
+            "interests": ["history", "food", "architecture"],
+            "group_size": 2,
+            "pace": "moderate",
+            "budget_per_day_inr": 4500.0,
+        },
+        "itinerary": itinerary(trip_id),
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def history_row(n: int) -> dict:
+    return {
+        "id": f"history-{n}",
+        "user_id": "user-1",
+        "action": "GENERATE_ITINERARY",
+        "entity_type": "itinerary",
+        "entity_id": f"it-{n}",
+        "details": {"trip_id": f"trip-{n}", "destination": "Jaipur, India", "prompt_tokens": 812},
+        "created_at": (datetime(2026, 3, 1, tzinfo=timezone.utc) - timedelta(minutes=n)).isoformat(),
+    }
+
+
+def measure(fn) -> tuple[float, bytes]:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        body = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), body
+
+
+def compact(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    from app.config import get_settings
+    from app.schemas import ItineraryResponse, TripResponse
+    from app.utils import compression
+    from app.utils.responses import dumps
+
+    settings = get_settings()
+    payloads = {
+        "itinerary": (ItineraryResponse(**itinerary("trip-0")), TypeAdapter(ItineraryResponse)),
+        f"{PAGE} trips": ([TripResponse(**trip(n)) for n in range(PAGE)], TypeAdapter(list[TripResponse])),
+        f"{HISTORY_PAGE} history": ([history_row(n) for n in range(HISTORY_PAGE)], None),
+    }
+
+    print(f"{'payload':<14} {'encoder':<26} {'ms':>7} {'speedup':>8}")
+    bodies = {}
+    for label, (content, adapter) in payloads.items():
+        encoders = {"jsonable_encoder + json": lambda: compact(jsonable_encoder(content))}
+        if adapter is not None:
+            encoders["model dump + json"] = lambda: compact(adapter.dump_python(content, mode="json"))
+            encoders["pydantic dump_json"] = lambda: adapter.dump_json(content)
+            encoders["model dump + orjson"] = lambda: dumps(adapter.dump_python(content, mode="json"))
+        encoders["orjson"] = lambda: dumps(content)
+
+        baseline = None
+        for name, encode in encoders.items():
+            elapsed, body = measure(encode)
+            assert json.loads(body) == json.loads(encoders["jsonable_encoder + json"]()), name
+            baseline = baseline or elapsed
+            print(f"{label:<14} {name:<26} {elapsed:7.2f} {baseline / elapsed:7.1f}x")
+        bodies[label] = body
+
+    print()
+    print(
+        f"{'payload':<14} {'raw KB':>8} {'gzip KB':>8} {'gzip ms':>8} {'br KB':>8} {'br ms':>8}"
+        f"   (gzip level {settings.compression_gzip_level}, brotli quality {settings.compression_brotli_quality})"
+    )
+    for label, body in bodies.items():
+        gzip_ms, gzipped = measure(lambda: gzip.compress(body, settings.compression_gzip_level))
+        row = f"{label:<14} {len(body) / 1024:8.1f} {len(gzipped) / 1024:8.1f} {gzip_ms:8.2f}"
+        if compression.brotli is None:
+            print(f"{row} {'(brotli not installed)':>18}")
+            continue
+        br_ms, brotlied = measure(lambda: compression.brotli_compress(body, settings.compression_brotli_quality))
+        print(f"{row} {len(brotlied) / 1024:8.1f} {br_ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
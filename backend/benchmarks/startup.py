@@ -0,0 +1,85 @@
+"""Cold-start budget: time to import app.main and run the startup lifespan.
+
+Each run is a fresh interpreter, as on a cold container start. Exits
+non-zero if the median exceeds the budget, so it can gate CI:
+
+    python -m benchmarks.startup [--runs 7] [--import-budget 1.0] [--startup-budget 0.5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import stub  # noqa: F401  (loads stub settings)
+
+# What one cold start measures, printed as JSON by the child interpreter
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+from app.services.container import lifespan
+from app.utils.profiling import startup_timer
+
+async def boot():
+    async with lifespan(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - imported,
+    "phases": startup_timer.phases,
+}))
+"""
+
+
+def cold_start() -> dict:
+    env = {
+        **os.environ,
+        # Configure a provider so its SDK import is counted, without network calls
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "stub-key"),
+        "SIMILARITY_REUSE_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    result = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--import-budget", type=float, default=1.0, help="seconds")
+    parser.add_argument("--startup-budget", type=float, default=0.5, help="seconds")
+    args = parser.parse_args()
+
+    runs = [cold_start() for _ in range(args.runs)]
+    import_s = statistics.median(run["import"] for run in runs)
+    startup_s = statistics.median(run["startup"] for run in runs)
+
+    print(f"{args.runs} cold starts (medians)")
+    print(f"{'phase':<18} {'ms':>8}")
+    for name in runs[0]["phases"]:
+        if name == "imports":
+            continue
+        print(f"{name:<18} {statistics.median(run['phases'].get(name, 0.0) for run in runs) * 1000:8.1f}")
+    print(f"{'import app.main':<18} {import_s * 1000:8.1f}   budget {args.import_budget * 1000:.0f}")
+    print(f"{'startup':<18} {startup_s * 1000:8.1f}   budget {args.startup_budget * 1000:.0f}")
+
+    over = []
+    if import_s > args.import_budget:
+        over.append(f"import took {import_s:.3f}s (budget {args.import_budget}s)")
+    if startup_s > args.startup_budget:
+        over.append(f"startup took {startup_s:.3f}s (budget {args.startup_budget}s)")
+    if over:
+        sys.exit("Startup budget exceeded: " + "; ".join(over))
+    print("Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""In-process PostgREST stub shared by the benchmarks."""
+
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+# Settings must be loadable without a real .env
+os.environ.setdefault("SUPABASE_URL", "https://stub.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "stub-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "stub-key")
+os.environ.setdefault("SECRET_KEY", "stub-secret")
+
+
+class PostgrestStub:
+    """Records every request and echoes inserted rows back like PostgREST.
+
+    Reads return the fixed ``rows`` registered for the table, unfiltered.
+    """
+
+    def __init__(self, latency: float = 0.0, rows: dict[str, list[dict]] | None = None):
+        self.latency = latency
+        self.rows = rows or {}
+        self.requests: list[httpx.Request] = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if request.method == "POST" and "/rpc/" not in request.url.path:
+            body = json.loads(request.content)
+            rows = body if isinstance(body, list) else [body]
+            now = datetime.now(timezone.utc).isoformat()
+            return httpx.Response(
+                201,
+                json=[{"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **row} for row in rows],
+            )
+        if request.method == "GET":
+            table = request.url.path.rsplit("/", 1)[-1]
+            return httpx.Response(200, json=self.rows.get(table, []))
+        return httpx.Response(200, json=[])
+
+    def reset(self):
+        self.requests.clear()
+
+
+def install_stub(stub: PostgrestStub):
+    """Point the global Database at the stub transport."""
+    from app.db import database
+
+    database.db = None
+    db = database.init_db()
+    db.http_client._transport = httpx.MockTransport(stub.handler)
+    return db
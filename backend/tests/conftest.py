@@ -0,0 +1,8 @@
+"""Shared test setup: settings that load without a real .env."""
+
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://stub.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "stub-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "stub-key")
+os.environ.setdefault("SECRET_KEY", "stub-secret")
@@ -0,0 +1,65 @@
+"""CompressionMiddleware over a bare ASGI app."""
+
+import asyncio
+import gzip
+
+import brotli
+
+from app.utils.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = b'{"destination": "Jaipur"}' * 100
+
+
+def app(chunks: list[bytes], headers: list[tuple[bytes, bytes]] = ()):
+    async def asgi(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        for n, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": n < len(chunks) - 1})
+
+    return asgi
+
+
+def call(asgi, accept_encoding: str) -> tuple[dict, bytes]:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(asgi, minimum_size=500)(scope, None, send))
+    headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+    return headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_negotiation_follows_q_values_and_prefers_brotli_on_ties():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0") is None
+    assert negotiate_encoding("gzip, br", brotli_available=False) == "gzip"
+
+
+def test_large_bodies_are_compressed_and_strong_etags_made_weak():
+    headers, body = call(app([BODY], [(b"content-length", b"2500"), (b"etag", b'"abc"')]), "gzip")
+
+    assert gzip.decompress(body) == BODY
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"abc"'
+    assert "content-length" not in headers
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    headers, body = call(app([BODY[:100], BODY[100:], b""]), "br")
+
+    assert headers["content-encoding"] == "br"
+    assert brotli.decompress(body) == BODY
+
+
+def test_small_event_stream_and_encoded_responses_pass_through():
+    assert call(app([b"{}"]), "br") == ({}, b"{}")
+
+    sse = [(b"content-type", b"text/event-stream")]
+    assert call(app([BODY, b""], sse), "br")[1] == BODY
+
+    encoded = [(b"content-encoding", b"gzip")]
+    assert call(app([BODY], encoded), "br")[1] == BODY
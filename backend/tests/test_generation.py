@@ -0,0 +1,40 @@
+"""GenerationService coalescing of concurrent requests."""
+
+import asyncio
+
+from app.services.generation import GenerationService
+
+
+class CountingGeneration(GenerationService):
+    """Skips the pipeline; records each generation that actually runs."""
+
+    def __init__(self):
+        self.runs: list[bool] = []
+
+    async def _generate_itinerary(self, trip_id, user_id, trip, fresh):
+        self.runs.append(fresh)
+        await asyncio.sleep(0.05)
+        return f"itinerary fresh={fresh}"
+
+
+def generate_concurrently(service: GenerationService, *fresh_flags: bool) -> list[str]:
+    async def requests():
+        return await asyncio.gather(
+            *(service.generate_itinerary("trip-a", "user", fresh=fresh) for fresh in fresh_flags)
+        )
+
+    return asyncio.run(requests())
+
+
+def test_identical_concurrent_requests_share_one_generation():
+    service = CountingGeneration()
+
+    assert generate_concurrently(service, False, False) == ["itinerary fresh=False"] * 2
+    assert service.runs == [False]
+
+
+def test_a_fresh_request_does_not_join_a_normal_generation():
+    service = CountingGeneration()
+
+    assert generate_concurrently(service, False, True) == ["itinerary fresh=False", "itinerary fresh=True"]
+    assert sorted(service.runs) == [False, True]
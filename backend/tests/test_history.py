@@ -0,0 +1,47 @@
+"""HistoryWriter batching and read-your-writes flushing."""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.services import history
+from app.services.history import HistoryWriter
+
+
+class SlowHistoryTable:
+    """Takes ``delay`` seconds per insert and records the rows it stored."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.rows: list[dict] = []
+        self.pending: list[dict] = []
+
+    def table(self, name: str):
+        return self
+
+    def insert(self, rows: list[dict]):
+        self.pending = rows
+        return self
+
+    async def execute(self):
+        rows = self.pending
+        await asyncio.sleep(self.delay)
+        self.rows.extend(rows)
+
+
+def test_flush_waits_for_the_batch_already_being_written(monkeypatch):
+    table = SlowHistoryTable(delay=0.1)
+    monkeypatch.setattr(history, "get_db", lambda: SimpleNamespace(get_service_client=lambda: table))
+
+    async def write_then_read():
+        writer = HistoryWriter(batch_size=10, flush_interval=0.0, max_size=10)
+        writer.submit({"action": "create_trip"})
+        # Let the background flusher take the row and start inserting it
+        await asyncio.sleep(0.02)
+        assert writer.queue.empty() and not table.rows
+
+        await writer.flush()
+        stored = list(table.rows)
+        await writer.stop()
+        return stored
+
+    assert asyncio.run(write_then_read()) == [{"action": "create_trip"}]
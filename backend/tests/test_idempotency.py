@@ -0,0 +1,119 @@
+"""IdempotencyService replay, release and conflict handling."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.idempotency import (
+    IdempotencyService,
+    IdempotencyStoreError,
+    MemoryIdempotencyStore,
+    RedisIdempotencyStore,
+    request_fingerprint,
+)
+from app.utils.errors import ConflictError, ValidationError
+
+
+def service(wait_seconds: float = 5.0) -> IdempotencyService:
+    return IdempotencyService(MemoryIdempotencyStore(ttl_seconds=60, lock_seconds=60), wait_seconds)
+
+
+class Handler:
+    """Counts calls; fails with each queued status code before succeeding."""
+
+    def __init__(self, delay: float = 0.0, failures: tuple[int, ...] = ()):
+        self.delay = delay
+        self.failures = list(failures)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            raise HTTPException(status_code=self.failures.pop(0), detail="failed")
+        return {"call": self.calls}
+
+
+def replayed(response) -> bool:
+    return response.headers.get("Idempotent-Replayed") == "true"
+
+
+def test_concurrent_retries_run_the_handler_once_and_replay_its_response():
+    idempotency, handler = service(), Handler(delay=0.05)
+
+    async def retries():
+        return await asyncio.gather(*(idempotency.run("key", "user", "fp", handler) for _ in range(5)))
+
+    responses = asyncio.run(retries())
+
+    assert handler.calls == 1
+    assert [replayed(r) for r in responses].count(True) == 4
+    assert {r.body for r in responses} == {b'{"call":1}'}
+
+
+def test_errors_release_the_key_so_the_retry_runs_again():
+    idempotency, handler = service(), Handler(failures=(503, 404))
+
+    for status_code in (503, 404):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(idempotency.run("key", "user", "fp", handler))
+        assert error.value.status_code == status_code
+
+    response = asyncio.run(idempotency.run("key", "user", "fp", handler))
+    assert handler.calls == 3
+    assert not replayed(response)
+    assert replayed(asyncio.run(idempotency.run("key", "user", "fp", handler)))
+
+
+def test_a_key_reused_for_a_different_request_is_rejected():
+    idempotency, handler = service(), Handler()
+    asyncio.run(idempotency.run("key", "user", request_fingerprint("trip-a"), handler))
+
+    with pytest.raises(ValidationError) as error:
+        asyncio.run(idempotency.run("key", "user", request_fingerprint("trip-b"), handler))
+    assert error.value.status_code == 422
+    assert handler.calls == 1
+
+
+def test_a_retry_waiting_too_long_for_the_first_request_gets_a_conflict():
+    idempotency, handler = service(wait_seconds=0.05), Handler(delay=0.3)
+
+    async def first_and_retry():
+        first = asyncio.ensure_future(idempotency.run("key", "user", "fp", handler))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(ConflictError) as error:
+                await idempotency.run("key", "user", "fp", handler)
+        finally:
+            await first
+        return error.value
+
+    assert asyncio.run(first_and_retry()).status_code == 409
+    assert handler.calls == 1
+
+
+class SaveFailingStore(MemoryIdempotencyStore):
+    async def save(self, key: str, record: dict):
+        raise IdempotencyStoreError("connection lost")
+
+
+def test_an_unreachable_store_still_runs_the_request():
+    # Nothing listens on port 1, so every Redis call fails to connect
+    store = RedisIdempotencyStore("redis://127.0.0.1:1", ttl_seconds=60, lock_seconds=60)
+    idempotency, handler = IdempotencyService(store, wait_seconds=5.0), Handler()
+
+    response = asyncio.run(idempotency.run("key", "user", "fp", handler))
+
+    assert response == {"call": 1}
+    assert handler.calls == 1
+
+
+def test_a_response_that_cannot_be_recorded_is_still_returned():
+    idempotency = IdempotencyService(SaveFailingStore(ttl_seconds=60, lock_seconds=60), wait_seconds=5.0)
+    handler = Handler()
+
+    response = asyncio.run(idempotency.run("key", "user", "fp", handler))
+
+    assert response.body == b'{"call":1}'
+    assert handler.calls == 1
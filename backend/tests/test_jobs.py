@@ -0,0 +1,29 @@
+"""Job queue behaviour when the job store fails."""
+
+import asyncio
+
+import pytest
+
+from app.services.jobs import JobQueue, RedisJobStore
+from app.utils.errors import AppException
+
+# Nothing listens here, so every Redis call fails to connect
+UNREACHABLE_REDIS = "redis://127.0.0.1:1"
+
+
+async def succeed(trip_id: str, user_id: str, fresh: bool) -> dict:
+    return {}
+
+
+def test_unreachable_redis_gives_a_503():
+    async def enqueue():
+        queue = JobQueue(succeed, RedisJobStore(UNREACHABLE_REDIS, ttl_seconds=60), workers=1, max_size=1)
+        try:
+            await queue.enqueue("trip-a", "user")
+        finally:
+            await queue.stop(drain_timeout=0)
+
+    with pytest.raises(AppException) as error:
+        asyncio.run(enqueue())
+    assert error.value.status_code == 503
+    assert error.value.error_code == "JOB_STORE_UNAVAILABLE"
@@ -0,0 +1,73 @@
+"""AIOrchestrator.generate_parallel with a scripted provider."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.ai import AIOrchestrator, LLMProvider
+from app.utils.errors import ValidationError
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers the outline, then each day's prompt with the next scripted reply for that day."""
+
+    name = "scripted"
+
+    def __init__(self, replies: dict[int, list[str]]):
+        self.replies = replies
+        self.calls = 0
+
+    async def generate(self, system_prompt, user_prompt, json_mode=False, max_tokens=None) -> str:
+        self.calls += 1
+        if user_prompt == "outline":
+            return "DAY 1: Old City"
+        return self.replies[int(user_prompt)].pop(0)
+
+
+class FakeCache:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    async def get(self, key: str):
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds=None):
+        self.values[key] = value
+
+
+def orchestrator(provider: LLMProvider) -> AIOrchestrator:
+    ai = AIOrchestrator.__new__(AIOrchestrator)
+    ai.provider = provider
+    ai.cache = FakeCache()
+    return ai
+
+
+def generate(ai: AIOrchestrator, duration_days: int) -> str:
+    return asyncio.run(
+        ai.generate_parallel("s", "outline", lambda day, outline: str(day), duration_days, 2, cache_key="k")
+    )
+
+
+def day(label: str) -> str:
+    return json.dumps({"days": [{"morning": label}]})
+
+
+def test_an_unparseable_day_is_generated_again():
+    provider = ScriptedProvider({1: [day("one")], 2: ["not an itinerary", day("two")]})
+    ai = orchestrator(provider)
+
+    days = json.loads(generate(ai, 2))["days"]
+
+    assert [(d["day"], d["morning"]) for d in days] == [(1, "one"), (2, "two")]
+    assert provider.calls == 4
+    assert ai.cache.values["k"] == json.dumps({"days": days})
+
+
+def test_a_day_that_never_parses_fails_without_caching_a_partial_itinerary():
+    provider = ScriptedProvider({1: [day("one")], 2: ["not an itinerary", "still not"]})
+    ai = orchestrator(provider)
+
+    with pytest.raises(ValidationError, match="Day 2"):
+        generate(ai, 2)
+    assert ai.cache.values == {}
@@ -0,0 +1,63 @@
+"""RateLimitedProvider retries with a local flaky provider."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ai import LLMProvider, raise_for_rate_limit, raise_for_unavailable
+from app.services.ratelimit import ProviderLimiter, RateLimitedProvider
+from app.utils.errors import AIGenerationError, ProviderUnavailableError
+
+
+class FlakyProvider(LLMProvider):
+    """Raises each queued error, mapped as the real providers map them, then answers."""
+
+    name = "flaky"
+    model = "flaky-model"
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def generate(self, system_prompt, user_prompt, json_mode=False, max_tokens=None) -> str:
+        self.calls += 1
+        if self.errors:
+            error = self.errors.pop(0)
+            raise_for_rate_limit(error)
+            raise_for_unavailable(error)
+            raise AIGenerationError(str(error))
+        return "ok"
+
+
+def limited(provider: LLMProvider, max_retries: int = 3) -> RateLimitedProvider:
+    limiter = ProviderLimiter(provider.name, 0, 0, 0)
+    return RateLimitedProvider(provider, limiter, queue_timeout_seconds=5, max_retries=max_retries, backoff_seconds=0.01)
+
+
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://llm.test")
+    return httpx.HTTPStatusError("failed", request=request, response=httpx.Response(status_code, request=request))
+
+
+def test_connection_errors_and_server_errors_are_retried():
+    provider = FlakyProvider(httpx.ConnectError("connection reset"), status_error(502))
+
+    assert asyncio.run(limited(provider).generate("s", "u")) == "ok"
+    assert provider.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    provider = FlakyProvider(status_error(400))
+
+    with pytest.raises(AIGenerationError):
+        asyncio.run(limited(provider).generate("s", "u"))
+    assert provider.calls == 1
+
+
+def test_retries_are_bounded():
+    provider = FlakyProvider(*(status_error(503) for _ in range(5)))
+
+    with pytest.raises(ProviderUnavailableError):
+        asyncio.run(limited(provider, max_retries=2).generate("s", "u"))
+    assert provider.calls == 3
@@ -0,0 +1,171 @@
+"""RoutingProvider hedging, failover and circuit breaking with local fake providers."""
+
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+import pytest
+
+from app.services.ai import LLMProvider
+from app.services.routing import RoutingProvider
+from app.utils.errors import AIGenerationError
+
+
+class FakeProvider(LLMProvider):
+    """Answers with its own name after ``delay`` seconds, or fails."""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False, fail_after_chunks: Optional[int] = None):
+        self.name = name
+        self.model = f"{name}-model"
+        self.delay = delay
+        self.fail = fail
+        self.fail_after_chunks = fail_after_chunks
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, system_prompt, user_prompt, json_mode=False, max_tokens=None) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise AIGenerationError(f"{self.name} is down")
+        return self.name
+
+    async def stream(self, system_prompt, user_prompt, json_mode=False, max_tokens=None) -> AsyncIterator[str]:
+        self.calls += 1
+        for n in range(3):
+            if self.fail and (self.fail_after_chunks or 0) <= n:
+                raise AIGenerationError(f"{self.name} is down")
+            await asyncio.sleep(self.delay)
+            yield f"{self.name}-{n}"
+
+
+def router(*providers: FakeProvider, hedge_after_seconds: float = 10.0, **kwargs) -> RoutingProvider:
+    return RoutingProvider({p.name: p for p in providers}, hedge_after_seconds=hedge_after_seconds, **kwargs)
+
+
+async def collect(stream: AsyncIterator[str]) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = FakeProvider("a"), FakeProvider("b")
+
+    assert asyncio.run(router(primary, secondary).generate("s", "u")) == "a"
+    assert (primary.calls, secondary.calls) == (1, 0)
+
+
+def test_slow_primary_is_hedged_and_the_first_answer_wins():
+    primary, secondary = FakeProvider("a", delay=5.0), FakeProvider("b", delay=0.01)
+    routing = router(primary, secondary, hedge_after_seconds=0.05)
+
+    started = time.monotonic()
+    assert asyncio.run(routing.generate("s", "u")) == "b"
+
+    assert time.monotonic() - started < 1.0
+    assert (primary.calls, secondary.calls) == (1, 1)
+    # The losing call is cancelled and counted as a lower-bound latency
+    assert primary.cancelled == 1
+    assert len(routing.stats["a"].latencies) == 1
+
+
+def test_failure_fails_over_to_the_next_provider():
+    primary, secondary = FakeProvider("a", fail=True), FakeProvider("b")
+    routing = router(primary, secondary)
+
+    assert asyncio.run(routing.generate("s", "u")) == "b"
+    assert routing.stats["a"].consecutive_failures == 1
+    assert routing.stats["b"].consecutive_failures == 0
+
+
+def test_all_providers_failing_raises():
+    routing = router(FakeProvider("a", fail=True), FakeProvider("b", fail=True))
+
+    with pytest.raises(AIGenerationError, match="All LLM providers failed"):
+        asyncio.run(routing.generate("s", "u"))
+
+
+def test_stream_fails_over_before_the_first_chunk():
+    primary, secondary = FakeProvider("a", fail=True), FakeProvider("b")
+    routing = router(primary, secondary)
+
+    assert asyncio.run(collect(routing.stream("s", "u"))) == ["b-0", "b-1", "b-2"]
+    assert routing.stats["a"].consecutive_failures == 1
+
+
+def test_stream_failure_after_the_first_chunk_is_raised():
+    primary, secondary = FakeProvider("a", fail=True, fail_after_chunks=1), FakeProvider("b")
+    received = []
+
+    async def consume():
+        async for chunk in router(primary, secondary).stream("s", "u"):
+            received.append(chunk)
+
+    # Output already sent cannot be spliced with another provider's
+    with pytest.raises(AIGenerationError):
+        asyncio.run(consume())
+    assert received == ["a-0"]
+    assert secondary.calls == 0
+
+
+def test_circuit_opens_after_repeated_failures_and_half_opens_after_cooldown():
+    flaky, healthy = FakeProvider("a", fail=True), FakeProvider("b")
+    routing = router(flaky, healthy, failure_threshold=2, cooldown_seconds=0.1)
+
+    for _ in range(2):
+        asyncio.run(routing.generate("s", "u"))
+    assert routing.snapshot()["a"]["circuit"] == "open"
+
+    # Skipped while open
+    assert asyncio.run(routing.generate("s", "u")) == "b"
+    assert flaky.calls == 2
+    assert routing.ranked() == ["b"]
+
+    # After the cooldown one trial call goes through; a success closes the circuit
+    time.sleep(0.15)
+    flaky.fail = False
+    assert "a" in routing.ranked()
+    assert asyncio.run(routing.generate("s", "u")) == "a"
+    assert routing.snapshot()["a"]["circuit"] == "closed"
+
+
+def test_failed_half_open_trial_reopens_the_circuit():
+    flaky, healthy = FakeProvider("a", fail=True), FakeProvider("b")
+    routing = router(flaky, healthy, failure_threshold=1, cooldown_seconds=0.1)
+
+    asyncio.run(routing.generate("s", "u"))
+    time.sleep(0.15)
+    assert asyncio.run(routing.generate("s", "u")) == "b"
+
+    assert flaky.calls == 2
+    assert not routing.stats["a"].is_available()
+
+
+def test_all_circuits_open_still_tries_every_provider():
+    routing = router(FakeProvider("a", fail=True), FakeProvider("b", fail=True), failure_threshold=1)
+
+    with pytest.raises(AIGenerationError):
+        asyncio.run(routing.generate("s", "u"))
+    assert routing.ranked() == ["a", "b"]
+
+
+def test_frequently_failing_provider_ranks_after_a_slower_reliable_one():
+    routing = router(FakeProvider("fast"), FakeProvider("steady"))
+    for n in range(10):
+        # 40% failures, never three in a row, so the circuit stays closed
+        if n % 5 in (1, 3):
+            routing.stats["fast"].record_failure()
+        else:
+            routing.stats["fast"].record_success(0.5)
+        routing.stats["steady"].record_success(2.0)
+
+    assert routing.snapshot()["fast"]["circuit"] == "closed"
+    assert routing.ranked() == ["steady", "fast"]
+
+    # Back under the threshold once the window fills with successes
+    for _ in range(50):
+        routing.stats["fast"].record_success(0.5)
+    assert routing.ranked() == ["fast", "steady"]
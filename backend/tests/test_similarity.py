@@ -0,0 +1,190 @@
+"""SimilarityIndex reuse across trips."""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+from app.schemas import DayItinerary, TripPreferences
+from app.services import trip as trip_module
+from app.services.similarity import SimilarityIndex
+from app.services.trip import TripService
+
+PREFERENCES = TripPreferences(
+    travel_style="cultural",
+    interests=["history", "food"],
+    group_size=2,
+    pace="moderate",
+    budget_per_day_inr=5000,
+)
+
+
+def days(label: str) -> list[DayItinerary]:
+    return [
+        DayItinerary(
+            day=1,
+            date="2026-01-01",
+            morning=label,
+            afternoon="",
+            evening="",
+            food_recommendations="",
+            accommodation_info="",
+            transport_tips="",
+        )
+    ]
+
+
+def morning(payload: str) -> str:
+    return json.loads(payload)["days"][0]["morning"]
+
+
+def test_a_trip_is_not_offered_its_own_itinerary():
+    index = SimilarityIndex(threshold=0.97, max_entries=10)
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("a"))
+
+    assert index.find("trip-a", "Jaipur", 3, PREFERENCES) is None
+    assert morning(index.find("trip-b", "Jaipur", 3, PREFERENCES)) == "a"
+
+
+def test_regenerating_a_trip_replaces_its_entry():
+    index = SimilarityIndex(threshold=0.97, max_entries=10)
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("first"))
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("second"))
+
+    assert index.index.size == 1
+    assert morning(index.find("trip-b", "Jaipur", 3, PREFERENCES)) == "second"
+
+
+def test_other_trips_stay_reusable_when_the_own_entry_is_excluded():
+    index = SimilarityIndex(threshold=0.97, max_entries=10)
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("a"))
+    index.add("trip-b", "Jaipur", 3, PREFERENCES, days("b"))
+
+    assert morning(index.find("trip-a", "Jaipur", 3, PREFERENCES)) == "b"
+    # Hard constraints still partition the index
+    assert index.find("trip-c", "Jaipur", 4, PREFERENCES) is None
+
+
+def test_a_removed_trip_is_never_returned_as_a_match():
+    index = SimilarityIndex(threshold=0.97, max_entries=2)
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("a"))
+    index.add("trip-b", "Jaipur", 3, PREFERENCES, days("b"))
+
+    index.remove("trip-a")
+    assert morning(index.find("trip-c", "Jaipur", 3, PREFERENCES)) == "b"
+    index.remove("trip-b")
+    assert index.find("trip-c", "Jaipur", 3, PREFERENCES) is None
+
+    # The freed slots are reused
+    index.add("trip-d", "Jaipur", 3, PREFERENCES, days("d"))
+    assert morning(index.find("trip-c", "Jaipur", 3, PREFERENCES)) == "d"
+
+
+class Invalidated:
+    async def invalidate(self, key: str):
+        pass
+
+
+class DeleteQuery:
+    def table(self, name: str):
+        return self
+
+    def delete(self):
+        return self
+
+    def eq(self, column: str, value: str):
+        return self
+
+    async def execute(self):
+        return SimpleNamespace(data=[])
+
+
+def test_deleting_a_trip_removes_it_from_the_similarity_index(monkeypatch):
+    index = SimilarityIndex(threshold=0.97, max_entries=10)
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("a"))
+    monkeypatch.setattr(trip_module, "get_similarity_index", lambda: index)
+    monkeypatch.setattr(trip_module, "get_summary_service", Invalidated)
+    monkeypatch.setattr(trip_module, "get_itinerary_service", Invalidated)
+    service = TripService.__new__(TripService)
+    service.db = SimpleNamespace(get_service_client=DeleteQuery)
+
+    assert asyncio.run(service.delete_trip("trip-a", "user"))
+    assert index.find("trip-b", "Jaipur", 3, PREFERENCES) is None
+
+
+class FakeQuery:
+    """The slice of the PostgREST query builder keyset_page uses, over in-memory rows."""
+
+    def __init__(self, rows: list[dict], pages: list[int]):
+        self.rows = sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        self.pages = pages
+        self.after: tuple[str, str] | None = None
+        self.size = 0
+
+    def table(self, name: str):
+        return self
+
+    def select(self, columns: str):
+        return FakeQuery(self.rows, self.pages)
+
+    def or_(self, condition: str):
+        created_at, row_id = re.findall(r'"([^"]*)"', condition)[1:3]
+        self.after = (created_at, row_id)
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        return self
+
+    def limit(self, size: int):
+        self.size = size
+        return self
+
+    async def execute(self):
+        rows = [row for row in self.rows if self.after is None or (row["created_at"], row["id"]) < self.after]
+        self.pages.append(self.size)
+        return SimpleNamespace(data=rows[:self.size])
+
+
+class FakeDatabase:
+    def __init__(self, rows: list[dict]):
+        self.pages: list[int] = []
+        self.client = FakeQuery(rows, self.pages)
+
+    def get_service_client(self):
+        return self.client
+
+
+def itinerary_row(n: int, trip_id: str) -> dict:
+    return {
+        "id": f"it-{n:03d}",
+        "created_at": f"2026-01-01T00:{n // 60:02d}:{n % 60:02d}",
+        "trip_id": trip_id,
+        "duration_days": 3,
+        "itinerary_days": [day.model_dump() for day in days(f"itinerary {n}")],
+        "trips": {"destination": "Jaipur", "preferences": PREFERENCES.model_dump()},
+    }
+
+
+def test_warm_pages_newest_first_and_keeps_each_trips_latest_itinerary():
+    # Trips 0-24 have two itineraries each, e.g. trip-15 has it-015 and the newer it-065
+    rows = [itinerary_row(n, f"trip-{n % 50}") for n in range(75)]
+    db = FakeDatabase(rows)
+    index = SimilarityIndex(threshold=0.97, max_entries=100)
+
+    asyncio.run(index.warm(db, limit=60, batch_size=25))
+
+    # Bounded pages (each asks for one look-ahead row), stopping at the limit: it-074 to it-015
+    assert db.pages == [26, 26, 11]
+    assert index.index.size == 50
+    slot = index.index._slots["trip-15"]
+    assert morning(index.index.payloads[slot]) == "itinerary 65"
+
+
+def test_warm_does_not_replace_entries_saved_meanwhile():
+    db = FakeDatabase([itinerary_row(1, "trip-a")])
+    index = SimilarityIndex(threshold=0.97, max_entries=10)
+    index.add("trip-a", "Jaipur", 3, PREFERENCES, days("live"))
+
+    asyncio.run(index.warm(db, limit=10, batch_size=5))
+
+    assert morning(index.find("trip-b", "Jaipur", 3, PREFERENCES)) == "live"
@@ -0,0 +1,23 @@
+"""Completion budgets for itinerary prompts."""
+
+from app.prompts.tokens import DAY_MIN_OUTPUT_TOKENS, max_output_tokens
+from app.services.ai import DEFAULT_MAX_TOKENS
+
+PACES = ("relaxed", "moderate", "fast")
+
+
+def test_short_trips_keep_the_default_budget():
+    # The estimate for a 3-day relaxed trip is under 1000 tokens
+    assert max_output_tokens(3, "relaxed", "text", 350, 8192) < DEFAULT_MAX_TOKENS
+    assert max_output_tokens(3, "relaxed", "text", 350, 8192, floor=DEFAULT_MAX_TOKENS) == DEFAULT_MAX_TOKENS
+
+
+def test_long_trips_grow_past_the_floor_up_to_the_limit():
+    assert max_output_tokens(10, "fast", "json", 350, 8192, floor=DEFAULT_MAX_TOKENS) == 5378
+    assert max_output_tokens(30, "fast", "json", 350, 8192, floor=DEFAULT_MAX_TOKENS) == 8192
+
+
+def test_parallel_day_budgets_follow_the_pace():
+    budgets = [max_output_tokens(1, pace, "text", 350, 8192, floor=DAY_MIN_OUTPUT_TOKENS) for pace in PACES]
+
+    assert budgets == [512, 512, 566]
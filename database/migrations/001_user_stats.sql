@@ -0,0 +1,150 @@
+-- Upgrade a database created before user_stats existed. Safe to re-run.
+-- New installs get all of this from schema.sql and need no backfill.
+--
+-- Writes to trips and itineraries are blocked while it runs so the
+-- backfill and the triggers agree on every row.
+
+BEGIN;
+
+LOCK TABLE trips, itineraries IN SHARE ROW EXCLUSIVE MODE;
+
+ALTER TABLE trips ADD COLUMN IF NOT EXISTS latest_itinerary_cost DECIMAL(10, 2) NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_trips_user_start_date ON trips(user_id, start_date);
+
+CREATE TABLE IF NOT EXISTS user_stats (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  trip_count INTEGER NOT NULL DEFAULT 0,
+  total_estimated_cost DECIMAL(12, 2) NOT NULL DEFAULT 0,
+  destination_counts JSONB NOT NULL DEFAULT '{}',
+  upcoming_trips JSONB NOT NULL DEFAULT '[]',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION apply_trip_stats() RETURNS TRIGGER AS $$
+DECLARE
+  v_user_id UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO user_stats (user_id) VALUES (v_user_id) ON CONFLICT (user_id) DO NOTHING;
+    UPDATE user_stats SET
+      trip_count = trip_count + 1,
+      destination_counts = jsonb_set(
+        destination_counts,
+        ARRAY[trim(NEW.destination)],
+        to_jsonb(COALESCE((destination_counts ->> trim(NEW.destination))::int, 0) + 1)
+      )
+    WHERE user_id = v_user_id;
+  ELSIF TG_OP = 'DELETE' THEN
+    -- No row to update when the trip goes away with its user
+    UPDATE user_stats SET
+      trip_count = GREATEST(trip_count - 1, 0),
+      total_estimated_cost = total_estimated_cost - OLD.latest_itinerary_cost,
+      destination_counts = CASE
+        WHEN (destination_counts ->> trim(OLD.destination))::int > 1 THEN jsonb_set(
+          destination_counts,
+          ARRAY[trim(OLD.destination)],
+          to_jsonb((destination_counts ->> trim(OLD.destination))::int - 1)
+        )
+        ELSE destination_counts - trim(OLD.destination)
+      END
+    WHERE user_id = v_user_id;
+  ELSE
+    UPDATE user_stats SET
+      total_estimated_cost = total_estimated_cost + NEW.latest_itinerary_cost - OLD.latest_itinerary_cost
+    WHERE user_id = v_user_id;
+  END IF;
+
+  IF TG_OP <> 'UPDATE' THEN
+    UPDATE user_stats SET upcoming_trips = (
+      SELECT COALESCE(jsonb_agg(to_jsonb(upcoming) ORDER BY upcoming.start_date), '[]'::jsonb)
+      FROM (
+        SELECT id, destination, start_date, end_date FROM trips
+        WHERE user_id = v_user_id AND start_date >= CURRENT_DATE
+        ORDER BY start_date
+        LIMIT 5
+      ) upcoming
+    )
+    WHERE user_id = v_user_id;
+  END IF;
+
+  UPDATE user_stats SET updated_at = CURRENT_TIMESTAMP WHERE user_id = v_user_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trips_user_stats ON trips;
+CREATE TRIGGER trips_user_stats
+  AFTER INSERT OR DELETE OR UPDATE OF latest_itinerary_cost ON trips
+  FOR EACH ROW EXECUTE FUNCTION apply_trip_stats();
+
+CREATE OR REPLACE FUNCTION apply_itinerary_stats() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE trips SET latest_itinerary_cost = NEW.total_estimated_cost WHERE id = NEW.trip_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS itineraries_user_stats ON itineraries;
+CREATE TRIGGER itineraries_user_stats
+  AFTER INSERT ON itineraries
+  FOR EACH ROW EXECUTE FUNCTION apply_itinerary_stats();
+
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users can view own stats" ON user_stats;
+CREATE POLICY "Users can view own stats" ON user_stats
+  FOR SELECT USING (auth.uid()::text = user_id::text);
+
+-- ============ BACKFILL ============
+-- Each trip's latest itinerary estimate
+UPDATE trips SET latest_itinerary_cost = latest.total_estimated_cost
+FROM (
+  SELECT DISTINCT ON (trip_id) trip_id, total_estimated_cost
+  FROM itineraries
+  ORDER BY trip_id, created_at DESC
+) latest
+WHERE latest.trip_id = trips.id
+  AND trips.latest_itinerary_cost IS DISTINCT FROM latest.total_estimated_cost;
+
+-- Absolute per-user totals, overwriting whatever the triggers added above
+INSERT INTO user_stats (user_id, trip_count, total_estimated_cost, destination_counts, upcoming_trips, updated_at)
+SELECT
+  t.user_id,
+  count(*),
+  COALESCE(sum(t.latest_itinerary_cost), 0),
+  (
+    SELECT jsonb_object_agg(destination, n)
+    FROM (
+      SELECT trim(destination) AS destination, count(*) AS n FROM trips
+      WHERE user_id = t.user_id
+      GROUP BY trim(destination)
+    ) destinations
+  ),
+  (
+    SELECT COALESCE(jsonb_agg(to_jsonb(upcoming) ORDER BY upcoming.start_date), '[]'::jsonb)
+    FROM (
+      SELECT id, destination, start_date, end_date FROM trips
+      WHERE user_id = t.user_id AND start_date >= CURRENT_DATE
+      ORDER BY start_date
+      LIMIT 5
+    ) upcoming
+  ),
+  CURRENT_TIMESTAMP
+FROM trips t
+GROUP BY t.user_id
+ON CONFLICT (user_id) DO UPDATE SET
+  trip_count = EXCLUDED.trip_count,
+  total_estimated_cost = EXCLUDED.total_estimated_cost,
+  destination_counts = EXCLUDED.destination_counts,
+  upcoming_trips = EXCLUDED.upcoming_trips,
+  updated_at = EXCLUDED.updated_at;
+
+-- Users whose trips were all deleted
+UPDATE user_stats SET
+  trip_count = 0,
+  total_estimated_cost = 0,
+  destination_counts = '{}',
+  upcoming_trips = '[]',
+  updated_at = CURRENT_TIMESTAMP
+WHERE NOT EXISTS (SELECT 1 FROM trips WHERE trips.user_id = user_stats.user_id);
+
+COMMIT;
@@ -21,12 +21,15 @@ CREATE TABLE trips (
   start_date DATE NOT NULL,
   end_date DATE NOT NULL,
   preferences JSONB NOT NULL, -- { "travel_style": "adventure", "interests": ["food"], "budget_per_day_inr": 5000, "pace": "moderate" }
+  latest_itinerary_cost DECIMAL(10, 2) NOT NULL DEFAULT 0, -- maintained by itineraries_user_stats
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE INDEX idx_trips_user_id ON trips(user_id);
 CREATE INDEX idx_trips_created_at ON trips(created_at DESC);
+CREATE INDEX idx_trips_user_keyset ON trips(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_trips_user_start_date ON trips(user_id, start_date);
 
 -- ============ ITINERARIES TABLE ============
 CREATE TABLE itineraries (
@@ -61,6 +64,7 @@ CREATE TABLE saved_places (
 
 CREATE INDEX idx_saved_places_trip_id ON saved_places(trip_id);
 CREATE INDEX idx_saved_places_user_id ON saved_places(user_id);
+CREATE INDEX idx_saved_places_user_keyset ON saved_places(user_id, created_at DESC, id DESC);
 
 -- ============ HISTORY TABLE ============
 CREATE TABLE history (
@@ -75,6 +79,7 @@ CREATE TABLE history (
 
 CREATE INDEX idx_history_user_id ON history(user_id);
 CREATE INDEX idx_history_created_at ON history(created_at DESC);
+CREATE INDEX idx_history_user_keyset ON history(user_id, created_at DESC, id DESC);
 
 -- ============ FEEDBACK TABLE ============
 CREATE TABLE feedback (
@@ -104,6 +109,88 @@ CREATE TABLE preferences (
 
 CREATE INDEX idx_preferences_user_id ON preferences(user_id);
 
+-- ============ USER_STATS TABLE ============
+-- Per-user dashboard summary, kept current by triggers on trips and
+-- itineraries so reading it is a single primary-key lookup. Databases
+-- created before this table existed: run migrations/001_user_stats.sql,
+-- which also backfills it.
+CREATE TABLE user_stats (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  trip_count INTEGER NOT NULL DEFAULT 0,
+  total_estimated_cost DECIMAL(12, 2) NOT NULL DEFAULT 0, -- sum of each trip's latest itinerary
+  destination_counts JSONB NOT NULL DEFAULT '{}', -- { "Goa": 3, "Paris": 1 }
+  upcoming_trips JSONB NOT NULL DEFAULT '[]', -- next 5 trips by start_date: [{ "id", "destination", "start_date", "end_date" }]
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION apply_trip_stats() RETURNS TRIGGER AS $$
+DECLARE
+  v_user_id UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO user_stats (user_id) VALUES (v_user_id) ON CONFLICT (user_id) DO NOTHING;
+    UPDATE user_stats SET
+      trip_count = trip_count + 1,
+      destination_counts = jsonb_set(
+        destination_counts,
+        ARRAY[trim(NEW.destination)],
+        to_jsonb(COALESCE((destination_counts ->> trim(NEW.destination))::int, 0) + 1)
+      )
+    WHERE user_id = v_user_id;
+  ELSIF TG_OP = 'DELETE' THEN
+    -- No row to update when the trip goes away with its user
+    UPDATE user_stats SET
+      trip_count = GREATEST(trip_count - 1, 0),
+      total_estimated_cost = total_estimated_cost - OLD.latest_itinerary_cost,
+      destination_counts = CASE
+        WHEN (destination_counts ->> trim(OLD.destination))::int > 1 THEN jsonb_set(
+          destination_counts,
+          ARRAY[trim(OLD.destination)],
+          to_jsonb((destination_counts ->> trim(OLD.destination))::int - 1)
+        )
+        ELSE destination_counts - trim(OLD.destination)
+      END
+    WHERE user_id = v_user_id;
+  ELSE
+    UPDATE user_stats SET
+      total_estimated_cost = total_estimated_cost + NEW.latest_itinerary_cost - OLD.latest_itinerary_cost
+    WHERE user_id = v_user_id;
+  END IF;
+
+  IF TG_OP <> 'UPDATE' THEN
+    UPDATE user_stats SET upcoming_trips = (
+      SELECT COALESCE(jsonb_agg(to_jsonb(upcoming) ORDER BY upcoming.start_date), '[]'::jsonb)
+      FROM (
+        SELECT id, destination, start_date, end_date FROM trips
+        WHERE user_id = v_user_id AND start_date >= CURRENT_DATE
+        ORDER BY start_date
+        LIMIT 5
+      ) upcoming
+    )
+    WHERE user_id = v_user_id;
+  END IF;
+
+  UPDATE user_stats SET updated_at = CURRENT_TIMESTAMP WHERE user_id = v_user_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trips_user_stats
+  AFTER INSERT OR DELETE OR UPDATE OF latest_itinerary_cost ON trips
+  FOR EACH ROW EXECUTE FUNCTION apply_trip_stats();
+
+-- A regenerated itinerary replaces the trip's previous estimate
+CREATE OR REPLACE FUNCTION apply_itinerary_stats() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE trips SET latest_itinerary_cost = NEW.total_estimated_cost WHERE id = NEW.trip_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER itineraries_user_stats
+  AFTER INSERT ON itineraries
+  FOR EACH ROW EXECUTE FUNCTION apply_itinerary_stats();
+
 -- ============ ENABLE ROW LEVEL SECURITY ============
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE trips ENABLE ROW LEVEL SECURITY;
@@ -112,6 +199,7 @@ ALTER TABLE saved_places ENABLE ROW LEVEL SECURITY;
 ALTER TABLE history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE feedback ENABLE ROW LEVEL SECURITY;
 ALTER TABLE preferences ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
 
 -- ============ ROW LEVEL SECURITY POLICIES ============
 
@@ -155,3 +243,7 @@ CREATE POLICY "Users can view own feedback" ON feedback
 -- Preferences: Can only see own preferences
 CREATE POLICY "Users can view own preferences" ON preferences
   FOR SELECT USING (auth.uid()::text = user_id::text);
+
+-- User stats: Can only see own summary
+CREATE POLICY "Users can view own stats" ON user_stats
+  FOR SELECT USING (auth.uid()::text = user_id::text);